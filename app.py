@@ -1,5 +1,21 @@
+import os
 from flask import Flask, redirect, url_for
 from config import db, DATABASE_URI, socketio
+from utils.gravador_logs import gravador_logs
+from utils.schema import garantir_indices
+from utils.busca_logs import criar_indice_busca
+from utils.cache import cache_dashboard
+from utils.senhas import servico_senhas
+from utils.estado_sistema import estado_sistema
+from utils.presenca import presenca
+from utils.sessoes_chat import sessoes_chat, garantir_sessoes_canonicas
+from utils import arquivo_logs, resumo_logs, alteracoes_logs, tail_logs, contadores, dashboard_ao_vivo, identidade, limitador
+from models.log_model import Log
+from models.usuario_model import Usuario
+from models.veiculo_model import Veiculo
+from models.equipamento_model import Equipamento
+from models.chat_sessao_model import ChatSessao
+from models.chat_message_model import ChatMessage
 
 # Controladores normais
 from controllers import misc_controller, usuario_controller, equipamento_controller, veiculo_controller
@@ -23,12 +39,95 @@ app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URI
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 # =============================================================
-# 🔐 MODO LOCKDOWN
+# 📝 GRAVADOR DE LOGS (fila + commit em lote)
 # =============================================================
-app.config["LOCKDOWN_ATIVO"] = False
+app.config["LOG_ASSINCRONO"] = True
+app.config["LOG_FILA_MAX"] = 10000      # acima disso grava de forma síncrona
+app.config["LOG_LOTE_MAX"] = 200        # registros por transação
+app.config["LOG_LOTE_INTERVALO"] = 0.5  # segundos de espera por lote
+
+# =============================================================
+# 🔌 SOCKET.IO ENTRE WORKERS + PRESENÇA E SESSÕES DO CHAT
+# =============================================================
+# Com mais de um worker, defina SOCKETIO_MESSAGE_QUEUE (ex.: redis://localhost:6379/0):
+# os emits passam pela fila e chegam aos sockets de todos os processos.
+# Sem fila (None) o Socket.IO entrega só no próprio processo — um worker, testes.
+# Exceção: os logs ao vivo (/logs) só mostram os logs gravados no worker do
+# admin, mesmo com fila (ver utils/tail_logs.py).
+app.config["SOCKETIO_MESSAGE_QUEUE"] = os.environ.get("SOCKETIO_MESSAGE_QUEUE")
+app.config["PRESENCA_BACKEND"] = "banco" if app.config["SOCKETIO_MESSAGE_QUEUE"] else "memoria"
+app.config["PRESENCA_BATIMENTO"] = 15.0  # segundos entre renovações dos sockets de cada worker
+app.config["PRESENCA_EXPIRA"] = 45.0     # socket sem renovação há mais que isso = offline
+app.config["CHAT_SESSOES_TTL"] = 60.0    # segundos que um par de conversa ativo fica em cache
+app.config["CHAT_HISTORICO_PAGINA"] = 50 # mensagens por página do histórico (máx. CHAT_HISTORICO_MAX)
+app.config["CHAT_HISTORICO_MAX"] = 200
 
 db.init_app(app)
-socketio.init_app(app)
+socketio.init_app(app, message_queue=app.config["SOCKETIO_MESSAGE_QUEUE"])
+presenca.init_app(app)
+sessoes_chat.init_app(app)
+gravador_logs.init_app(app)
+
+# =============================================================
+# 🔑 HASH DE SENHAS (pool de processos)
+# =============================================================
+app.config["SENHA_METODO"] = "scrypt"   # alterar → senhas são refeitas no próximo login
+app.config["SENHA_TIMEOUT"] = 5.0       # segundos; acima disso o login responde 503
+servico_senhas.init_app(app)            # SENHA_PROCESSOS padrão: nº de CPUs
+
+# =============================================================
+# 🚦 LIMITE DE TENTATIVAS + AGREGAÇÃO DE NEGAÇÕES
+# =============================================================
+app.config["LIMITE_LOGIN_IP"] = (20, 60)      # POSTs de login por IP a cada 60 s
+app.config["LIMITE_LOGIN_EMAIL"] = (5, 300)   # senhas erradas por e-mail a cada 5 min
+app.config["LIMITE_ANONIMO"] = (60, 60)       # rotas protegidas sem login, por IP
+app.config["NEGACOES_INTERVALO"] = 60         # negações repetidas → 1 log-resumo por minuto
+limitador.init_app(app)
+
+# =============================================================
+# 🔐 MODO LOCKDOWN (estado compartilhado entre workers)
+# =============================================================
+app.config["ESTADO_INTERVALO"] = 0.5    # segundos até todos os processos verem a mudança
+estado_sistema.init_app(app)
+
+# =============================================================
+# 🪪 IDENTIDADE DOS USUÁRIOS EM MEMÓRIA (perfil_obrigatorio)
+# =============================================================
+app.config["IDENTIDADE_TTL"] = 300  # segundos; edições/exclusões invalidam em todos os workers (estado_sistema)
+identidade.init_app(app)
+
+# =============================================================
+# 🗄️ ARQUIVAMENTO DE LOGS (flask arquivar-logs)
+# =============================================================
+app.config["LOG_RETENCAO_DIAS"] = 180   # logs mais antigos vão para arquivo_logs/
+arquivo_logs.init_app(app)
+resumo_logs.init_app(app)
+alteracoes_logs.init_app(app)
+
+# =============================================================
+# 📡 LOGS AO VIVO (Socket.IO /logs, só ADMIN_SEGURANCA)
+# =============================================================
+app.config["LOG_TAIL_INTERVALO"] = 0.5  # envios agrupados a cada 0,5 s
+app.config["LOG_TAIL_MAX"] = 100        # logs por envio; o excedente vira "omitidos"
+tail_logs.init_app(app)
+
+# =============================================================
+# ⚡ CACHE DOS AGREGADOS DO DASHBOARD
+# =============================================================
+app.config["DASHBOARD_CACHE_TTL"] = 30   # segundos (padrão por chave)
+app.config["DASHBOARD_CACHE_MAX"] = 256  # entradas; acima disso sai a menos usada
+cache_dashboard.init_app(app)
+
+# =============================================================
+# 🔢 CONTADORES DAS ENTIDADES (flask verificar-contadores)
+# =============================================================
+contadores.init_app(app)
+
+# =============================================================
+# 📡 DASHBOARD AO VIVO (Socket.IO /dashboard, só ADMIN_SEGURANCA)
+# =============================================================
+app.config["DASHBOARD_AO_VIVO_INTERVALO"] = 1.0  # deltas de 1 s viram um único envio
+dashboard_ao_vivo.init_app(app)
 
 
 # =============================================================
@@ -86,6 +185,7 @@ app.add_url_rule("/contatos", "contatos", misc_controller.contatos)
 app.add_url_rule("/admin/buscar", "buscar_adm", misc_controller.buscar_adm)
 app.add_url_rule("/admin/lockdown/ativar", "ativar_lockdown", misc_controller.ativar_lockdown)
 app.add_url_rule("/admin/lockdown/desativar", "desativar_lockdown", misc_controller.desativar_lockdown)
+app.add_url_rule("/admin/status", "status_sistema", misc_controller.status_sistema)
 app.add_url_rule("/bloqueio", "pagina_bloqueio", misc_controller.pagina_bloqueio)
 
 # =============================================================
@@ -99,6 +199,12 @@ app.register_error_handler(500, misc_controller.internal_server_error)
 # =============================================================
 with app.app_context():
     db.create_all()
+    garantir_sessoes_canonicas()   # antes do índice único do par em bancos antigos
+    garantir_indices(Log, Usuario, Veiculo, Equipamento, ChatSessao, ChatMessage)
+    criar_indice_busca()
+    resumo_logs.garantir_resumo()
+    alteracoes_logs.garantir_alteracoes()
+    contadores.garantir_contadores()
     criar_dados_mock_usuarios(app, db)
     criar_dados_mock_equipamentos(app, db)
     criar_dados_mock_veiculos(app, db)
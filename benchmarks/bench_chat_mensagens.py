@@ -0,0 +1,111 @@
+"""
+Benchmark — mensagens de chat gravadas por segundo.
+
+Simula o que handle_send_message faz no banco (sem Socket.IO), num SQLite
+temporário com `conversas` pares trocando mensagens:
+  * antes:  busca da sessão com OR dos dois sentidos + commit, depois
+            INSERT da mensagem + commit (duas transações por mensagem)
+  * depois: utils.sessoes_chat (par canônico, cache de pares ativos) com a
+            ativação na mesma transação da mensagem (um commit)
+
+Conta transações (evento commit) e idas ao banco por mensagem.
+
+Uso:
+    python benchmarks/bench_chat_mensagens.py [mensagens] [conversas]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import Flask
+from sqlalchemy import event
+
+from config import db
+from models.chat_message_model import ChatMessage
+from models.chat_sessao_model import ChatSessao
+from utils.sessoes_chat import sessoes_chat
+
+
+def criar_app(caminho):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{caminho}"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    sessoes_chat.init_app(app)
+    return app
+
+
+def antes(de_id, para_id, texto):
+    """criar_ou_ativar_sessao + mensagem, como era no chat_controller."""
+    sessao = ChatSessao.query.filter(
+        ((ChatSessao.usuario1_id == de_id) & (ChatSessao.usuario2_id == para_id)) |
+        ((ChatSessao.usuario1_id == para_id) & (ChatSessao.usuario2_id == de_id))
+    ).first()
+    if sessao:
+        sessao.ativa = True
+    else:
+        db.session.add(ChatSessao(usuario1_id=de_id, usuario2_id=para_id, ativa=True))
+    db.session.commit()
+
+    db.session.add(ChatMessage(de_id=de_id, para_id=para_id, texto=texto, horario=datetime.now(timezone.utc)))
+    db.session.commit()
+
+
+def depois(de_id, para_id, texto):
+    db.session.add(ChatMessage(de_id=de_id, para_id=para_id, texto=texto, horario=datetime.now(timezone.utc)))
+    sessoes_chat.ativar(de_id, para_id)
+    db.session.commit()
+
+
+def medir(rotulo, funcao, envios):
+    commits = [0]
+    idas = [0]
+
+    def contar_commit(*args):
+        commits[0] += 1
+
+    def contar_ida(*args):
+        idas[0] += 1
+
+    event.listen(db.engine, "commit", contar_commit)
+    event.listen(db.engine, "before_cursor_execute", contar_ida)
+    inicio = time.perf_counter()
+    for de_id, para_id in envios:
+        funcao(de_id, para_id, "mensagem de teste")
+    segundos = time.perf_counter() - inicio
+    event.remove(db.engine, "commit", contar_commit)
+    event.remove(db.engine, "before_cursor_execute", contar_ida)
+
+    total = len(envios)
+    print(
+        f"  {rotulo:<32} {total / segundos:8.0f} msg/s   "
+        f"{commits[0] / total:4.1f} commits/msg   {idas[0] / total:4.1f} idas/msg"
+    )
+
+
+def main():
+    mensagens = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    conversas = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    random.seed(42)
+
+    pares = [tuple(random.sample(range(1, 500), 2)) for _ in range(conversas)]
+    # Cada mensagem sai de um dos lados de uma conversa
+    envios = [par if random.random() < 0.5 else par[::-1] for par in random.choices(pares, k=mensagens)]
+
+    print(f"{mensagens} mensagens em {conversas} conversas\n")
+    for rotulo, funcao in [("antes (2 transações)", antes), ("depois (1 transação + cache)", depois)]:
+        with tempfile.TemporaryDirectory() as pasta:
+            app = criar_app(os.path.join(pasta, "bench.db"))
+            with app.app_context():
+                db.create_all()
+                sessoes_chat.limpar()
+                medir(rotulo, funcao, envios)
+
+
+if __name__ == "__main__":
+    main()
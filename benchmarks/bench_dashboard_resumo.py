@@ -0,0 +1,151 @@
+"""
+Benchmark — resumo do dashboard: consultas separadas x uma consulta por entidade.
+
+Compara, num SQLite temporário com dados sintéticos (sem o cache do dashboard):
+  * antes:  count() de cada entidade + ACESSO_NEGADO + um group-by por gráfico
+  * depois: utils.agregados_dashboard (SELECT ... UNION ALL por entidade)
+  * contadores: resumo_entidade() lendo contadores_entidades (utils.contadores)
+
+Conta as idas ao banco (evento before_cursor_execute) e o tempo médio.
+
+Uso:
+    python benchmarks/bench_dashboard_resumo.py [quantidade_por_entidade]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import Flask
+from sqlalchemy import event, func
+
+from config import db
+from models.usuario_model import Usuario, PerfilEnum
+from models.veiculo_model import Veiculo
+from models.equipamento_model import Equipamento
+from models.log_model import Log  # noqa: F401 (tabela de logs)
+from models.log_resumo_model import LogResumoDiario
+from utils import contadores
+from utils.agregados_dashboard import resumo_entidade, resumo_entidade_sql, resumo_logs_dashboard
+from utils.tempo import hoje_brasil
+
+OPERACOES = ["LOGIN_SUCESSO", "LOGIN_FALHO", "ACESSO_NEGADO", "CRIAR", "ATUALIZAR", "DELETAR", "LOGOUT"]
+SITUACOES = ["Ativo", "Manutencao", "Defeituoso"]
+REPETICOES = 20
+
+
+def criar_app(caminho):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{caminho}"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    return app
+
+
+def popular(quantidade):
+    perfis = list(PerfilEnum)
+    db.session.execute(Usuario.__table__.insert(), [
+        {"name": f"Usuario {i}", "email": f"u{i}@x.com", "senha_hash": "-", "perfil": random.choice(perfis).name}
+        for i in range(quantidade)
+    ])
+    db.session.execute(Veiculo.__table__.insert(), [
+        {"modelo": "M", "marca": "X", "ano_fabricacao": 2020, "cor": "azul", "placa": f"P{i}",
+         "local_armazenamento": f"Armazém {i % 12}", "situacao": random.choice(SITUACOES)}
+        for i in range(quantidade)
+    ])
+    db.session.execute(Equipamento.__table__.insert(), [
+        {"nome": f"E{i}", "quantidade": 1, "data_vencimento": date(2030, 1, 1),
+         "nivel_perigo": random.choice(["Baixo", "Médio", "Alto"]), "situacao": random.choice(SITUACOES)}
+        for i in range(quantidade)
+    ])
+    hoje = hoje_brasil()
+    db.session.execute(LogResumoDiario.__table__.insert(), [
+        {"dia": hoje - timedelta(days=d), "tipo_operacao": op, "tipo_modelo": "Sistema", "total": random.randint(1, 500)}
+        for d in range(365) for op in OPERACOES
+    ])
+    db.session.commit()
+
+
+def antes():
+    """Consultas do dashboard antes do motor combinado."""
+    r = LogResumoDiario
+    hoje = hoje_brasil()
+    inicio = hoje - timedelta(days=6)
+    logins = dict(
+        db.session.query(r.dia, func.sum(r.total))
+        .filter(r.tipo_operacao == "LOGIN_SUCESSO", r.dia >= inicio)
+        .group_by(r.dia)
+        .all()
+    )
+
+    resultado = {
+        "usuarios": Usuario.query.count(),
+        "veiculos": Veiculo.query.count(),
+        "equipamentos": Equipamento.query.count(),
+        "negados": db.session.query(func.coalesce(func.sum(r.total), 0))
+        .filter(r.tipo_operacao == "ACESSO_NEGADO", r.dia == hoje).scalar(),
+        "logins": [(inicio + timedelta(days=i), logins.get(inicio + timedelta(days=i), 0)) for i in range(7)],
+        "operacoes": db.session.query(r.tipo_operacao, func.sum(r.total)).group_by(r.tipo_operacao).all(),
+    }
+    for modelo, coluna in [
+        (Usuario, Usuario.perfil),
+        (Veiculo, Veiculo.situacao), (Veiculo, Veiculo.local_armazenamento),
+        (Equipamento, Equipamento.nivel_perigo), (Equipamento, Equipamento.situacao),
+    ]:
+        resultado[coluna.key] = db.session.query(coluna, func.count(modelo.id)).group_by(coluna).all()
+    return resultado
+
+
+def depois():
+    resultado = {entidade: resumo_entidade_sql(entidade) for entidade in ("usuarios", "veiculos", "equipamentos")}
+    resultado["logs"] = resumo_logs_dashboard(7)
+    return resultado
+
+
+def com_contadores():
+    resultado = {entidade: resumo_entidade(entidade) for entidade in ("usuarios", "veiculos", "equipamentos")}
+    resultado["logs"] = resumo_logs_dashboard(7)
+    return resultado
+
+
+def medir(rotulo, funcao):
+    idas = [0]
+
+    def contar(*args):
+        idas[0] += 1
+
+    event.listen(db.engine, "before_cursor_execute", contar)
+    inicio = time.perf_counter()
+    for _ in range(REPETICOES):
+        funcao()
+    ms = (time.perf_counter() - inicio) / REPETICOES * 1000
+    event.remove(db.engine, "before_cursor_execute", contar)
+
+    print(f"  {rotulo:<34} {idas[0] / REPETICOES:5.1f} idas ao banco   {ms:8.2f} ms")
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    random.seed(42)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        app = criar_app(os.path.join(pasta, "bench.db"))
+        with app.app_context():
+            db.create_all()
+            print(f"Populando {quantidade} registros por entidade...")
+            popular(quantidade)
+            # INSERT em massa não passa pelos eventos do ORM
+            contadores.reconstruir()
+
+            print("\nResumo completo do dashboard (média por chamada)")
+            medir("antes (consultas separadas)", antes)
+            medir("depois (uma por entidade)", depois)
+            medir("contadores materializados", com_contadores)
+
+
+if __name__ == "__main__":
+    main()
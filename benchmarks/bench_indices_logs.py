@@ -0,0 +1,126 @@
+"""
+Benchmark — índices da tabela de logs e predicados de horário "sargable".
+
+Compara, num SQLite temporário com N logs sintéticos:
+  * antes:  sem índices secundários, filtro func.date(Log.horario) == hoje
+  * depois: índices de Log.__table_args__, filtro horario >= início AND horario < fim
+
+Mostra o EXPLAIN QUERY PLAN e o tempo médio de cada consulta.
+
+Uso:
+    python benchmarks/bench_indices_logs.py [quantidade_de_logs]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import Flask
+from sqlalchemy import func, text
+
+from config import db
+from models.usuario_model import Usuario  # noqa: F401 (FK de logs.usuario_id)
+from models.log_model import Log
+from utils.tempo import hoje_brasil, intervalo_dia_utc, ultimos_dias_utc
+
+OPERACOES = ["LOGIN_SUCESSO", "LOGIN_FALHO", "ACESSO_NEGADO", "CRIAR", "ATUALIZAR", "DELETAR", "LOGOUT"]
+REPETICOES = 20
+
+
+def criar_app(caminho):
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{caminho}"
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    db.init_app(app)
+    return app
+
+
+def popular(quantidade):
+    agora = datetime.now(timezone.utc)
+    linhas = [
+        {
+            "horario": agora - timedelta(seconds=random.randint(0, 90 * 24 * 3600)),
+            "usuario_id": random.randint(1, 500),
+            "usuario_nome": f"Usuario {i % 500}",
+            "usuario_perfil": "Funcionário",
+            "tipo_operacao": random.choice(OPERACOES),
+            "tipo_modelo": "Sistema",
+            "descricao": "registro sintético",
+        }
+        for i in range(quantidade)
+    ]
+    db.session.execute(Log.__table__.insert(), linhas)
+    db.session.commit()
+
+
+def plano(consulta):
+    sql = str(consulta.statement.compile(db.engine, compile_kwargs={"literal_binds": True}))
+    linhas = db.session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+    return " | ".join(linha[-1] for linha in linhas)
+
+
+def medir(rotulo, consulta):
+    inicio = time.perf_counter()
+    for _ in range(REPETICOES):
+        consulta.all()
+    ms = (time.perf_counter() - inicio) / REPETICOES * 1000
+    print(f"  {rotulo:<28} {ms:8.2f} ms   plano: {plano(consulta)}")
+
+
+def consultas():
+    hoje = hoje_brasil()
+    inicio_hoje, fim_hoje = intervalo_dia_utc(hoje)
+    inicio_semana, fim_semana = ultimos_dias_utc(7)
+
+    return [
+        ("negados hoje (func.date)",
+         db.session.query(func.count(Log.id))
+         .filter(Log.tipo_operacao == "ACESSO_NEGADO", func.date(Log.horario) == hoje)),
+        ("negados hoje (intervalo)",
+         db.session.query(func.count(Log.id))
+         .filter(Log.tipo_operacao == "ACESSO_NEGADO",
+                 Log.horario >= inicio_hoje, Log.horario < fim_hoje)),
+        ("logins 7 dias (intervalo)",
+         db.session.query(func.date(Log.horario), func.count(Log.id))
+         .filter(Log.tipo_operacao == "LOGIN_SUCESSO",
+                 Log.horario >= inicio_semana, Log.horario < fim_semana)
+         .group_by(func.date(Log.horario))),
+        ("usuario 42 (intervalo)",
+         db.session.query(Log.id)
+         .filter(Log.usuario_id == 42, Log.horario >= inicio_semana, Log.horario < fim_semana)),
+    ]
+
+
+def main():
+    quantidade = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    random.seed(42)
+
+    with tempfile.TemporaryDirectory() as pasta:
+        app = criar_app(os.path.join(pasta, "bench.db"))
+        with app.app_context():
+            db.create_all()
+            for indice in Log.__table__.indexes:
+                indice.drop(bind=db.engine, checkfirst=True)
+
+            print(f"Populando {quantidade} logs...")
+            popular(quantidade)
+
+            print("\nSEM índices secundários")
+            for rotulo, consulta in consultas():
+                medir(rotulo, consulta)
+
+            for indice in Log.__table__.indexes:
+                indice.create(bind=db.engine)
+            db.session.execute(text("ANALYZE"))
+
+            print("\nCOM índices de Log.__table_args__")
+            for rotulo, consulta in consultas():
+                medir(rotulo, consulta)
+
+
+if __name__ == "__main__":
+    main()
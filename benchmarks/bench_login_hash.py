@@ -0,0 +1,82 @@
+"""
+Benchmark — verificações de senha por segundo (logins sustentáveis por núcleo).
+
+Mede, para o método de hash configurado:
+  * na thread:  check_password_hash direto (como era em Usuario.checar_senha)
+  * no pool:    utils.senhas com SENHA_PROCESSOS processos e várias threads
+                simulando requisições de login simultâneas
+
+Com hash na thread, cada worker do servidor fica preso durante o hash; com o
+pool, o limite é o número de processos e o excedente recebe 503 rapidamente.
+
+Uso:
+    python benchmarks/bench_login_hash.py [metodo] [logins]
+    python benchmarks/bench_login_hash.py scrypt 200
+    python benchmarks/bench_login_hash.py pbkdf2:sha256:600000 100
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import Flask
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from utils.senhas import servico_senhas, SenhasOcupado
+
+
+def medir_na_thread(senha_hash, logins):
+    inicio = time.perf_counter()
+    for _ in range(logins):
+        check_password_hash(senha_hash, "senha-correta")
+    return logins / (time.perf_counter() - inicio)
+
+
+def medir_no_pool(senha_hash, logins, processos):
+    app = Flask(__name__)
+    app.config["SENHA_PROCESSOS"] = processos
+    app.config["SENHA_TIMEOUT"] = 30.0
+    servico_senhas.init_app(app)
+
+    # aquece o pool (criação dos processos fora da medição)
+    list(ThreadPoolExecutor(processos).map(lambda _: servico_senhas.verificar(senha_hash, "x"), range(processos)))
+
+    recusados = 0
+
+    def login(_):
+        nonlocal recusados
+        try:
+            servico_senhas.verificar(senha_hash, "senha-correta")
+        except SenhasOcupado:
+            recusados += 1
+
+    # 4 "requisições" por processo, como SENHA_FILA_MAX padrão
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=4 * processos) as requisicoes:
+        list(requisicoes.map(login, range(logins)))
+    return logins / (time.perf_counter() - inicio), recusados
+
+
+def main():
+    metodo = sys.argv[1] if len(sys.argv) > 1 else "scrypt"
+    logins = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    nucleos = os.cpu_count() or 1
+
+    senha_hash = generate_password_hash("senha-correta", metodo)
+    print(f"Método: {senha_hash.split('$', 1)[0]}   núcleos: {nucleos}   logins: {logins}\n")
+
+    por_segundo = medir_na_thread(senha_hash, logins)
+    print(f"  {'na thread (1 núcleo)':<28} {por_segundo:8.1f} logins/s   {1000 / por_segundo:7.1f} ms/login")
+
+    for processos in sorted({1, nucleos}):
+        por_segundo, recusados = medir_no_pool(senha_hash, logins, processos)
+        print(
+            f"  {f'pool ({processos} processos)':<28} {por_segundo:8.1f} logins/s   "
+            f"{por_segundo / processos:7.1f} por núcleo   recusados: {recusados}"
+        )
+
+
+if __name__ == "__main__":
+    main()
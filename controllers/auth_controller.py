@@ -2,6 +2,8 @@ from flask import Blueprint, render_template, request, redirect, url_for, sessio
 from models.usuario_model import Usuario
 from controllers.logs_controller import registrar_log
 from config import db
+from utils.senhas import SenhasOcupado
+from utils.limitador import limite_login_ip, limite_login_email, segundos_retry
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -19,11 +21,42 @@ def login():
         if request.method == "POST":
             email = request.form.get("email", "").strip()
             senha = request.form.get("senha", "")
+            ip = request.remote_addr or "desconhecido"
+
+            # Limites por IP e por e-mail antes de qualquer consulta ou hash
+            espera = limite_login_ip.tentar(ip) or limite_login_email.espera(email.lower())
+            if espera:
+                registrar_log(
+                    tipo_operacao="LOGIN_BLOQUEADO",
+                    tipo_modelo="Usuario",
+                    descricao=f"Tentativas de login acima do limite — email informado: {email}",
+                    agrupar=(ip, email.lower())
+                )
+                flash("Muitas tentativas de login. Aguarde alguns minutos e tente novamente.", "danger")
+                return render_template("login.html", titulo="Login"), 429, {"Retry-After": str(segundos_retry(espera))}
 
             usuario = Usuario.query.filter_by(email=email).first()
 
+            # Pool de hash saturado → 503, sem segurar o worker
+            try:
+                senha_ok = bool(usuario) and usuario.checar_senha(senha)
+            except SenhasOcupado:
+                flash("Muitos acessos no momento. Tente novamente em alguns segundos.", "warning")
+                return render_template("login.html", titulo="Login"), 503
+
             # LOGIN OK
-            if usuario and usuario.checar_senha(senha):
+            if senha_ok:
+                limite_login_email.limpar(email.lower())
+
+                # Custo do hash mudou desde o cadastro → regrava com o atual.
+                # É oportunista: com o pool ocupado fica para o próximo login.
+                try:
+                    if usuario.senha_desatualizada():
+                        usuario.set_senha(senha)
+                        db.session.commit()
+                except SenhasOcupado:
+                    db.session.rollback()
+
                 session["usuario_id"] = usuario.id
                 session["usuario_nome"] = usuario.name
                 session["usuario_perfil"] = usuario.perfil.value
@@ -38,10 +71,12 @@ def login():
                 return redirect(url_for("home"))
 
             # LOGIN FALHOU
+            limite_login_email.registrar(email.lower())
             registrar_log(
                 tipo_operacao="LOGIN_FALHO",
                 tipo_modelo="Usuario",
-                descricao=f"Tentativa de login falhou — email informado: {email}"
+                descricao=f"Tentativa de login falhou — email informado: {email}",
+                agrupar=(email.lower(), ip)
             )
 
             flash("E-mail ou senha inválidos!", "danger")
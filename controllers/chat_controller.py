@@ -6,14 +6,26 @@ from models.usuario_model import Usuario, PerfilEnum
 from models.chat_message_model import ChatMessage
 from models.chat_sessao_model import ChatSessao
 from config import db, socketio
+from utils.estado_sistema import lockdown_ativo
+from utils.presenca import presenca
+from utils.sessoes_chat import sessoes_chat
+from utils.historico_chat import pagina_historico, CursorInvalido
+from utils import identidade
 
 from flask_socketio import emit, join_room, leave_room
+from sqlalchemy import or_
 from datetime import datetime, timezone
 
 chat_bp = Blueprint("chat", __name__)
 
-# Mapa: { user_id : socket_sid }
-online_users = {}
+# Quem está online (vários sockets por usuário, todos os workers): utils/presenca.py
+
+# Perfis que cada perfil pode contatar (None = todos)
+PERFIS_CONTATO = {
+    PerfilEnum.FUNCIONARIO.value: [PerfilEnum.FUNCIONARIO],
+    PerfilEnum.GERENTE.value: [PerfilEnum.FUNCIONARIO, PerfilEnum.GERENTE],
+    PerfilEnum.ADMIN_SEGURANCA.value: None,
+}
 
 
 # ============================================================
@@ -39,60 +51,40 @@ def chat():
 @login_obrigatorio
 @verificar_lockdown
 def contatos():
-
-    usuario_logado = Usuario.query.get(session["usuario_id"])
-    perfil = usuario_logado.perfil
-
-    # ------------------------------
-    # 🔹 1) Permissões originais
-    # ------------------------------
-    if perfil == PerfilEnum.FUNCIONARIO:
-        permitidos = Usuario.query.filter(
-            Usuario.perfil == PerfilEnum.FUNCIONARIO,
-            Usuario.id != usuario_logado.id
-        ).all()
-
-    elif perfil == PerfilEnum.GERENTE:
-        permitidos = Usuario.query.filter(
-            Usuario.perfil.in_([PerfilEnum.FUNCIONARIO, PerfilEnum.GERENTE]),
-            Usuario.id != usuario_logado.id
-        ).all()
-
-    else:  # ADMIN
-        permitidos = Usuario.query.filter(
-            Usuario.id != usuario_logado.id
-        ).all()
+    # Parte dos ids online (não de todos os usuários/sessões): custo ~ nº de contatos online
+    uid = session["usuario_id"]
+    usuario_logado = identidade.obter(uid)
+    if usuario_logado is None:
+        return jsonify([])
 
     # ------------------------------
-    # 🔹 2) Sessões ativas (para manter conversas abertas)
+    # 🔹 1) Quem está online (menos o próprio usuário)
     # ------------------------------
-    sessoes = ChatSessao.query.filter_by(ativa=True).all()
+    online_ids = presenca.online() - {uid}
+    if not online_ids:
+        return jsonify([])
 
-    ids_sessao = []
-    for s in sessoes:
-        if s.usuario1_id == usuario_logado.id:
-            ids_sessao.append(s.usuario2_id)
-        elif s.usuario2_id == usuario_logado.id:
-            ids_sessao.append(s.usuario1_id)
+    consulta = Usuario.query.filter(Usuario.id.in_(online_ids))
 
     # ------------------------------
-    # 🔹 3) Somar permitidos + sessões
-    # ------------------------------
-    contatos_ids = {u.id for u in permitidos}
-    contatos_ids.update(ids_sessao)
-
+    # 🔹 2) Permissões originais + sessões ativas com esses online
+    #      (índices ix_chat_sessoes_usuario1_ativa / usuario2_ativa)
     # ------------------------------
-    # 🔹 4) Filtrar apenas os online
-    # ------------------------------
-    online_ids = [uid for uid in contatos_ids if uid in online_users]
+    permitidos = PERFIS_CONTATO.get(usuario_logado.perfil)
+    if permitidos is not None:
+        sessoes = db.session.query(ChatSessao.usuario1_id, ChatSessao.usuario2_id).filter(
+            ChatSessao.ativa.is_(True),
+            or_(
+                (ChatSessao.usuario1_id == uid) & ChatSessao.usuario2_id.in_(online_ids),
+                (ChatSessao.usuario2_id == uid) & ChatSessao.usuario1_id.in_(online_ids),
+            )
+        ).all()
+        ids_sessao = {u2 if u1 == uid else u1 for u1, u2 in sessoes}
 
-    # ------------------------------
-    # 🔹 5) Buscar apenas usuários online
-    # ------------------------------
-    usuarios_final = Usuario.query.filter(Usuario.id.in_(online_ids)).all()
+        consulta = consulta.filter(or_(Usuario.perfil.in_(permitidos), Usuario.id.in_(ids_sessao)))
 
     # ------------------------------
-    # 🔹 6) Resposta final
+    # 🔹 3) Resposta final
     # ------------------------------
     return jsonify([
         {
@@ -101,48 +93,20 @@ def contatos():
             "perfil": u.perfil.value,
             "online": True
         }
-        for u in usuarios_final
+        for u in consulta.all()
     ])
 
 
 # ============================================================
-# 3. Criar ou ativar sessão
-# ============================================================
-def criar_ou_ativar_sessao(user1, user2):
-
-    sessao = ChatSessao.query.filter(
-        ((ChatSessao.usuario1_id == user1) & (ChatSessao.usuario2_id == user2)) |
-        ((ChatSessao.usuario1_id == user2) & (ChatSessao.usuario2_id == user1))
-    ).first()
-
-    if sessao:
-        sessao.ativa = True
-    else:
-        db.session.add(ChatSessao(
-            usuario1_id=user1,
-            usuario2_id=user2,
-            ativa=True
-        ))
-
-    db.session.commit()
-
-
-# ============================================================
-# 4. Fechar sessão manualmente (REST)
+# 3. Fechar sessão manualmente (REST)
 # ============================================================
 @chat_bp.route("/chat/fechar/<int:contato_id>", methods=["POST"])
 @login_obrigatorio
 def fechar_sessao(contato_id):
     uid = session["usuario_id"]
 
-    sessao = ChatSessao.query.filter(
-        ((ChatSessao.usuario1_id == uid) & (ChatSessao.usuario2_id == contato_id)) |
-        ((ChatSessao.usuario1_id == contato_id) & (ChatSessao.usuario2_id == uid))
-    ).first()
-
-    if sessao:
-        sessao.ativa = False
-        db.session.commit()
+    sessoes_chat.fechar(uid, contato_id)
+    db.session.commit()
 
     # Mensagem em tempo real para o outro usuário
     socketio.emit(
@@ -155,7 +119,7 @@ def fechar_sessao(contato_id):
 
 
 # ============================================================
-# 5. SOCKET — Conexão
+# 4. SOCKET — Conexão
 # ============================================================
 @socketio.on("connect")
 def handle_connect():
@@ -164,9 +128,12 @@ def handle_connect():
         if not uid:
             return
 
-        online_users[uid] = request.sid
         join_room(uid)
 
+        # Segunda aba do mesmo usuário não reanuncia
+        if not presenca.conectar(uid, request.sid):
+            return
+
         emit("user_online", {
             "id": uid,
             "nome": session["usuario_nome"],
@@ -178,7 +145,7 @@ def handle_connect():
 
 
 # ============================================================
-# 6. SOCKET — Desconexão
+# 5. SOCKET — Desconexão
 # ============================================================
 @socketio.on("disconnect")
 def handle_disconnect():
@@ -187,9 +154,12 @@ def handle_disconnect():
         if not uid:
             return
 
-        online_users.pop(uid, None)
         leave_room(uid)
 
+        # Ainda há outra aba aberta (neste ou em outro worker)
+        if not presenca.desconectar(uid, request.sid):
+            return
+
         emit("user_offline", {"id": uid}, broadcast=True)
 
     except Exception as e:
@@ -197,21 +167,31 @@ def handle_disconnect():
 
 
 # ============================================================
-# 7. SOCKET — Enviar mensagem
+# 6. SOCKET — Enviar mensagem
 # ============================================================
 @socketio.on("send_message")
 def handle_send_message(data):
     try:
         de_id = session["usuario_id"]
         de_nome = session["usuario_nome"]
-        para_id = data.get("para")
         texto = data.get("texto", "").strip()
 
+        # "para" vem do cliente: id inválido não chega ao banco nem ao par da sessão
+        try:
+            para_id = int(data.get("para"))
+        except (TypeError, ValueError):
+            para_id = 0
+        if para_id <= 0:
+            emit("erro_chat", {"erro": "Destinatário inválido."}, room=request.sid)
+            return
+
         if not texto:
             return
 
-        # ativa/reativa sessão
-        criar_ou_ativar_sessao(de_id, para_id)
+        # Lockdown: o socket já aberto não passa pelo verificar_lockdown das rotas
+        if lockdown_ativo() and session.get("usuario_perfil") != PerfilEnum.ADMIN_SEGURANCA.value:
+            emit("estado_sistema", {"chave": "lockdown", "valor": True}, room=request.sid)
+            return
 
         ts = datetime.utcnow().replace(tzinfo=timezone.utc)
 
@@ -223,6 +203,9 @@ def handle_send_message(data):
             horario=ts
         )
         db.session.add(msg)
+
+        # ativa/reativa sessão na mesma transação (par em cache = nenhum SQL extra)
+        sessoes_chat.ativar(de_id, para_id)
         db.session.commit()
 
         # envia para outro
@@ -253,29 +236,21 @@ def handle_send_message(data):
 
 
 # ============================================================
-# 8. SOCKET — Carregar histórico
+# 7. SOCKET — Carregar histórico
 # ============================================================
 @socketio.on("load_messages")
 def handle_load_messages(data):
     try:
         usuario_id = session["usuario_id"]
         contato_id = data.get("para")
+        antes = data.get("antes")
 
-        mensagens = ChatMessage.query.filter(
-            ((ChatMessage.de_id == usuario_id) & (ChatMessage.para_id == contato_id)) |
-            ((ChatMessage.de_id == contato_id) & (ChatMessage.para_id == usuario_id))
-        ).order_by(ChatMessage.horario.asc()).all()
+        # Página mais recente; com "antes", as anteriores a esse id
+        pagina = pagina_historico(usuario_id, contato_id, antes=antes, limite=data.get("limite"))
 
         emit(
             "load_messages_response",
-            [
-                {
-                    "de": m.de_id,
-                    "texto": m.texto,
-                    "horario": m.horario.isoformat()
-                }
-                for m in mensagens
-            ],
+            {"para": contato_id, "antes": antes, **pagina},
             room=request.sid
         )
 
@@ -284,7 +259,7 @@ def handle_load_messages(data):
 
 
 # ============================================================
-# 9. REST — Histórico HTTP
+# 8. REST — Histórico HTTP (?antes=<id>&limite=<n>)
 # ============================================================
 @chat_bp.route("/chat/historico/<int:contato_id>")
 @login_obrigatorio
@@ -292,16 +267,14 @@ def handle_load_messages(data):
 def historico(contato_id):
     usuario_id = session["usuario_id"]
 
-    mensagens = ChatMessage.query.filter(
-        ((ChatMessage.de_id == usuario_id) & (ChatMessage.para_id == contato_id)) |
-        ((ChatMessage.de_id == contato_id) & (ChatMessage.para_id == usuario_id))
-    ).order_by(ChatMessage.horario.asc()).all()
+    try:
+        pagina = pagina_historico(
+            usuario_id,
+            contato_id,
+            antes=request.args.get("antes"),
+            limite=request.args.get("limite")
+        )
+    except CursorInvalido as e:
+        return jsonify({"erro": str(e)}), 400
 
-    return jsonify([
-        {
-            "de": m.de_id,
-            "texto": m.texto,
-            "horario": m.horario.isoformat()
-        }
-        for m in mensagens
-    ])
+    return jsonify(pagina)
@@ -1,29 +1,63 @@
-from flask import Blueprint, render_template, request, jsonify, current_app
+from flask import Blueprint, render_template, request, jsonify, current_app, session
 from utils.decorators import login_obrigatorio, perfil_obrigatorio, verificar_lockdown
-from models.usuario_model import Usuario, PerfilEnum
-from models.veiculo_model import Veiculo
-from models.equipamento_model import Equipamento
+from models.usuario_model import PerfilEnum
 from models.log_model import Log
-from config import db
-from sqlalchemy import func
-from datetime import datetime, timedelta, timezone
-from zoneinfo import ZoneInfo
+from config import db, socketio
+from utils.tempo import utc_to_brasil, hoje_brasil
+from utils.agregados_dashboard import resumo_entidade, resumo_logs_dashboard
+from utils.tabelas_dashboard import TABELAS, ParametroInvalido, pagina_tabela, contar
+from utils.cache import cache_dashboard
+from utils.gravador_logs import gravador_logs
+from utils.versoes import condicional
+from utils.dashboard_ao_vivo import emissor_dashboard, NAMESPACE as NAMESPACE_DASHBOARD
+from utils.analise_tempo import IntervaloInvalido, serie_temporal, MAX_PONTOS, MAX_DIAS
+from datetime import date, timedelta
 
 dashboard_bp = Blueprint("dashboard", __name__)
 
-# ============================================
-# Fuso horário — Brasil (UTC-3)
-# ============================================
-FUSO_BR = ZoneInfo("America/Sao_Paulo")
 
-def ajustar_para_brasil(dt):
-    """Converte datetime UTC para horário do Brasil (UTC-3)."""
-    if not dt:
-        return None
-    # garante que dt_utc é timezone-aware em UTC
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=timezone.utc)
-    return dt.astimezone(FUSO_BR)
+# ====================================================
+# AGREGADOS EM CACHE
+# ====================================================
+# Etiquetas: "usuarios", "veiculos", "equipamentos" (invalidadas pelos CRUDs)
+# e "logs" (invalidada após cada lote gravado pelo gravador de logs).
+@gravador_logs.apos_commit
+def invalidar_cache_logs(registros):
+    cache_dashboard.invalidar("logs")
+
+
+def resumo(entidade):
+    """Card + séries da entidade (utils.agregados_dashboard), em cache."""
+    return cache_dashboard.obter(f"{entidade}:resumo", lambda: resumo_entidade(entidade), etiquetas=(entidade,))
+
+
+def resumo_logs():
+    return cache_dashboard.obter(f"logs:resumo:{hoje_brasil()}", resumo_logs_dashboard, etiquetas=("logs",))
+
+
+# Tabelas de que cada resposta JSON depende (ETag)
+DEPENDENCIAS = {
+    "usuarios": ("usuarios", "logs"),
+    "veiculos": ("veiculos",),
+    "equipamentos": ("equipamentos",),
+}
+
+
+def ultimos_logs(limite=20):
+    def calcular():
+        return [
+            {
+                "id": log.id,
+                "horario_brasil": utc_to_brasil(log.horario),
+                "usuario_nome": log.usuario_nome,
+                "tipo_operacao": log.tipo_operacao,
+                "descricao": log.descricao
+            }
+            for log in Log.query.order_by(Log.id.desc()).limit(limite).all()
+        ]
+
+    return cache_dashboard.obter(f"logs:ultimos:{limite}", calcular, etiquetas=("logs",))
+
 
 # ====================================================
 # DASHBOARD PRINCIPAL (ADMIN DE SEGURANÇA)
@@ -35,72 +69,25 @@ def ajustar_para_brasil(dt):
 def dashboard():
     try:
         # ==============================
-        # RESUMO
+        # RESUMO (uma consulta por entidade)
         # ==============================
-        total_usuarios = Usuario.query.count()
-        total_veiculos = Veiculo.query.count()
-        total_equipamentos = Equipamento.query.count()
+        usuarios = resumo("usuarios")
+        logs = resumo_logs()
 
-        # ==============================
-        # ACESSOS NEGADOS HOJE
-        # ==============================
-        hoje = datetime.now(FUSO_BR).date()
-
-        acessos_negados_hoje = (
-            Log.query
-            .filter(Log.tipo_operacao == "ACESSO_NEGADO")
-            .filter(func.date(Log.horario) == hoje)
-            .count()
-        )
-
-        # ==============================
-        # USUÁRIOS POR PERFIL
-        # ==============================
-        usuarios_por_perfil = (
-            db.session.query(Usuario.perfil, func.count(Usuario.id))
-            .group_by(Usuario.perfil)
-            .all()
-        )
-
-        grafico_usuarios_labels = [perfil.value for perfil, _ in usuarios_por_perfil]
-        grafico_usuarios_valores = [qtd for _, qtd in usuarios_por_perfil]
-
-        # ==============================
-        # LOGINS ÚLTIMOS 7 DIAS
-        # ==============================
-        sete_dias_atras = datetime.now(FUSO_BR) - timedelta(days=7)
-
-        logins_por_dia = (
-            db.session.query(func.date(Log.horario), func.count(Log.id))
-            .filter(Log.tipo_operacao == "LOGIN_SUCESSO")
-            .filter(Log.horario >= sete_dias_atras)
-            .group_by(func.date(Log.horario))
-            .order_by(func.date(Log.horario))
-            .all()
-        )
+        total_usuarios = usuarios["total"]
+        total_veiculos = resumo("veiculos")["total"]
+        total_equipamentos = resumo("equipamentos")["total"]
+        negados_hoje = logs["acessos_negados_hoje"]
 
-        grafico_login_labels = [str(data) for data, _ in logins_por_dia]
-        grafico_login_valores = [qtd for _, qtd in logins_por_dia]
-
-        # ==============================
-        # OPERACOES POR TIPO
-        # ==============================
-        operacoes = (
-            db.session.query(Log.tipo_operacao, func.count(Log.id))
-            .group_by(Log.tipo_operacao)
-            .all()
-        )
-
-        grafico_operacao_labels = [op for op, _ in operacoes]
-        grafico_operacao_valores = [qtd for _, qtd in operacoes]
+        # Usuários por perfil / logins últimos 7 dias / operações por tipo
+        grafico_usuarios = usuarios["series"]["perfil"]
+        grafico_login = logs["series"]["logins"]
+        grafico_operacao = logs["series"]["operacoes"]
 
         # ==============================
         # ÚLTIMOS LOGS
         # ==============================
-        ultimos_logs = Log.query.order_by(Log.id.desc()).limit(20).all()
-
-        for log in ultimos_logs:
-            log.horario_brasil = ajustar_para_brasil(log.horario)
+        logs_recentes = ultimos_logs(20)
 
         # ==============================
         # RENDERIZAÇÃO
@@ -111,17 +98,17 @@ def dashboard():
             total_usuarios=total_usuarios,
             total_veiculos=total_veiculos,
             total_equipamentos=total_equipamentos,
-            acessos_negados_hoje=acessos_negados_hoje,
+            acessos_negados_hoje=negados_hoje,
 
             # gráficos iniciais do servidor
-            grafico_usuarios_labels=grafico_usuarios_labels,
-            grafico_usuarios_valores=grafico_usuarios_valores,
-            grafico_login_labels=grafico_login_labels,
-            grafico_login_valores=grafico_login_valores,
-            grafico_operacao_labels=grafico_operacao_labels,
-            grafico_operacao_valores=grafico_operacao_valores,
-
-            ultimos_logs=ultimos_logs
+            grafico_usuarios_labels=grafico_usuarios["labels"],
+            grafico_usuarios_valores=grafico_usuarios["values"],
+            grafico_login_labels=grafico_login["labels"],
+            grafico_login_valores=grafico_login["values"],
+            grafico_operacao_labels=grafico_operacao["labels"],
+            grafico_operacao_valores=grafico_operacao["values"],
+
+            ultimos_logs=logs_recentes
         )
 
     except Exception as e:
@@ -132,6 +119,38 @@ def dashboard():
 
 
 
+# ====================================================
+# API — RESUMO COMPLETO (cards + séries, um JSON)
+# ====================================================
+@dashboard_bp.route("/dashboard/resumo")
+@login_obrigatorio
+@perfil_obrigatorio(PerfilEnum.ADMIN_SEGURANCA)
+@verificar_lockdown
+@condicional(lambda: ("usuarios", "veiculos", "equipamentos", "logs"))
+def dashboard_resumo():
+    """Todos os cards e séries: uma consulta por entidade (ou nenhuma, com cache)."""
+    try:
+        entidades = {entidade: resumo(entidade) for entidade in ("usuarios", "veiculos", "equipamentos")}
+        logs = resumo_logs()
+
+        return jsonify({
+            "cards": {
+                "usuarios": entidades["usuarios"]["total"],
+                "veiculos": entidades["veiculos"]["total"],
+                "equipamentos": entidades["equipamentos"]["total"],
+                "acessos_negados_hoje": logs["acessos_negados_hoje"]
+            },
+            "series": {
+                **{entidade: dados["series"] for entidade, dados in entidades.items()},
+                "logs": logs["series"]
+            }
+        })
+
+    except Exception as e:
+        current_app.logger.exception(f"Erro no resumo do dashboard: {e}")
+        return jsonify({"error": "Erro interno"}), 500
+
+
 # ====================================================
 # API — DADOS DO DASHBOARD (JSON)
 # ====================================================
@@ -139,6 +158,7 @@ def dashboard():
 @login_obrigatorio
 @perfil_obrigatorio(PerfilEnum.ADMIN_SEGURANCA)
 @verificar_lockdown
+@condicional(lambda entity: DEPENDENCIAS.get(entity))
 def dashboard_data(entity):
     try:
 
@@ -146,51 +166,23 @@ def dashboard_data(entity):
         # USUÁRIOS
         # =====================================================
         if entity == "usuarios":
-            usuarios_por_perfil = (
-                db.session.query(Usuario.perfil, func.count(Usuario.id))
-                .group_by(Usuario.perfil)
-                .all()
-            )
-
             chart_main = {
                 "type": "pie",
-                "labels": [perfil.value for perfil, _ in usuarios_por_perfil],
-                "values": [qtd for _, qtd in usuarios_por_perfil],
+                **resumo("usuarios")["series"]["perfil"],
                 "title": "Distribuição por Perfil"
             }
 
             # gráfico secundário = logins últimos 7 dias
-            sete_dias_atras = datetime.now(FUSO_BR) - timedelta(days=7)
-            logins = (
-                db.session.query(func.date(Log.horario), func.count(Log.id))
-                .filter(Log.tipo_operacao == "LOGIN_SUCESSO")
-                .filter(Log.horario >= sete_dias_atras)
-                .group_by(func.date(Log.horario))
-                .all()
-            )
-
             chart2 = {
                 "type": "line",
-                "labels": [str(d) for d, _ in logins],
-                "values": [q for _, q in logins],
+                **resumo_logs()["series"]["logins"],
                 "title": "Logins - Últimos 7 dias"
             }
 
-            rows = [
-                {
-                    "ID": u.id,
-                    "Nome": u.name,
-                    "Email": u.email,
-                    "Perfil": u.perfil.value
-                }
-                for u in Usuario.query.order_by(Usuario.id.desc()).all()
-            ]
-
             return jsonify({
                 "entity": "usuarios",
                 "chart": chart_main,
-                "chart2": chart2,
-                "table": rows
+                "chart2": chart2
             })
 
 
@@ -199,52 +191,26 @@ def dashboard_data(entity):
         # =====================================================
         if entity == "veiculos":
 
-            # gráfico principal = situação
-            por_situacao = (
-                db.session.query(Veiculo.situacao, func.count(Veiculo.id))
-                .group_by(Veiculo.situacao)
-                .all()
-            )
-            
+            series = resumo("veiculos")["series"]
 
+            # gráfico principal = situação
             chart_main = {
                 "type": "pie",
-                "labels": [sit for sit, _ in por_situacao],
-                "values": [qtd for _, qtd in por_situacao],
+                **series["situacao"],
                 "title": "Situação dos Veículos"
             }
 
             # gráfico secundário = quantidade por localidade (exemplo)
-            por_local = (
-                db.session.query(Veiculo.local_armazenamento, func.count(Veiculo.id))
-                .group_by(Veiculo.local_armazenamento)
-                .all()
-            )
-
             chart2 = {
                 "type": "bar",
-                "labels": [(loc if loc else "Não informado") for loc, _ in por_local],
-                "values": [qtd for _, qtd in por_local],
+                **series["local"],
                 "title": "Localização dos Veículos"
             }
 
-            rows = [
-                {
-                    "ID": v.id,
-                    "Marca": v.marca,
-                    "Modelo": v.modelo,
-                    "Ano": v.ano_fabricacao,
-                    "Situação": v.situacao,
-                    "Localização": v.local_armazenamento
-                }
-                for v in Veiculo.query.order_by(Veiculo.id.desc()).all()
-            ]
-
             return jsonify({
                 "entity": "veiculos",
                 "chart": chart_main,
-                "chart2": chart2,
-                "table": rows
+                "chart2": chart2
             })
 
 
@@ -253,50 +219,26 @@ def dashboard_data(entity):
         # =====================================================
         if entity == "equipamentos":
 
-            # gráfico principal = nível de perigo
-            por_perigo = (
-                db.session.query(Equipamento.nivel_perigo, func.count(Equipamento.id))
-                .group_by(Equipamento.nivel_perigo)
-                .all()
-            )
+            series = resumo("equipamentos")["series"]
 
+            # gráfico principal = nível de perigo
             chart_main = {
                 "type": "bar",
-                "labels": [n for n, _ in por_perigo],
-                "values": [qtd for _, qtd in por_perigo],
+                **series["perigo"],
                 "title": "Nível de Perigo"
             }
 
             # gráfico secundário = situação
-            por_situacao = (
-                db.session.query(Equipamento.situacao, func.count(Equipamento.id))
-                .group_by(Equipamento.situacao)
-                .all()
-            )
-
             chart2 = {
                 "type": "pie",
-                "labels": [s for s, _ in por_situacao],
-                "values": [qtd for _, qtd in por_situacao],
+                **series["situacao"],
                 "title": "Situação dos Equipamentos"
             }
 
-            rows = [
-                {
-                    "ID": e.id,
-                    "Nome": e.nome,
-                    "Qtd": e.quantidade,
-                    "Situação": e.situacao,
-                    "Perigo": e.nivel_perigo
-                }
-                for e in Equipamento.query.order_by(Equipamento.id.desc()).all()
-            ]
-
             return jsonify({
                 "entity": "equipamentos",
                 "chart": chart_main,
-                "chart2": chart2,
-                "table": rows
+                "chart2": chart2
             })
 
 
@@ -306,3 +248,104 @@ def dashboard_data(entity):
     except Exception as e:
         current_app.logger.exception(f"Erro na API dashboard: {e}")
         return jsonify({"error": "Erro interno"}), 500
+
+
+# ====================================================
+# API — TABELA PAGINADA (cursor, ordenação e filtros)
+# ====================================================
+@dashboard_bp.route("/dashboard/data/<entity>/tabela", methods=["GET"])
+@login_obrigatorio
+@perfil_obrigatorio(PerfilEnum.ADMIN_SEGURANCA)
+@verificar_lockdown
+@condicional(lambda entity: (entity,) if entity in TABELAS else None)
+def dashboard_tabela(entity):
+    """?ordem=&direcao=asc|desc&limite=&depois=<cursor>&<filtro>=<valor>"""
+    if entity not in TABELAS:
+        return jsonify({"error": "entity inválida"}), 400
+
+    try:
+        pagina = pagina_tabela(entity, request.args)
+
+        filtros = {p: request.args[p] for p in TABELAS[entity]["filtros"] if request.args.get(p)}
+        chave = f"{entity}:total:" + "&".join(f"{p}={v}" for p, v in sorted(filtros.items()))
+        pagina["total"] = cache_dashboard.obter(chave, lambda: contar(entity, filtros), etiquetas=(entity,))
+
+        return jsonify(pagina)
+
+    except ParametroInvalido as e:
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        current_app.logger.exception(f"Erro na tabela do dashboard: {e}")
+        return jsonify({"error": "Erro interno"}), 500
+
+
+# ====================================================
+# API — SÉRIE TEMPORAL DE LOGS (hora / dia / semana)
+# ====================================================
+@dashboard_bp.route("/dashboard/serie")
+@login_obrigatorio
+@perfil_obrigatorio(PerfilEnum.ADMIN_SEGURANCA)
+@verificar_lockdown
+@condicional(lambda: ("logs",))
+def dashboard_serie():
+    """?operacao=LOGIN_SUCESSO&inicio=AAAA-MM-DD&fim=AAAA-MM-DD&granularidade=hora|dia|semana&max_pontos="""
+    operacao = request.args.get("operacao", "LOGIN_SUCESSO").strip().upper()
+    granularidade = request.args.get("granularidade", "dia")
+
+    try:
+        fim = date.fromisoformat(request.args["fim"]) if request.args.get("fim") else hoje_brasil()
+        inicio = date.fromisoformat(request.args["inicio"]) if request.args.get("inicio") else fim - timedelta(days=6)
+        max_pontos = min(max(int(request.args.get("max_pontos", MAX_PONTOS)), 2), 2000)
+    except ValueError:
+        return jsonify({"error": "inicio/fim devem ser AAAA-MM-DD e max_pontos um inteiro"}), 400
+
+    # Recusa antes de montar a chave do cache e qualquer balde
+    if (fim - inicio).days + 1 > MAX_DIAS:
+        return jsonify({"error": f"intervalo máximo: {MAX_DIAS} dias"}), 400
+
+    try:
+        chave = f"logs:serie:{operacao}:{inicio}:{fim}:{granularidade}:{max_pontos}"
+        serie = cache_dashboard.obter(
+            chave,
+            lambda: serie_temporal(operacao, inicio, fim, granularidade, max_pontos),
+            etiquetas=("logs",)
+        )
+        return jsonify({"operacao": operacao, "inicio": inicio.isoformat(), "fim": fim.isoformat(), **serie})
+
+    except IntervaloInvalido as e:
+        return jsonify({"error": str(e)}), 400
+
+    except Exception as e:
+        current_app.logger.exception(f"Erro na série temporal: {e}")
+        return jsonify({"error": "Erro interno"}), 500
+
+
+# ====================================================
+# API — ESTATÍSTICAS DO CACHE
+# ====================================================
+@dashboard_bp.route("/dashboard/cache/status")
+@login_obrigatorio
+@perfil_obrigatorio(PerfilEnum.ADMIN_SEGURANCA)
+def status_cache():
+    return jsonify({**cache_dashboard.estatisticas(), "ao_vivo": emissor_dashboard.estatisticas()})
+
+
+# ====================================================
+# SOCKET — DASHBOARD AO VIVO (somente ADMIN_SEGURANCA)
+# ====================================================
+def _admin_seguranca():
+    return session.get("usuario_perfil") == PerfilEnum.ADMIN_SEGURANCA.value
+
+
+@socketio.on("connect", namespace=NAMESPACE_DASHBOARD)
+def dashboard_ao_vivo_conectar():
+    # Retornar False recusa a conexão
+    if not _admin_seguranca():
+        return False
+    emissor_dashboard.inscrever(request.sid)
+
+
+@socketio.on("disconnect", namespace=NAMESPACE_DASHBOARD)
+def dashboard_ao_vivo_desconectar(*args):
+    emissor_dashboard.cancelar(request.sid)
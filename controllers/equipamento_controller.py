@@ -4,6 +4,7 @@ from models.equipamento_model import Equipamento
 from models.usuario_model import PerfilEnum
 from utils.decorators import login_obrigatorio, perfil_obrigatorio, verificar_lockdown
 from controllers.logs_controller import registrar_log
+from utils.cache import cache_dashboard
 from datetime import datetime
 
 
@@ -70,6 +71,7 @@ def cadastrar_equipamento():
 
             db.session.add(novo)
             db.session.commit()
+            cache_dashboard.invalidar("equipamentos")
 
             registrar_log(
                 tipo_operacao="CRIAR",
@@ -80,7 +82,8 @@ def cadastrar_equipamento():
                     "quantidade": quantidade,
                     "vencimento": data_vencimento_str,
                     "situacao": situacao
-                }
+                },
+                entidade_id=novo.id
             )
 
             flash("Equipamento cadastrado com sucesso!", "success")
@@ -161,6 +164,7 @@ def editar_equipamento(id):
                 return redirect(url_for("editar_equipamento", id=id))
 
             db.session.commit()
+            cache_dashboard.invalidar("equipamentos")
 
             registrar_log(
                 tipo_operacao="ATUALIZAR",
@@ -173,7 +177,8 @@ def editar_equipamento(id):
                     "nivel_perigo": equipamento.nivel_perigo,
                     "situacao": equipamento.situacao,
                     "vencimento": str(equipamento.data_vencimento)
-                }}
+                }},
+                entidade_id=id
             )
 
             flash("Equipamento atualizado com sucesso!", "success")
@@ -238,12 +243,14 @@ def deletar_equipamento(id):
 
         db.session.delete(equipamento)
         db.session.commit()
+        cache_dashboard.invalidar("equipamentos")
 
         registrar_log(
             tipo_operacao="DELETAR",
             tipo_modelo="Equipamento",
             descricao=f"Equipamento deletado: {info['nome']}",
-            modificacoes=info
+            modificacoes=info,
+            entidade_id=id
         )
 
         flash("Equipamento deletado com sucesso!", "success")
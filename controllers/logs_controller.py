@@ -1,74 +1,154 @@
 from flask import (
     Blueprint, render_template, request, redirect,
-    url_for, flash, session, make_response, current_app
+    url_for, flash, session, current_app, jsonify,
+    Response, stream_with_context
 )
-from config import db
+from config import db, socketio
+from flask_socketio import emit
 from models.log_model import Log
 from utils.decorators import login_obrigatorio, perfil_obrigatorio, verificar_lockdown
+from utils.gravador_logs import gravador_logs
+from utils.tempo import utc_to_brasil, intervalo_datas_utc
+from utils.busca_logs import buscar_logs, fts_disponivel
+from utils.arquivo_logs import lotes_arquivados, buscar_arquivados
+from utils.alteracoes_logs import normalizar_modificacoes, historico_registro, alteracoes_do_campo
+from utils.tail_logs import emissor_logs, NAMESPACE as NAMESPACE_LOGS
+from utils import limitador
 from models.usuario_model import PerfilEnum
 from datetime import datetime, timezone
-from zoneinfo import ZoneInfo
+from sqlalchemy import func
 import csv
 import io
 import json
+import time
+import zlib
 
 logs_bp = Blueprint("logs", __name__)
 
+# Paginação da listagem
+POR_PAGINA_PADRAO = 50
+POR_PAGINA_MAX = 500
+LIMITE_CONTAGEM = 10000
+CAMPOS_FILTRO = ("usuario", "tipo", "data_inicio", "data_fim")
+
 # ================================================================
-# FUSO HORÁRIO DO BRASIL (OFICIAL)
+# REGISTRAR LOG
 # ================================================================
-FUSO_BR = ZoneInfo("America/Sao_Paulo")
+def registrar_log(tipo_operacao: str, tipo_modelo: str, descricao: str, modificacoes=None, entidade_id=None, agrupar=None):
+    """Monta o registro com os dados da sessão e entrega ao gravador em lote.
+
+    `modificacoes` é gravado como JSON canônico; `entidade_id` identifica o
+    registro afetado e permite consultar o histórico de alterações dele.
+    `agrupar` (tupla) agrega repetições da mesma operação + chave num
+    log-resumo periódico (utils.limitador) em vez de uma linha por evento.
+    """
+    try:
+        modificacoes = normalizar_modificacoes(modificacoes, entidade_id)
+
+        dados = {
+            "horario": datetime.now(timezone.utc),
+            "usuario_id": session.get("usuario_id", 0),
+            "usuario_nome": session.get("usuario_nome", "Sistema"),
+            "usuario_perfil": session.get("usuario_perfil", "N/A"),
+            "tipo_operacao": tipo_operacao,
+            "tipo_modelo": tipo_modelo,
+            "descricao": descricao,
+            "modificacoes": modificacoes
+        }
+
+        if agrupar:
+            limitador.agregador_negacoes.registrar((tipo_operacao, *agrupar), dados)
+        else:
+            gravador_logs.registrar(dados)
+
+    except Exception:
+        current_app.logger.exception("Falha ao registrar log %s", tipo_operacao)
 
-def utc_to_brasil(dt_utc):
-    if not dt_utc:
-        return None
-    # garante que dt_utc é timezone-aware em UTC
-    if dt_utc.tzinfo is None:
-        dt_utc = dt_utc.replace(tzinfo=timezone.utc)
-    return dt_utc.astimezone(FUSO_BR)
 
 # ================================================================
-# REGISTRAR LOG
+# FILTROS (compartilhados entre listagem e exportações)
 # ================================================================
-def registrar_log(tipo_operacao: str, tipo_modelo: str, descricao: str, modificacoes=None):
+def ler_filtros(args):
+    """Lê usuario/tipo/data_inicio/data_fim da query string (None se as datas forem inválidas).
+
+    Datas são dias locais do Brasil, ambas inclusivas → intervalo [início, fim) em UTC.
+    """
+    data_inicio = args.get("data_inicio")
+    data_fim = args.get("data_fim")
+
     try:
-        usuario_id = session.get("usuario_id", 0)
-        usuario_nome = session.get("usuario_nome", "Sistema")
-        usuario_perfil = session.get("usuario_perfil", "N/A")
-
-        if isinstance(modificacoes, dict):
-            modificacoes = json.dumps(modificacoes, ensure_ascii=False)
-
-        novo_log = Log(
-            usuario_id=usuario_id,
-            usuario_nome=usuario_nome,
-            usuario_perfil=usuario_perfil,
-            tipo_operacao=tipo_operacao,
-            tipo_modelo=tipo_modelo,
-            descricao=descricao,
-            modificacoes=modificacoes
+        inicio, fim = intervalo_datas_utc(
+            datetime.strptime(data_inicio, "%Y-%m-%d").date() if data_inicio else None,
+            datetime.strptime(data_fim, "%Y-%m-%d").date() if data_fim else None
         )
+    except ValueError:
+        return None
+
+    return {
+        "usuario": args.get("usuario") or None,
+        "tipo": args.get("tipo") or None,
+        "inicio": inicio,
+        "fim": fim
+    }
+
+
+def filtrar_logs(query, args):
+    """Aplica os filtros usuario/tipo/data_inicio/data_fim da query string.
+
+    Retorna (query, datas_validas).
+    """
+    filtros = ler_filtros(args)
+    if filtros is None:
+        return query, False
+
+    # Filtro de usuário
+    if filtros["usuario"]:
+        query = query.filter(Log.usuario_nome.ilike(f"%{filtros['usuario']}%"))
+
+    # Filtro de operação
+    if filtros["tipo"]:
+        query = query.filter(Log.tipo_operacao.ilike(f"%{filtros['tipo']}%"))
+
+    # Filtro de datas
+    if filtros["inicio"]:
+        query = query.filter(Log.horario >= filtros["inicio"])
+    if filtros["fim"]:
+        query = query.filter(Log.horario < filtros["fim"])
+
+    return query, True
+
 
-        db.session.add(novo_log)
-        db.session.commit()
+def filtros_do_arquivo(args):
+    """Filtros para os segmentos arquivados, ou None se a consulta não precisa deles.
 
-    except Exception as e:
-        db.session.rollback()
+    O arquivo só é lido quando há data_inicio: sem data, a listagem e as
+    exportações mostram apenas a tabela viva.
+    """
+    filtros = ler_filtros(args)
+    if filtros is None or filtros["inicio"] is None:
+        return None
+    return filtros
+
+
+def iterar_em_lotes(query, tamanho_lote=1000, crescente=False):
+    """Percorre a query em lotes por Log.id (keyset), decrescente por padrão.
 
-        try:
-            erro_log = Log(
-                usuario_id=0,
-                usuario_nome="Sistema",
-                usuario_perfil="N/A",
-                tipo_operacao="ERRO_LOG",
-                tipo_modelo="Log",
-                descricao=f"Falha ao salvar log original: {e}",
-                modificacoes=None
-            )
-            db.session.add(erro_log)
-            db.session.commit()
-        except:
-            db.session.rollback()
+    A query deve projetar Log.id como primeira coluna; as linhas não entram no
+    identity map, então a memória fica constante independente do tamanho da tabela.
+    """
+    ultimo_id = None
+    while True:
+        pagina = query
+        if ultimo_id is not None:
+            pagina = pagina.filter(Log.id > ultimo_id if crescente else Log.id < ultimo_id)
+
+        ordem = Log.id.asc() if crescente else Log.id.desc()
+        linhas = pagina.order_by(ordem).limit(tamanho_lote).all()
+        if not linhas:
+            return
+
+        yield linhas
+        ultimo_id = linhas[-1][0]
 
 
 # ================================================================
@@ -80,46 +160,89 @@ def registrar_log(tipo_operacao: str, tipo_modelo: str, descricao: str, modifica
 @verificar_lockdown
 def listar_logs():
 
-    query = Log.query
-
-    # Filtro de usuário
-    usuario = request.args.get("usuario")
-    if usuario:
-        query = query.filter(Log.usuario_nome.ilike(f"%{usuario}%"))
-
-    # Filtro de operação
-    tipo = request.args.get("tipo")
-    if tipo:
-        query = query.filter(Log.tipo_operacao.ilike(f"%{tipo}%"))
-
-    # Filtro de datas
-    data_inicio = request.args.get("data_inicio")
-    data_fim = request.args.get("data_fim")
-
-    try:
-        if data_inicio:
-            dt_inicio = datetime.strptime(data_inicio, "%Y-%m-%d")
-            query = query.filter(Log.horario >= dt_inicio)
-
-        if data_fim:
-            dt_fim = datetime.strptime(data_fim, "%Y-%m-%d")
-            query = query.filter(Log.horario <= dt_fim)
-    except Exception:
+    query, datas_validas = filtrar_logs(Log.query, request.args)
+    if not datas_validas:
         flash("Datas inválidas no filtro!", "danger")
 
-    logs = query.order_by(Log.id.desc()).all()
-
-    # Converte horário para o Brasil
+    # Paginação por cursor em Log.id (sem OFFSET)
+    por_pagina = min(max(request.args.get("por_pagina", POR_PAGINA_PADRAO, type=int), 1), POR_PAGINA_MAX)
+    antes = request.args.get("antes", type=int)
+    depois = request.args.get("depois", type=int)
+
+    # Logs já arquivados entram quando o filtro de data alcança os segmentos
+    filtros_arquivo = filtros_do_arquivo(request.args)
+
+    if depois is not None:
+        # Página anterior: busca os mais novos em ordem crescente e inverte
+        logs = query.filter(Log.id > depois).order_by(Log.id.asc()).limit(por_pagina + 1).all()
+        if filtros_arquivo:
+            logs += buscar_arquivados(por_pagina + 1, depois_id=depois, crescente=True, **filtros_arquivo)
+            logs = sorted(logs, key=lambda log: log.id)[:por_pagina + 1]
+        tem_anterior = len(logs) > por_pagina
+        logs = list(reversed(logs[:por_pagina]))
+        tem_proxima = True
+    else:
+        if antes is not None:
+            query_pagina = query.filter(Log.id < antes)
+        else:
+            query_pagina = query
+        logs = query_pagina.order_by(Log.id.desc()).limit(por_pagina + 1).all()
+        if filtros_arquivo:
+            logs += buscar_arquivados(por_pagina + 1, antes_id=antes, **filtros_arquivo)
+            logs = sorted(logs, key=lambda log: log.id, reverse=True)[:por_pagina + 1]
+        tem_proxima = len(logs) > por_pagina
+        logs = logs[:por_pagina]
+        tem_anterior = antes is not None
+
+    if not logs:
+        tem_proxima = tem_anterior = False
+
+    # Converte horário para o Brasil (apenas a página visível)
     for log in logs:
         log.horario_brasil = utc_to_brasil(log.horario)
 
+    filtros = {k: v for k, v in request.args.items() if v and k not in ("antes", "depois")}
+    filtrado = any(request.args.get(k) for k in CAMPOS_FILTRO)
+
+    paginacao = {
+        "por_pagina": por_pagina,
+        "proximo": logs[-1].id if logs and tem_proxima else None,
+        "anterior": logs[0].id if logs and tem_anterior else None,
+        "total_aproximado": total_aproximado(query, filtrado),
+        "filtros": filtros
+    }
+
+    # Os botões de exportação definem formato/gzip; o resto vem do filtro atual
+    filtros_exportacao = {k: v for k, v in filtros.items() if k not in ("formato", "gzip")}
+
     return render_template(
         "logs.html",
         titulo="Logs do Sistema",
-        logs=logs
+        logs=logs,
+        paginacao=paginacao,
+        filtros_exportacao=filtros_exportacao
     )
 
 
+def total_aproximado(query, filtrado):
+    """Total barato para exibição.
+
+    Sem filtro usa a faixa de ids (duas buscas no índice da PK); com filtro
+    conta no máximo LIMITE_CONTAGEM linhas e devolve "N+" acima disso.
+    """
+    if not filtrado:
+        minimo, maximo = db.session.query(func.min(Log.id), func.max(Log.id)).one()
+        if maximo is None:
+            return "0"
+        return f"~{maximo - minimo + 1}"
+
+    subquery = query.with_entities(Log.id).limit(LIMITE_CONTAGEM + 1).subquery()
+    total = db.session.query(func.count()).select_from(subquery).scalar()
+    if total > LIMITE_CONTAGEM:
+        return f"{LIMITE_CONTAGEM}+"
+    return str(total)
+
+
 # ================================================================
 # EXPORTAR LOGS CSV
 # ================================================================
@@ -129,34 +252,55 @@ def listar_logs():
 @verificar_lockdown
 def exportar_logs():
 
-    logs = Log.query.order_by(Log.id.desc()).all()
+    query, datas_validas = filtrar_logs(
+        db.session.query(
+            Log.id, Log.horario, Log.usuario_nome, Log.usuario_perfil,
+            Log.tipo_operacao, Log.tipo_modelo, Log.descricao, Log.modificacoes
+        ),
+        request.args
+    )
+    if not datas_validas:
+        flash("Datas inválidas no filtro!", "danger")
+        return redirect(url_for("logs.listar_logs"))
+
+    filtros_arquivo = filtros_do_arquivo(request.args)
 
-    output = io.StringIO()
-    writer = csv.writer(output)
+    def lotes():
+        yield from iterar_em_lotes(query)
+        if filtros_arquivo:
+            yield from lotes_arquivados(**filtros_arquivo)
 
-    writer.writerow([
-        "ID", "Data/Hora (Brasil)", "Usuário", "Perfil",
-        "Operação", "Modelo", "Descrição", "Modificações"
-    ])
+    def gerar():
+        output = io.StringIO()
+        writer = csv.writer(output)
 
-    for log in logs:
-        data_br = utc_to_brasil(log.horario).strftime("%d/%m/%Y %H:%M:%S")
         writer.writerow([
-            log.id,
-            data_br,
-            log.usuario_nome,
-            log.usuario_perfil,
-            log.tipo_operacao,
-            log.tipo_modelo,
-            log.descricao,
-            log.modificacoes or ""
+            "ID", "Data/Hora (Brasil)", "Usuário", "Perfil",
+            "Operação", "Modelo", "Descrição", "Modificações"
         ])
 
-    output.seek(0)
-
-    response = make_response(output.getvalue())
+        for lote in lotes():
+            for log in lote:
+                data_br = utc_to_brasil(log.horario).strftime("%d/%m/%Y %H:%M:%S")
+                writer.writerow([
+                    log.id,
+                    data_br,
+                    log.usuario_nome,
+                    log.usuario_perfil,
+                    log.tipo_operacao,
+                    log.tipo_modelo,
+                    log.descricao,
+                    log.modificacoes or ""
+                ])
+
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+
+        yield output.getvalue()
+
+    response = Response(stream_with_context(gerar()), mimetype="text/csv")
     response.headers["Content-Disposition"] = "attachment; filename=logs.csv"
-    response.headers["Content-Type"] = "text/csv"
 
     return response
 
@@ -169,25 +313,236 @@ def exportar_logs():
 @perfil_obrigatorio(PerfilEnum.ADMIN_SEGURANCA)
 @verificar_lockdown
 def exportar_logs_json():
+    """
+    Exporta os logs em JSON, em streaming.
+
+    Parâmetros opcionais (além dos filtros de listar_logs):
+    - formato=ndjson → um registro por linha
+    - gzip=1         → compressão na hora
+    - since_id=N     → só logs com id > N, em ordem crescente; o header
+                       X-Ultimo-Id traz o cursor para a próxima coleta
+    """
+    ndjson = request.args.get("formato") == "ndjson"
+    comprimir = request.args.get("gzip") in ("1", "true")
+
+    query, datas_validas = filtrar_logs(
+        db.session.query(
+            Log.id, Log.horario, Log.usuario_id, Log.usuario_nome, Log.usuario_perfil,
+            Log.tipo_operacao, Log.tipo_modelo, Log.descricao, Log.modificacoes
+        ),
+        request.args
+    )
+    if not datas_validas:
+        flash("Datas inválidas no filtro!", "danger")
+        return redirect(url_for("logs.listar_logs"))
+
+    since_id = request.args.get("since_id", type=int)
+    ultimo_id = None
+    if since_id is not None:
+        # Fotografia consistente: o cursor devolvido é o maior id no início da exportação
+        ultimo_id = max(since_id, db.session.query(func.max(Log.id)).scalar() or 0)
+        query = query.filter(Log.id > since_id, Log.id <= ultimo_id)
+
+    filtros_arquivo = filtros_do_arquivo(request.args)
+
+    def lotes():
+        if since_id is None:
+            yield from iterar_em_lotes(query)
+            if filtros_arquivo:
+                yield from lotes_arquivados(**filtros_arquivo)
+        else:
+            # Ordem crescente: arquivados (ids menores) antes da tabela viva
+            if filtros_arquivo:
+                yield from lotes_arquivados(depois_id=since_id, crescente=True, **filtros_arquivo)
+            yield from iterar_em_lotes(query, crescente=True)
+
+    def serializar(log):
+        return {
+            "id": log.id,
+            "horario": utc_to_brasil(log.horario).strftime("%Y-%m-%d %H:%M:%S"),
+            "usuario_id": log.usuario_id,
+            "usuario_nome": log.usuario_nome,
+            "usuario_perfil": log.usuario_perfil,
+            "tipo_operacao": log.tipo_operacao,
+            "tipo_modelo": log.tipo_modelo,
+            "descricao": log.descricao,
+            "modificacoes": log.modificacoes
+        }
+
+    def gerar_texto():
+        primeiro = True
+        if not ndjson:
+            yield "[\n"
+
+        for lote in lotes():
+            partes = []
+            for log in lote:
+                if ndjson:
+                    partes.append(json.dumps(serializar(log), ensure_ascii=False) + "\n")
+                else:
+                    separador = "" if primeiro else ",\n"
+                    partes.append(separador + json.dumps(serializar(log), ensure_ascii=False, indent=4))
+                primeiro = False
+            yield "".join(partes)
+
+        if not ndjson:
+            yield "\n]"
+
+    def gerar():
+        if not comprimir:
+            for trecho in gerar_texto():
+                yield trecho.encode("utf-8")
+            return
+
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for trecho in gerar_texto():
+            dados = compressor.compress(trecho.encode("utf-8"))
+            if dados:
+                yield dados
+        yield compressor.flush()
+
+    nome = "logs.ndjson" if ndjson else "logs.json"
+    if comprimir:
+        nome += ".gz"
+        tipo_conteudo = "application/gzip"
+    elif ndjson:
+        tipo_conteudo = "application/x-ndjson; charset=utf-8"
+    else:
+        tipo_conteudo = "application/json; charset=utf-8"
+
+    response = Response(stream_with_context(gerar()), content_type=tipo_conteudo)
+    response.headers["Content-Disposition"] = f"attachment; filename={nome}"
+    if ultimo_id is not None:
+        response.headers["X-Ultimo-Id"] = str(ultimo_id)
+
+    return response
+
 
-    logs = Log.query.order_by(Log.id.desc()).all()
+# ================================================================
+# BUSCA FULL-TEXT (descrição + modificações)
+# ================================================================
+@logs_bp.route("/logs/busca")
+@login_obrigatorio
+@perfil_obrigatorio(PerfilEnum.ADMIN_SEGURANCA)
+@verificar_lockdown
+def buscar():
+    termo = request.args.get("q", "").strip()
+    limite = min(max(request.args.get("limite", 50, type=int), 1), 500)
+
+    inicio = time.perf_counter()
+    resultados = buscar_logs(termo, limite)
+    tempo_ms = (time.perf_counter() - inicio) * 1000
+
+    return jsonify({
+        "consulta": termo,
+        "modo": "fts5" if fts_disponivel() else "like",
+        "tempo_ms": round(tempo_ms, 2),
+        "resultados": [
+            {
+                "id": r["id"],
+                "horario": utc_to_brasil(r["horario"]).strftime("%Y-%m-%d %H:%M:%S"),
+                "usuario_nome": r["usuario_nome"],
+                "usuario_perfil": r["usuario_perfil"],
+                "tipo_operacao": r["tipo_operacao"],
+                "tipo_modelo": r["tipo_modelo"],
+                "descricao": r["descricao"],
+                "modificacoes": r["modificacoes"],
+                "trecho": r["trecho"],
+                "relevancia": r["relevancia"]
+            }
+            for r in resultados
+        ]
+    })
 
-    lista_logs = [{
-        "id": log.id,
-        "horario": utc_to_brasil(log.horario).strftime("%Y-%m-%d %H:%M:%S"),
-        "usuario_id": log.usuario_id,
-        "usuario_nome": log.usuario_nome,
-        "usuario_perfil": log.usuario_perfil,
-        "tipo_operacao": log.tipo_operacao,
-        "tipo_modelo": log.tipo_modelo,
-        "descricao": log.descricao,
-        "modificacoes": log.modificacoes
-    } for log in logs]
 
-    conteudo_json = json.dumps(lista_logs, ensure_ascii=False, indent=4)
+# ================================================================
+# HISTÓRICO ESTRUTURADO DE ALTERAÇÕES
+# ================================================================
+def serializar_alteracao(alteracao):
+    return {
+        "log_id": alteracao.log_id,
+        "horario": utc_to_brasil(alteracao.horario).strftime("%Y-%m-%d %H:%M:%S"),
+        "tipo_operacao": alteracao.tipo_operacao,
+        "entidade": alteracao.entidade,
+        "entidade_id": alteracao.entidade_id,
+        "campo": alteracao.campo,
+        "valor_antigo": alteracao.valor_antigo,
+        "valor_novo": alteracao.valor_novo
+    }
+
+
+@logs_bp.route("/logs/historico/<entidade>/<int:entidade_id>")
+@login_obrigatorio
+@perfil_obrigatorio(PerfilEnum.ADMIN_SEGURANCA)
+@verificar_lockdown
+def historico(entidade, entidade_id):
+    """Todas as alterações de campo de um registro (ex.: /logs/historico/Veiculo/3)."""
+    limite = min(max(request.args.get("limite", 200, type=int), 1), 1000)
+    alteracoes = historico_registro(entidade, entidade_id, limite)
+    return jsonify([serializar_alteracao(a) for a in alteracoes])
 
-    response = make_response(conteudo_json)
-    response.headers["Content-Disposition"] = "attachment; filename=logs.json"
-    response.headers["Content-Type"] = "application/json; charset=utf-8"
 
-    return response
+@logs_bp.route("/logs/alteracoes")
+@login_obrigatorio
+@perfil_obrigatorio(PerfilEnum.ADMIN_SEGURANCA)
+@verificar_lockdown
+def alteracoes():
+    """Quem alterou um campo de uma entidade: ?entidade=Usuario&campo=perfil&data_inicio=&data_fim="""
+    entidade = request.args.get("entidade", "").strip()
+    campo = request.args.get("campo", "").strip()
+    filtros = ler_filtros(request.args)
+
+    if not entidade or not campo or filtros is None:
+        return jsonify({"erro": "Informe entidade, campo e datas válidas (AAAA-MM-DD)."}), 400
+
+    limite = min(max(request.args.get("limite", 500, type=int), 1), 5000)
+    resultado = alteracoes_do_campo(entidade, campo, filtros["inicio"], filtros["fim"], limite)
+    return jsonify([serializar_alteracao(a) for a in resultado])
+
+
+# ================================================================
+# STATUS DO GRAVADOR DE LOGS
+# ================================================================
+@logs_bp.route("/logs/gravador/status")
+@login_obrigatorio
+@perfil_obrigatorio(PerfilEnum.ADMIN_SEGURANCA)
+def status_gravador():
+    return jsonify({
+        **gravador_logs.estatisticas(),
+        "ao_vivo": emissor_logs.estatisticas()
+    })
+
+
+# ================================================================
+# SOCKET — LOGS AO VIVO (somente ADMIN_SEGURANCA)
+# ================================================================
+def _admin_seguranca():
+    return session.get("usuario_perfil") == PerfilEnum.ADMIN_SEGURANCA.value
+
+
+@socketio.on("connect", namespace=NAMESPACE_LOGS)
+def logs_ao_vivo_conectar():
+    # Retornar False recusa a conexão
+    if not _admin_seguranca():
+        return False
+
+
+@socketio.on("assinar", namespace=NAMESPACE_LOGS)
+def logs_ao_vivo_assinar(data):
+    """Define (ou troca) o filtro do admin: {"usuario": "...", "tipo": "..."}."""
+    if not _admin_seguranca():
+        return
+
+    data = data or {}
+    filtro = {
+        campo: str(data.get(campo)).strip()
+        for campo in ("usuario", "tipo")
+        if data.get(campo)
+    }
+    emissor_logs.inscrever(request.sid, filtro)
+    emit("assinatura", filtro)
+
+
+@socketio.on("disconnect", namespace=NAMESPACE_LOGS)
+def logs_ao_vivo_desconectar(*args):
+    emissor_logs.cancelar(request.sid)
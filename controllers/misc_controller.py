@@ -1,14 +1,18 @@
 from flask import (
     flash,
+    jsonify,
     redirect,
     render_template,
     request,
     session,
-    url_for,
-    current_app
+    url_for
 )
 from utils.decorators import login_obrigatorio, perfil_obrigatorio, verificar_lockdown
 from controllers.logs_controller import registrar_log
+from utils.estado_sistema import definir_lockdown, estado_sistema
+from utils import limitador
+from utils.presenca import presenca
+from utils.sessoes_chat import sessoes_chat
 
 # Modelos
 from models.usuario_model import Usuario, PerfilEnum
@@ -122,7 +126,7 @@ def buscar_adm():
                 "BUSCA_ADMIN",
                 "Sistema",
                 "Busca administrativa realizada.",
-                modificacoes=str(filtros_ativos)
+                modificacoes=filtros_ativos
             )
 
         return render_template(
@@ -152,7 +156,8 @@ def buscar_adm():
 @perfil_obrigatorio(PerfilEnum.ADMIN_SEGURANCA)
 def ativar_lockdown():
     try:
-        current_app.config["LOCKDOWN_ATIVO"] = True
+        # Vale para todos os workers e sockets em até ESTADO_INTERVALO
+        definir_lockdown(True, por=session.get("usuario_nome"))
 
         registrar_log(
             "LOCKDOWN_ATIVADO",
@@ -176,7 +181,7 @@ def ativar_lockdown():
 @perfil_obrigatorio(PerfilEnum.ADMIN_SEGURANCA)
 def desativar_lockdown():
     try:
-        current_app.config["LOCKDOWN_ATIVO"] = False
+        definir_lockdown(False, por=session.get("usuario_nome"))
 
         registrar_log(
             "LOCKDOWN_DESATIVADO",
@@ -196,6 +201,20 @@ def desativar_lockdown():
         ), 500
 
 
+# =====================================================================
+# STATUS DO SISTEMA (limites, estado compartilhado, chat)
+# =====================================================================
+@login_obrigatorio
+@perfil_obrigatorio(PerfilEnum.ADMIN_SEGURANCA)
+def status_sistema():
+    return jsonify({
+        "limites": limitador.estatisticas(),
+        "estado": estado_sistema.estatisticas(),
+        "presenca": presenca.estatisticas(),
+        "chat_sessoes": sessoes_chat.estatisticas()
+    })
+
+
 # =====================================================================
 # PÁGINA DE BLOQUEIO
 # =====================================================================
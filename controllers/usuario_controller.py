@@ -6,12 +6,14 @@ from flask import (
     url_for,
     session,
     flash,
-    current_app,
     abort
 )
 from config import db
 from models.usuario_model import Usuario, PerfilEnum
 from controllers.logs_controller import registrar_log
+from utils.cache import cache_dashboard
+from utils import identidade
+from utils.estado_sistema import lockdown_ativo
 from utils.decorators import perfil_obrigatorio, login_obrigatorio, verificar_lockdown
 
 
@@ -23,13 +25,13 @@ from utils.decorators import perfil_obrigatorio, login_obrigatorio, verificar_lo
 def home():
     try:
         perfil = session.get("usuario_perfil")
-        lockdown_ativo = current_app.config.get("LOCKDOWN_ATIVO", False)
+        lockdown = lockdown_ativo()
 
         return render_template(
             "index.html",
             titulo="Página Principal",
             perfil=perfil,
-            lockdown_ativo=lockdown_ativo
+            lockdown_ativo=lockdown
         )
 
     except Exception as e:
@@ -90,6 +92,7 @@ def cadastrar_usuario():
 
             db.session.add(novo_usuario)
             db.session.commit()
+            cache_dashboard.invalidar("usuarios")
 
             registrar_log(
                 tipo_operacao="CRIAR",
@@ -99,7 +102,8 @@ def cadastrar_usuario():
                     "name": name,
                     "email": email,
                     "perfil": perfil
-                })
+                }),
+                entidade_id=novo_usuario.id
             )
 
             flash("Usuário cadastrado com sucesso!", "success")
@@ -173,6 +177,8 @@ def editar_usuario(id):
                 usuario.perfil = PerfilEnum[perfil]
 
             db.session.commit()
+            cache_dashboard.invalidar("usuarios")
+            identidade.invalidar(usuario.id)
 
             dados_novos = {
                 "name": usuario.name,
@@ -187,7 +193,8 @@ def editar_usuario(id):
                 modificacoes=json.dumps({
                     "antes": dados_antigos,
                     "depois": dados_novos
-                })
+                }),
+                entidade_id=id
             )
 
             flash("Usuário atualizado com sucesso!", "success")
@@ -249,12 +256,15 @@ def deletar_usuario(id):
 
         db.session.delete(usuario)
         db.session.commit()
+        cache_dashboard.invalidar("usuarios")
+        identidade.invalidar(id)
 
         registrar_log(
             tipo_operacao="DELETAR",
             tipo_modelo="Usuario",
             descricao=f"Usuário deletado: {info_usuario_deletado['name']} (ID: {id})",
-            modificacoes=json.dumps(info_usuario_deletado)
+            modificacoes=json.dumps(info_usuario_deletado),
+            entidade_id=id
         )
 
         flash("Usuário deletado com sucesso!", "success")
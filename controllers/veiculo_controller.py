@@ -4,6 +4,7 @@ from models.veiculo_model import Veiculo
 from models.usuario_model import PerfilEnum
 from utils.decorators import login_obrigatorio, perfil_obrigatorio, verificar_lockdown
 from controllers.logs_controller import registrar_log
+from utils.cache import cache_dashboard
 
 
 # ======================================================
@@ -76,6 +77,7 @@ def cadastrar_veiculo():
 
             db.session.add(novo)
             db.session.commit()
+            cache_dashboard.invalidar("veiculos")
 
             registrar_log(
                 tipo_operacao="CRIAR",
@@ -88,7 +90,8 @@ def cadastrar_veiculo():
                     "cor": cor,
                     "placa": placa,
                     "situacao": situacao
-                }
+                },
+                entidade_id=novo.id
             )
 
             flash("Veículo cadastrado com sucesso!", "success")
@@ -174,6 +177,7 @@ def editar_veiculo(id):
                 return redirect(url_for("editar_veiculo", id=id))
 
             db.session.commit()
+            cache_dashboard.invalidar("veiculos")
 
             registrar_log(
                 tipo_operacao="ATUALIZAR",
@@ -191,7 +195,8 @@ def editar_veiculo(id):
                         "local_armazenamento": veiculo.local_armazenamento,
                         "situacao": veiculo.situacao
                     }
-                }
+                },
+                entidade_id=id
             )
 
             flash("Veículo atualizado com sucesso!", "success")
@@ -258,12 +263,14 @@ def deletar_veiculo(id):
 
         db.session.delete(veiculo)
         db.session.commit()
+        cache_dashboard.invalidar("veiculos")
 
         registrar_log(
             tipo_operacao="DELETAR",
             tipo_modelo="Veiculo",
             descricao=f"Veículo deletado: {resumo['marca']} {resumo['modelo']}",
-            modificacoes=resumo
+            modificacoes=resumo,
+            entidade_id=id
         )
 
         flash("Veículo deletado com sucesso!", "success")
@@ -4,6 +4,11 @@ from datetime import datetime,timezone
 class ChatMessage(db.Model):
     __tablename__ = "chat_messages"
 
+    # Histórico paginado: cada sentido da conversa, do id mais novo ao mais antigo
+    __table_args__ = (
+        db.Index("ix_chat_messages_de_para_id", "de_id", "para_id", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     de_id = db.Column(db.Integer, nullable=False)
     para_id = db.Column(db.Integer, nullable=False)
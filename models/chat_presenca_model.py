@@ -0,0 +1,25 @@
+from datetime import datetime, timezone
+
+from config import db
+
+
+class ChatPresenca(db.Model):
+    """Um socket conectado (uma aba): compartilhado entre os workers."""
+    __tablename__ = "chat_presenca"
+
+    sid = db.Column(db.String(64), primary_key=True)
+    usuario_id = db.Column(db.Integer, nullable=False, index=True)
+
+    # host:pid do worker que segura o socket
+    processo = db.Column(db.String(100), nullable=False)
+
+    # Renovado pelo batimento do worker; parado além de PRESENCA_EXPIRA = socket morto
+    visto_em = db.Column(
+        db.DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+        index=True
+    )
+
+    def __repr__(self):
+        return f"<ChatPresenca usuario={self.usuario_id} sid={self.sid}>"
@@ -4,6 +4,14 @@ from datetime import datetime, timezone
 class ChatSessao(db.Model):
     __tablename__ = "chat_sessoes"
 
+    # Par canônico: usuario1_id < usuario2_id (utils.sessoes_chat.par), uma linha por conversa.
+    # Sessões ativas de um usuário, de qualquer lado do par (/chat/contatos)
+    __table_args__ = (
+        db.Index("uq_chat_sessoes_par", "usuario1_id", "usuario2_id", unique=True),
+        db.Index("ix_chat_sessoes_usuario1_ativa", "usuario1_id", "ativa"),
+        db.Index("ix_chat_sessoes_usuario2_ativa", "usuario2_id", "ativa"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
 
     usuario1_id = db.Column(db.Integer, nullable=False)
@@ -19,8 +27,8 @@ class ChatSessao(db.Model):
 
     def envolve(self, uid):
         """Retorna True se o usuário fizer parte da sessão."""
-        return uid == self.usuario_a or uid == self.usuario_b
+        return uid == self.usuario1_id or uid == self.usuario2_id
 
     def outro_usuario(self, uid):
         """Retorna o ID do outro participante."""
-        return self.usuario_b if uid == self.usuario_a else self.usuario_a
+        return self.usuario2_id if uid == self.usuario1_id else self.usuario1_id
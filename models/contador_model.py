@@ -0,0 +1,15 @@
+from config import db
+
+
+class ContadorEntidade(db.Model):
+    """Quantidade de registros por entidade, série e valor (ex.: veiculos/situacao/Ativo)."""
+    __tablename__ = "contadores_entidades"
+
+    entidade = db.Column(db.String(30), primary_key=True)
+    serie = db.Column(db.String(30), primary_key=True)
+    valor = db.Column(db.String(150), primary_key=True)
+
+    total = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<ContadorEntidade {self.entidade}/{self.serie}/{self.valor}={self.total}>"
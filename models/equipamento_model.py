@@ -4,6 +4,14 @@ from config import db
 class Equipamento(db.Model):
     __tablename__ = "equipamentos"
 
+    # Ordenação/filtro da tabela do dashboard (coluna + id para paginação por cursor)
+    __table_args__ = (
+        db.Index("ix_equipamentos_situacao_id", "situacao", "id"),
+        db.Index("ix_equipamentos_perigo_id", "nivel_perigo", "id"),
+        db.Index("ix_equipamentos_nome_id", "nome", "id"),
+        db.Index("ix_equipamentos_quantidade_id", "quantidade", "id"),
+    )
+
     # Definição das opções permitidas para a situação do equipamento
     SITUACAO_OPCOES = ['Manutencao', 'Defeituoso', 'Ativo']
 
@@ -0,0 +1,24 @@
+from datetime import datetime, timezone
+
+from config import db
+
+
+class EstadoSistema(db.Model):
+    """Chave de estado compartilhada entre processos (ex.: lockdown), com versão."""
+    __tablename__ = "estado_sistema"
+
+    chave = db.Column(db.String(50), primary_key=True)
+    valor = db.Column(db.Text, nullable=False)  # JSON
+
+    # +1 a cada alteração: os processos comparam a versão para saber se mudou
+    versao = db.Column(db.Integer, nullable=False, default=0)
+
+    alterado_em = db.Column(
+        db.DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False
+    )
+    alterado_por = db.Column(db.String(150), nullable=True)
+
+    def __repr__(self):
+        return f"<EstadoSistema {self.chave}={self.valor} v{self.versao}>"
@@ -0,0 +1,30 @@
+from config import db
+
+
+class LogAlteracao(db.Model):
+    """
+    Uma linha por campo alterado em um log de CRIAR/ATUALIZAR/DELETAR.
+
+    log_id não é FK: a alteração continua consultável depois que o log
+    original é movido para o arquivo (arquivo_logs).
+    """
+    __tablename__ = "logs_alteracoes"
+
+    id = db.Column(db.Integer, primary_key=True)
+    log_id = db.Column(db.Integer, nullable=False, index=True)
+    horario = db.Column(db.DateTime(timezone=True), nullable=False)
+    tipo_operacao = db.Column(db.String(30), nullable=False)
+
+    entidade = db.Column(db.String(50), nullable=False)
+    entidade_id = db.Column(db.Integer, nullable=True)
+    campo = db.Column(db.String(100), nullable=False)
+    valor_antigo = db.Column(db.Text, nullable=True)
+    valor_novo = db.Column(db.Text, nullable=True)
+
+    __table_args__ = (
+        db.Index("ix_logs_alteracoes_entidade_campo", "entidade", "campo", "horario"),
+        db.Index("ix_logs_alteracoes_registro", "entidade", "entidade_id", "id"),
+    )
+
+    def __repr__(self):
+        return f"<LogAlteracao {self.entidade}#{self.entidade_id}.{self.campo}: {self.valor_antigo!r} → {self.valor_novo!r}>"
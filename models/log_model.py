@@ -4,6 +4,14 @@ from config import db
 class Log(db.Model):
     __tablename__ = "logs"
 
+    # Índices para os filtros do dashboard e da listagem:
+    # tipo_operacao + intervalo de horario, usuário + intervalo, só intervalo
+    __table_args__ = (
+        db.Index("ix_logs_tipo_horario", "tipo_operacao", "horario"),
+        db.Index("ix_logs_usuario_horario", "usuario_id", "horario"),
+        db.Index("ix_logs_horario", "horario"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
 
     # Timestamp REAL UTC — NÃO depende do Windows
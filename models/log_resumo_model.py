@@ -0,0 +1,19 @@
+from config import db
+
+
+class LogResumoDiario(db.Model):
+    """Contagem de logs por dia (horário do Brasil), operação e modelo."""
+    __tablename__ = "logs_resumo_diario"
+
+    dia = db.Column(db.Date, primary_key=True)
+    tipo_operacao = db.Column(db.String(30), primary_key=True)
+    tipo_modelo = db.Column(db.String(50), primary_key=True)
+
+    total = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index("ix_logs_resumo_operacao_dia", "tipo_operacao", "dia"),
+    )
+
+    def __repr__(self):
+        return f"<LogResumoDiario {self.dia} {self.tipo_operacao}/{self.tipo_modelo}={self.total}>"
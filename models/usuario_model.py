@@ -1,5 +1,5 @@
 from config import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from utils.senhas import servico_senhas
 import enum
 
 # Enum para tipos de perfil
@@ -11,19 +11,29 @@ class PerfilEnum(enum.Enum):
 class Usuario(db.Model):
     __tablename__ = "usuarios"
 
+    # Ordenação/filtro da tabela do dashboard (coluna + id para paginação por cursor)
+    __table_args__ = (
+        db.Index("ix_usuarios_perfil_id", "perfil", "id"),
+        db.Index("ix_usuarios_name_id", "name", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), unique=True, nullable=False)
     senha_hash = db.Column(db.String(255), nullable=False)  # armazena hash da senha
     perfil = db.Column(db.Enum(PerfilEnum), default=PerfilEnum.FUNCIONARIO, nullable=False)
 
-    # Método para definir senha (gera hash)
+    # Método para definir senha (gera hash no pool de utils.senhas)
     def set_senha(self, senha):
-        self.senha_hash = generate_password_hash(senha)
+        self.senha_hash = servico_senhas.gerar_hash(senha)
 
-    # Método para verificar senha
+    # Método para verificar senha (pode levantar SenhasOcupado)
     def checar_senha(self, senha):
-        return check_password_hash(self.senha_hash, senha)
+        return servico_senhas.verificar(self.senha_hash, senha)
+
+    # Hash gerado com outro método/custo (SENHA_METODO mudou)
+    def senha_desatualizada(self):
+        return servico_senhas.precisa_rehash(self.senha_hash)
 
     def __repr__(self):
         return f"<Usuario {self.name}, Perfil: {self.perfil.value}>"
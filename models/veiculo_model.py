@@ -5,6 +5,14 @@ from datetime import date # Importação útil para campos de data/ano
 class Veiculo(db.Model):
     __tablename__ = "veiculos"
 
+    # Ordenação/filtro da tabela do dashboard (coluna + id para paginação por cursor)
+    __table_args__ = (
+        db.Index("ix_veiculos_situacao_id", "situacao", "id"),
+        db.Index("ix_veiculos_local_id", "local_armazenamento", "id"),
+        db.Index("ix_veiculos_marca_id", "marca", "id"),
+        db.Index("ix_veiculos_ano_id", "ano_fabricacao", "id"),
+    )
+
     # Definição das opções permitidas para a situação do veículo
     SITUACAO_OPCOES = ['Ativo', 'Manutencao', 'Defeituoso']
 
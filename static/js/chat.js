@@ -10,6 +10,9 @@ let meuId = parseInt(document.body.dataset.usuarioId || "0");
 // cache dos contatos: { id: { id, nome, perfil, online, preview } }
 let listaCache = {};
 
+// histórico paginado da conversa aberta: cursor = menor id já exibido
+let historico = { cursor: null, maisAntigas: false, carregando: false };
+
 // elementos
 const listaUsuarios = document.getElementById("lista-usuarios");
 const areaMensagens = document.getElementById("area-mensagens");
@@ -159,7 +162,7 @@ function removerContato(id) {
 // =======================================================
 // RENDER DAS MENSAGENS
 // =======================================================
-function adicionarMensagemEnviada(texto, horario) {
+function criarMensagemEnviada(texto, horario) {
     const div = document.createElement("div");
     div.className = "d-flex justify-content-end mb-2";
 
@@ -172,11 +175,10 @@ function adicionarMensagemEnviada(texto, horario) {
     `;
 
     div.appendChild(bubble);
-    areaMensagens.appendChild(div);
-    autoScroll();
+    return div;
 }
 
-function adicionarMensagemRecebida(texto, nome, horario) {
+function criarMensagemRecebida(texto, nome, horario) {
     const div = document.createElement("div");
     div.className = "d-flex justify-content-start mb-2";
 
@@ -189,10 +191,32 @@ function adicionarMensagemRecebida(texto, nome, horario) {
     `;
 
     div.appendChild(bubble);
-    areaMensagens.appendChild(div);
+    return div;
+}
+
+function adicionarMensagemEnviada(texto, horario) {
+    areaMensagens.appendChild(criarMensagemEnviada(texto, horario));
+    autoScroll();
+}
+
+function adicionarMensagemRecebida(texto, nome, horario) {
+    areaMensagens.appendChild(criarMensagemRecebida(texto, nome, horario));
     autoScroll();
 }
 
+// Página do histórico (ordem cronológica) → fragmento pronto para inserir
+function criarPaginaHistorico(mensagens) {
+    const fragmento = document.createDocumentFragment();
+    mensagens.forEach(msg => {
+        fragmento.appendChild(
+            msg.de === usuarioAtual
+                ? criarMensagemRecebida(msg.texto, listaCache[msg.de]?.nome || "Contato", msg.horario)
+                : criarMensagemEnviada(msg.texto, msg.horario)
+        );
+    });
+    return fragmento;
+}
+
 
 // =======================================================
 // FETCH CONTATOS
@@ -222,7 +246,8 @@ function selecionarUsuario(id, nome) {
     const ativo = document.getElementById(`contato-${id}`);
     if (ativo) ativo.classList.add("active");
 
-    // solicitar histórico ao backend via socket
+    // solicitar a página mais recente do histórico via socket
+    historico = { cursor: null, maisAntigas: false, carregando: true };
     socket.emit("load_messages", { para: id });
 
     // mostrar botão de fechar
@@ -309,17 +334,49 @@ socket.on("message_sent", data => {
     }
 });
 
-// HISTÓRICO
-socket.on("load_messages_response", lista => {
-    areaMensagens.innerHTML = "";
-    lista.forEach(msg => {
-        if (msg.de === usuarioAtual) {
-            adicionarMensagemRecebida(msg.texto, listaCache[msg.de]?.nome || "Contato", msg.horario);
-        } else {
-            adicionarMensagemEnviada(msg.texto, msg.horario);
-        }
-    });
-    autoScroll();
+// HISTÓRICO (primeira página ou mensagens mais antigas)
+socket.on("load_messages_response", pagina => {
+    // resposta de uma conversa que já foi trocada
+    if (pagina.para !== usuarioAtual) return;
+
+    historico.carregando = false;
+    historico.maisAntigas = pagina.mais_antigas;
+    if (pagina.cursor !== null) historico.cursor = pagina.cursor;
+
+    const fragmento = criarPaginaHistorico(pagina.mensagens);
+
+    if (pagina.antes == null) {
+        areaMensagens.innerHTML = "";
+        areaMensagens.appendChild(fragmento);
+        autoScroll();
+        return;
+    }
+
+    // mensagens antigas entram no topo sem mover o que está na tela
+    const alturaAntes = areaMensagens.scrollHeight;
+    areaMensagens.prepend(fragmento);
+    areaMensagens.scrollTop += areaMensagens.scrollHeight - alturaAntes;
+});
+
+// CARREGAR ANTIGAS ao chegar perto do topo
+areaMensagens.addEventListener("scroll", () => {
+    if (areaMensagens.scrollTop > 40) return;
+    if (!usuarioAtual || !historico.maisAntigas || historico.carregando) return;
+
+    historico.carregando = true;
+    socket.emit("load_messages", { para: usuarioAtual, antes: historico.cursor });
+});
+
+// LOCKDOWN ATIVADO (vale para todos os workers em até ~0,5 s)
+socket.on("estado_sistema", data => {
+    if (data.chave !== "lockdown" || !data.valor) return;
+    if (document.body.dataset.usuarioPerfil === "Administrador de Segurança") return;
+    window.location.href = "/bloqueio";
+});
+
+// MENSAGEM RECUSADA PELO SERVIDOR
+socket.on("erro_chat", data => {
+    console.error("Chat:", data.erro);
 });
 
 // SESSÃO FECHADA EM TEMPO REAL
@@ -13,7 +13,8 @@ const tabelaBody = document.getElementById("tabela-body");
 // HELPERS
 // ===================================================================
 
-function safe(v) { return v || []; }
+// cópia: os deltas ao vivo alteram o gráfico e DATA separadamente
+function safe(v) { return v ? [...v] : []; }
 
 // converte qualquer label em string segura que o Chart.js vai aceitar
 function toLabelString(x) {
@@ -104,7 +105,7 @@ function updateChart(chart, type, labels, values) {
     chart.update();
 }
 
-function renderTable(headEl, bodyEl, rows) {
+function renderTable(headEl, bodyEl, rows, columns) {
     headEl.innerHTML = "";
     bodyEl.innerHTML = "";
 
@@ -113,7 +114,8 @@ function renderTable(headEl, bodyEl, rows) {
         return;
     }
 
-    const keys = Object.keys(rows[0]);
+    // ordem das colunas vinda do servidor (o JSON não preserva a ordem das chaves)
+    const keys = columns || Object.keys(rows[0]);
     const headRow = document.createElement("tr");
     keys.forEach(key => {
         const th = document.createElement("th");
@@ -157,15 +159,42 @@ let chartSecundario = createChart(
 // Render inicial da tabela (últimos logs)
 renderTable(tabelaHead, tabelaBody, DATA.logsIniciais || []);
 
+// série exibida em cada gráfico: [grupo, serie] de /dashboard/resumo (usada pelo modo ao vivo)
+const FONTES_GRAFICOS = {
+    tudo: [["usuarios", "perfil"], ["logs", "logins"]],
+    usuarios: [["usuarios", "perfil"], ["logs", "logins"]],
+    veiculos: [["veiculos", "situacao"], ["veiculos", "local"]],
+    equipamentos: [["equipamentos", "perigo"], ["equipamentos", "situacao"]]
+};
+let fontesAtuais = FONTES_GRAFICOS.tudo;
+
 // ===================================================================
 // API - Buscar dados por entidade
 // ===================================================================
 
+// cópias locais por URL: { url: { etag, data } }
+const respostasCache = new Map();
+
+// GET condicional: envia o ETag guardado e reaproveita a cópia no 304
+async function fetchJsonCondicional(url) {
+    const guardada = respostasCache.get(url);
+    const headers = guardada ? { "If-None-Match": guardada.etag } : {};
+
+    // no-store: o controle é todo nosso (o cache HTTP do navegador não interfere)
+    const res = await fetch(url, { headers, cache: "no-store" });
+
+    if (res.status === 304 && guardada) return guardada.data;
+    if (!res.ok) throw new Error("Erro ao buscar dados do servidor");
+
+    const data = await res.json();
+    const etag = res.headers.get("ETag");
+    if (etag) respostasCache.set(url, { etag, data });
+    return data;
+}
+
 async function fetchEntity(entity) {
     try {
-        const res = await fetch(`/dashboard/data/${entity}`);
-        if (!res.ok) throw new Error("Erro ao buscar dados do servidor");
-        return await res.json();
+        return await fetchJsonCondicional(`/dashboard/data/${entity}`);
     } catch (err) {
         console.error("Erro:", err);
         return null;
@@ -192,15 +221,88 @@ async function showEntity(entity) {
     // atualiza charts
     updateChart(chartPrincipal, (data.chart && data.chart.type) || "bar", (data.chart && data.chart.labels) || [], (data.chart && data.chart.values) || []);
     updateChart(chartSecundario, (data.chart2 && data.chart2.type) || "line", (data.chart2 && data.chart2.labels) || [], (data.chart2 && data.chart2.values) || []);
+    fontesAtuais = FONTES_GRAFICOS[entity];
 
     // debug – mostra no console o que está chegando
     console.log("[dashboard] Chart1 labels recebidos:", data.chart && data.chart.labels);
     console.log("[dashboard] Chart2 labels recebidos:", data.chart2 && data.chart2.labels);
 
-    // tabela
-    renderTable(tabelaHead, tabelaBody, data.table || []);
+    // tabela (paginada no servidor)
+    abrirTabela(entity);
 }
 
+// ===================================================================
+// TABELA PAGINADA (cursor + ordenação no servidor)
+// ===================================================================
+
+const elPaginacao = document.getElementById("tabela-paginacao");
+const elTabelaInfo = document.getElementById("tabela-info");
+const btnPaginaAnterior = document.getElementById("btnPaginaAnterior");
+const btnPaginaProxima = document.getElementById("btnPaginaProxima");
+
+// cursores[i] = cursor que abre a página i (a página 0 não tem cursor)
+let tabela = { entity: null, ordem: "id", direcao: "desc", cursores: [null], pagina: 0, proximo: null };
+
+function abrirTabela(entity) {
+    tabela = { entity, ordem: "id", direcao: "desc", cursores: [null], pagina: 0, proximo: null };
+    carregarPagina();
+}
+
+async function carregarPagina() {
+    const params = new URLSearchParams({ ordem: tabela.ordem, direcao: tabela.direcao });
+    const cursor = tabela.cursores[tabela.pagina];
+    if (cursor) params.set("depois", cursor);
+
+    let data;
+    try {
+        data = await fetchJsonCondicional(`/dashboard/data/${tabela.entity}/tabela?${params}`);
+    } catch (err) {
+        console.error("Erro:", err);
+        return;
+    }
+
+    tabela.proximo = data.proximo;
+    renderTable(tabelaHead, tabelaBody, data.rows, data.columns);
+    marcarCabecalhos(data.ordenacao || {});
+
+    elTabelaInfo.textContent = `Página ${tabela.pagina + 1} — ${data.rows.length} de ${data.total} registros`;
+    btnPaginaAnterior.disabled = tabela.pagina === 0;
+    btnPaginaProxima.disabled = !tabela.proximo;
+    elPaginacao.classList.remove("d-none");
+}
+
+// cabeçalhos ordenáveis: clique alterna asc/desc
+function marcarCabecalhos(ordenacao) {
+    tabelaHead.querySelectorAll("th").forEach(th => {
+        const ordem = ordenacao[th.textContent];
+        if (!ordem) return;
+
+        th.style.cursor = "pointer";
+        if (ordem === tabela.ordem) th.textContent += tabela.direcao === "asc" ? " ▲" : " ▼";
+
+        th.addEventListener("click", () => {
+            tabela.direcao = (ordem === tabela.ordem && tabela.direcao === "asc") ? "desc" : "asc";
+            tabela.ordem = ordem;
+            tabela.cursores = [null];
+            tabela.pagina = 0;
+            carregarPagina();
+        });
+    });
+}
+
+btnPaginaAnterior.addEventListener("click", () => {
+    if (tabela.pagina === 0) return;
+    tabela.pagina -= 1;
+    carregarPagina();
+});
+
+btnPaginaProxima.addEventListener("click", () => {
+    if (!tabela.proximo) return;
+    tabela.pagina += 1;
+    tabela.cursores[tabela.pagina] = tabela.proximo;
+    carregarPagina();
+});
+
 // ===================================================================
 // EVENTOS DOS CARDS
 // ===================================================================
@@ -224,8 +326,61 @@ document.getElementById("btnMostrarTudo").addEventListener("click", () => {
 
     updateChart(chartPrincipal, "pie", DATA.usuariosLabels || [], DATA.usuariosValores || []);
     updateChart(chartSecundario, "line", DATA.loginLabels || [], DATA.loginValores || []);
+    fontesAtuais = FONTES_GRAFICOS.tudo;
 
+    tabela.entity = null;
     renderTable(tabelaHead, tabelaBody, DATA.logsIniciais || []);
+    elPaginacao.classList.add("d-none");
 
     document.querySelectorAll(".clickable-card").forEach(c => c.classList.remove("border-primary"));
 });
+
+// ===================================================================
+// ANÁLISE TEMPORAL (hora / dia / semana, fuso do Brasil)
+// ===================================================================
+
+const elSerieOperacao = document.getElementById("serie-operacao");
+const elSerieInicio = document.getElementById("serie-inicio");
+const elSerieFim = document.getElementById("serie-fim");
+const elSerieGranularidade = document.getElementById("serie-granularidade");
+const elSerieInfo = document.getElementById("serie-info");
+
+let chartSerie = createChart(document.getElementById("grafSerie").getContext("2d"), "line", [], []);
+
+async function carregarSerie() {
+    const params = new URLSearchParams({
+        operacao: elSerieOperacao.value || "LOGIN_SUCESSO",
+        granularidade: elSerieGranularidade.value
+    });
+    if (elSerieInicio.value) params.set("inicio", elSerieInicio.value);
+    if (elSerieFim.value) params.set("fim", elSerieFim.value);
+
+    let data;
+    try {
+        data = await fetchJsonCondicional(`/dashboard/serie?${params}`);
+    } catch (err) {
+        console.error("Erro:", err);
+        return;
+    }
+
+    // rótulos "AAAA-MM-DD HH:00" já estão no horário do Brasil: exibe como vieram
+    chartSerie.data.labels = data.labels;
+    chartSerie.data.datasets[0].data = data.values;
+    chartSerie.update();
+
+    let info = `${data.operacao}: ${data.values.reduce((a, b) => a + b, 0)} no período, por ${data.granularidade}`;
+    if (data.agrupamento > 1) info += ` (cada ponto soma ${data.agrupamento} períodos)`;
+    if (data.granularidade !== elSerieGranularidade.value) info += " — intervalo longo, granularidade ajustada";
+    elSerieInfo.textContent = info;
+}
+
+(DATA.operLabels || ["LOGIN_SUCESSO"]).forEach(operacao => {
+    const opt = document.createElement("option");
+    opt.value = operacao;
+    opt.textContent = operacao;
+    opt.selected = operacao === "LOGIN_SUCESSO";
+    elSerieOperacao.appendChild(opt);
+});
+
+document.getElementById("btnSerie").addEventListener("click", carregarSerie);
+carregarSerie();
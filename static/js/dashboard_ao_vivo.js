@@ -0,0 +1,131 @@
+// ====== DASHBOARD_AO_VIVO.JS — DELTAS VIA SOCKET.IO (/dashboard) ======
+// Usa DATA, fontesAtuais, chartPrincipal/chartSecundario, tabela e renderTable do dashboard.js.
+
+// séries do resumo que também vivem em DATA (visão "Mostrar Tudo")
+const SERIES_DATA = {
+    "usuarios.perfil": ["usuariosLabels", "usuariosValores"],
+    "logs.logins": ["loginLabels", "loginValores"],
+    "logs.operacoes": ["operLabels", "operValores"]
+};
+
+// limite de linhas em "últimos logs"
+const MAX_ULTIMOS_LOGS = 20;
+
+let socketDashboard = null;
+let jaConectou = false;
+
+
+// =======================================================
+// APLICAÇÃO DOS DELTAS
+// =======================================================
+
+// soma { rotulo: n } em labels/values (rótulo novo entra no fim)
+function somarNaSerie(labels, values, porRotulo, chaveDe) {
+    Object.entries(porRotulo).forEach(([rotulo, n]) => {
+        const chave = chaveDe(rotulo);
+        const i = labels.indexOf(chave);
+        if (i >= 0) values[i] += n;
+        else if (n > 0) {
+            labels.push(chave);
+            values.push(n);
+        }
+    });
+}
+
+function aplicarCards(cards) {
+    Object.entries(cards).forEach(([card, n]) => {
+        const el = document.querySelector(`[data-card="${card}"]`);
+        if (el) el.textContent = (Number(el.textContent) || 0) + n;
+    });
+}
+
+function aplicarSeries(series) {
+    Object.entries(series).forEach(([grupo, porSerie]) => {
+        Object.entries(porSerie).forEach(([serie, porRotulo]) => {
+            const campos = SERIES_DATA[`${grupo}.${serie}`];
+            if (campos && DATA[campos[0]]) {
+                somarNaSerie(DATA[campos[0]], DATA[campos[1]], porRotulo, rotulo => rotulo);
+            }
+
+            [chartPrincipal, chartSecundario].forEach((chart, i) => {
+                const [g, s] = fontesAtuais[i];
+                if (g !== grupo || s !== serie) return;
+                somarNaSerie(chart.data.labels, chart.data.datasets[0].data, porRotulo, toLabelString);
+                chart.update();
+            });
+        });
+    });
+}
+
+function aplicarLogs(logs) {
+    if (!logs.length) return;
+
+    // chegam do mais antigo para o mais recente
+    DATA.logsIniciais = logs.slice().reverse().concat(DATA.logsIniciais || []).slice(0, MAX_ULTIMOS_LOGS);
+
+    // tabela de últimos logs visível (nenhuma entidade selecionada)
+    if (!tabela.entity) renderTable(tabelaHead, tabelaBody, DATA.logsIniciais);
+}
+
+function receberDelta(payload) {
+    // buffer do servidor transbordou: deltas perdidos, recarrega tudo
+    if (payload.omitidos) {
+        recarregarResumo();
+        return;
+    }
+
+    payload.itens.forEach(delta => {
+        aplicarCards(delta.cards || {});
+        aplicarSeries(delta.series || {});
+        aplicarLogs(delta.logs || []);
+    });
+}
+
+
+// =======================================================
+// RESSINCRONIZAÇÃO (reconexão ou deltas perdidos)
+// =======================================================
+async function recarregarResumo() {
+    let resumo;
+    try {
+        resumo = await fetchJsonCondicional("/dashboard/resumo");
+    } catch (err) {
+        console.error("Erro:", err);
+        return;
+    }
+
+    Object.entries(resumo.cards).forEach(([card, valor]) => {
+        const el = document.querySelector(`[data-card="${card}"]`);
+        if (el) el.textContent = valor;
+    });
+
+    Object.entries(SERIES_DATA).forEach(([chave, [campoLabels, campoValores]]) => {
+        const [grupo, serie] = chave.split(".");
+        DATA[campoLabels] = [...resumo.series[grupo][serie].labels];
+        DATA[campoValores] = [...resumo.series[grupo][serie].values];
+    });
+
+    [chartPrincipal, chartSecundario].forEach((chart, i) => {
+        const [grupo, serie] = fontesAtuais[i];
+        const dados = resumo.series[grupo][serie];
+        updateChart(chart, chart.config.type, dados.labels, dados.values);
+    });
+}
+
+
+// =======================================================
+// CONEXÃO
+// =======================================================
+function conectarDashboard() {
+    socketDashboard = io("/dashboard");
+
+    // na reconexão, o que mudou enquanto estava offline não chega como delta
+    socketDashboard.on("connect", () => {
+        if (jaConectou) recarregarResumo();
+        jaConectou = true;
+    });
+
+    socketDashboard.on("dashboard_delta", receberDelta);
+}
+
+conectarDashboard();
@@ -0,0 +1,89 @@
+// ====== LOGS_TAIL.JS — LOGS AO VIVO (Socket.IO /logs) ======
+
+const btnAoVivo = document.getElementById("btnAoVivo");
+const tabelaLogs = document.getElementById("tabela-logs");
+const avisoAoVivo = document.getElementById("aviso-ao-vivo");
+
+// limite de linhas na tabela enquanto o modo ao vivo está ligado
+const MAX_LINHAS = 500;
+
+let socketLogs = null;
+let omitidosTotal = 0;
+
+
+// =======================================================
+// UTIL
+// =======================================================
+function escapeHtml(str) {
+    if (str === null || str === undefined) return "";
+    return String(str).replace(/&/g,"&amp;").replace(/</g,"&lt;").replace(/>/g,"&gt;");
+}
+
+function criarLinha(log) {
+    const tr = document.createElement("tr");
+    tr.className = "table-warning";
+    tr.innerHTML = `
+        <td>${log.id}</td>
+        <td>${escapeHtml(log.horario)}</td>
+        <td>${escapeHtml(log.usuario_nome)}</td>
+        <td>${escapeHtml(log.usuario_perfil)}</td>
+        <td>${escapeHtml(log.tipo_operacao)}</td>
+        <td>${escapeHtml(log.tipo_modelo)}</td>
+        <td>${escapeHtml(log.descricao)}</td>
+        <td><pre>${escapeHtml(log.modificacoes)}</pre></td>
+    `;
+    return tr;
+}
+
+
+// =======================================================
+// RECEBIMENTO (um evento por lote)
+// =======================================================
+function receberLogs(payload) {
+    // os itens chegam do mais antigo para o mais recente
+    const fragmento = document.createDocumentFragment();
+    payload.itens.slice().reverse().forEach(log => fragmento.appendChild(criarLinha(log)));
+    tabelaLogs.insertBefore(fragmento, tabelaLogs.firstChild);
+
+    while (tabelaLogs.rows.length > MAX_LINHAS) {
+        tabelaLogs.deleteRow(-1);
+    }
+
+    if (payload.omitidos) {
+        omitidosTotal += payload.omitidos;
+        avisoAoVivo.textContent = `${omitidosTotal} logs não exibidos durante picos — recarregue a página para ver todos.`;
+        avisoAoVivo.classList.remove("d-none");
+    }
+}
+
+
+// =======================================================
+// LIGAR / DESLIGAR
+// =======================================================
+function ligarAoVivo() {
+    socketLogs = io("/logs");
+
+    socketLogs.on("connect", () => {
+        socketLogs.emit("assinar", {
+            usuario: btnAoVivo.dataset.usuario,
+            tipo: btnAoVivo.dataset.tipo
+        });
+    });
+
+    socketLogs.on("logs_novos", receberLogs);
+
+    btnAoVivo.classList.replace("btn-outline-danger", "btn-danger");
+}
+
+function desligarAoVivo() {
+    socketLogs.disconnect();
+    socketLogs = null;
+    btnAoVivo.classList.replace("btn-danger", "btn-outline-danger");
+}
+
+if (btnAoVivo) {
+    btnAoVivo.addEventListener("click", () => {
+        if (socketLogs) desligarAoVivo();
+        else ligarAoVivo();
+    });
+}
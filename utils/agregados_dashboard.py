@@ -0,0 +1,119 @@
+from datetime import timedelta
+
+from sqlalchemy import String, cast, func, literal, null, select, union_all
+
+from config import db
+from models.log_resumo_model import LogResumoDiario
+from utils import contadores
+from utils.contadores import ENTIDADES, SEM_VALOR
+from utils.tempo import hoje_brasil
+
+
+# =====================================================
+# AGREGADOS DO DASHBOARD — UMA CONSULTA POR ENTIDADE
+# =====================================================
+# Cards e gráficos das entidades vêm de contadores_entidades (utils.contadores),
+# mantida pelos eventos do ORM. resumo_entidade_sql() calcula o mesmo resultado
+# direto nas tabelas — um único SELECT ... UNION ALL ... por entidade, com
+# linhas (serie, rotulo, qtd) — e serve para verificar/reconstruir os contadores.
+
+def _serie(rotulos_qtds):
+    return {
+        "labels": [rotulo for rotulo, _ in rotulos_qtds],
+        "values": [qtd for _, qtd in rotulos_qtds],
+    }
+
+
+def consulta_entidade(entidade):
+    """SELECT único com o total e as contagens agrupadas da entidade."""
+    modelo, series = ENTIDADES[entidade]
+    partes = [
+        select(literal("total").label("serie"), cast(null(), String).label("rotulo"), func.count().label("qtd"))
+        .select_from(modelo)
+    ]
+    for nome, coluna in series.items():
+        partes.append(
+            select(literal(nome), cast(coluna, String), func.count())
+            .select_from(modelo)
+            .group_by(coluna)
+        )
+    return union_all(*partes)
+
+
+def resumo_entidade(entidade):
+    """{"total": n, "series": {nome: {"labels": [...], "values": [...]}}} lido dos contadores."""
+    total, series = contadores.ler(entidade)
+    return {
+        "total": total,
+        "series": {nome: _serie(sorted(valores)) for nome, valores in series.items()},
+    }
+
+
+def resumo_entidade_sql(entidade):
+    """Mesmo formato de resumo_entidade(), calculado nas tabelas em uma ida ao banco."""
+    _, series = ENTIDADES[entidade]
+
+    total = 0
+    por_serie = {nome: [] for nome in series}
+
+    for serie, rotulo, qtd in db.session.execute(consulta_entidade(entidade)):
+        if serie == "total":
+            total = qtd
+            continue
+
+        # Enum gravado pelo nome → rótulo amigável (.value)
+        enum_classe = getattr(series[serie].type, "enum_class", None)
+        if enum_classe is not None and rotulo in enum_classe.__members__:
+            rotulo = enum_classe[rotulo].value
+
+        por_serie[serie].append((rotulo if rotulo else SEM_VALOR, qtd))
+
+    return {
+        "total": total,
+        "series": {nome: _serie(sorted(valores, key=lambda v: str(v[0]))) for nome, valores in por_serie.items()},
+    }
+
+
+def consulta_logs(dias=7):
+    """SELECT único sobre logs_resumo_diario: negados hoje, logins por dia e totais por operação."""
+    r = LogResumoDiario
+    hoje = hoje_brasil()
+    inicio = hoje - timedelta(days=dias - 1)
+
+    return union_all(
+        select(literal("negados_hoje").label("serie"), cast(null(), String).label("rotulo"),
+               func.coalesce(func.sum(r.total), 0).label("qtd"))
+        .where(r.tipo_operacao == "ACESSO_NEGADO", r.dia == hoje),
+
+        select(literal("logins"), cast(r.dia, String), func.sum(r.total))
+        .where(r.tipo_operacao == "LOGIN_SUCESSO", r.dia >= inicio)
+        .group_by(r.dia),
+
+        select(literal("operacoes"), r.tipo_operacao, func.sum(r.total))
+        .group_by(r.tipo_operacao),
+    )
+
+
+def resumo_logs_dashboard(dias=7):
+    """Card de acessos negados + séries de logins (com zeros) e operações, em uma ida ao banco."""
+    hoje = hoje_brasil()
+    negados = 0
+    logins = {}
+    operacoes = []
+
+    for serie, rotulo, qtd in db.session.execute(consulta_logs(dias)):
+        if serie == "negados_hoje":
+            negados = qtd
+        elif serie == "logins":
+            logins[rotulo] = qtd
+        else:
+            operacoes.append((rotulo, qtd))
+
+    dias_serie = [str(hoje - timedelta(days=i)) for i in range(dias - 1, -1, -1)]
+    return {
+        "acessos_negados_hoje": negados,
+        "series": {
+            "logins": _serie([(dia, logins.get(dia, 0)) for dia in dias_serie]),
+            "operacoes": _serie(sorted(operacoes)),
+        },
+    }
@@ -0,0 +1,216 @@
+import ast
+import json
+
+import click
+
+from config import db
+from models.log_model import Log
+from models.log_alteracao_model import LogAlteracao
+from utils.gravador_logs import gravador_logs
+
+
+# =====================================================
+# MODIFICAÇÕES ESTRUTURADAS DOS LOGS
+# =====================================================
+# Log.modificacoes é sempre gravado como JSON canônico (chaves ordenadas).
+# Para CRIAR / ATUALIZAR / DELETAR, cada campo alterado vira uma linha em
+# logs_alteracoes, indexada por entidade/campo e por entidade/registro.
+
+OPERACOES_COM_DIFF = ("CRIAR", "ATUALIZAR", "DELETAR")
+
+
+def init_app(app):
+    gravador_logs.na_transacao(indexar_alteracoes)
+
+    @app.cli.command("reindexar-alteracoes")
+    def reindexar_alteracoes_comando():
+        """Normaliza Log.modificacoes e reconstrói logs_alteracoes a partir dos logs."""
+        total = reindexar()
+        click.echo(f"{total} alterações indexadas.")
+
+
+def normalizar_modificacoes(valor, entidade_id=None):
+    """
+    Converte o payload de modificações em JSON canônico.
+
+    Aceita dict/list, string JSON ou repr Python de dict (str(dict)).
+    Texto livre vira uma string JSON. None continua None.
+    Com entidade_id, o id do registro afetado entra no payload como "id".
+    """
+    if valor is None:
+        return None if entidade_id is None else normalizar_modificacoes({}, entidade_id)
+
+    if isinstance(valor, str):
+        valor = _interpretar(valor)
+
+    if entidade_id is not None and isinstance(valor, dict):
+        valor = {**valor, "id": valor.get("id", entidade_id)}
+
+    return json.dumps(valor, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def _interpretar(texto):
+    """JSON ou repr de dict (logs antigos); o que não der para ler fica como texto."""
+    # Texto aninhado demais levanta RecursionError/MemoryError, não só ValueError:
+    # qualquer falha aqui perderia o log inteiro no gancho do gravador
+    try:
+        return json.loads(texto)
+    except Exception:
+        pass
+    try:
+        return ast.literal_eval(texto)
+    except Exception:
+        return texto
+
+
+def _texto(valor):
+    if valor is None or isinstance(valor, str):
+        return valor
+    return json.dumps(valor, ensure_ascii=False, sort_keys=True, default=str)
+
+
+def extrair_alteracoes(tipo_operacao, modificacoes):
+    """(entidade_id, [(campo, antigo, novo)]) a partir do payload canônico de um log."""
+    if tipo_operacao not in OPERACOES_COM_DIFF or not modificacoes:
+        return None, []
+
+    try:
+        dados = json.loads(modificacoes)
+    except ValueError:
+        return None, []
+    if not isinstance(dados, dict):
+        return None, []
+
+    dados = dict(dados)
+    entidade_id = dados.pop("id", None)
+    if not isinstance(entidade_id, int):
+        entidade_id = None
+
+    return entidade_id, _campos_alterados(tipo_operacao, dados)
+
+
+def _campos_alterados(tipo_operacao, dados):
+    if "antes" in dados or "depois" in dados:
+        antes = dados.get("antes") or {}
+        depois = dados.get("depois") or {}
+        campos = sorted(set(antes) | set(depois))
+        return [
+            (campo, _texto(antes.get(campo)), _texto(depois.get(campo)))
+            for campo in campos
+            if campo in depois and antes.get(campo) != depois.get(campo)
+        ]
+
+    if tipo_operacao == "CRIAR":
+        return [(campo, None, _texto(valor)) for campo, valor in sorted(dados.items())]
+
+    if tipo_operacao == "DELETAR":
+        return [(campo, _texto(valor), None) for campo, valor in sorted(dados.items())]
+
+    return []
+
+
+def _linhas(log):
+    entidade_id, alteracoes = extrair_alteracoes(log.tipo_operacao, log.modificacoes)
+    return [
+        {
+            "log_id": log.id,
+            "horario": log.horario,
+            "tipo_operacao": log.tipo_operacao,
+            "entidade": log.tipo_modelo,
+            "entidade_id": entidade_id,
+            "campo": campo,
+            "valor_antigo": antigo,
+            "valor_novo": novo,
+        }
+        for campo, antigo, novo in alteracoes
+    ]
+
+
+def indexar_alteracoes(logs):
+    """Gancho do gravador: grava as alterações dos logs do lote (sem commit)."""
+    com_diff = [log for log in logs if log.tipo_operacao in OPERACOES_COM_DIFF and log.modificacoes]
+    if not com_diff:
+        return
+
+    db.session.flush()  # precisa dos ids dos logs
+
+    linhas = []
+    for log in com_diff:
+        linhas.extend(_linhas(log))
+
+    if linhas:
+        db.session.execute(LogAlteracao.__table__.insert(), linhas)
+
+
+def reindexar(tamanho_lote=2000):
+    """Normaliza os payloads existentes e reconstrói logs_alteracoes. Retorna o total de linhas."""
+    from utils.arquivo_logs import listar_segmentos, ler_segmento
+
+    db.session.query(LogAlteracao).delete()
+    total = 0
+
+    # Logs arquivados: só reindexa (os segmentos não são reescritos)
+    for indice in listar_segmentos():
+        linhas = []
+        for log in ler_segmento(indice):
+            log.modificacoes = normalizar_modificacoes(log.modificacoes)
+            linhas.extend(_linhas(log))
+        if linhas:
+            db.session.execute(LogAlteracao.__table__.insert(), linhas)
+            total += len(linhas)
+
+    ultimo_id = 0
+
+    while True:
+        logs = Log.query.filter(Log.id > ultimo_id).order_by(Log.id.asc()).limit(tamanho_lote).all()
+        if not logs:
+            break
+
+        linhas = []
+        for log in logs:
+            canonico = normalizar_modificacoes(log.modificacoes)
+            if canonico != log.modificacoes:
+                log.modificacoes = canonico
+            linhas.extend(_linhas(log))
+
+        if linhas:
+            db.session.execute(LogAlteracao.__table__.insert(), linhas)
+
+        ultimo_id = logs[-1].id
+        db.session.commit()
+        db.session.expunge_all()
+        total += len(linhas)
+
+    db.session.commit()
+    return total
+
+
+def garantir_alteracoes():
+    """Na primeira subida com a tabela nova, indexa as alterações dos logs existentes."""
+    if db.session.query(LogAlteracao.id).first() is None and \
+            db.session.query(Log.id).filter(Log.tipo_operacao.in_(OPERACOES_COM_DIFF)).first() is not None:
+        reindexar()
+
+
+# =====================================================
+# CONSULTAS
+# =====================================================
+def historico_registro(entidade, entidade_id, limite=200):
+    """Alterações de um registro, da mais recente para a mais antiga."""
+    return (
+        LogAlteracao.query
+        .filter_by(entidade=entidade, entidade_id=entidade_id)
+        .order_by(LogAlteracao.id.desc())
+        .limit(limite)
+        .all()
+    )
+
+
+def alteracoes_do_campo(entidade, campo, inicio=None, fim=None, limite=500):
+    """Alterações de um campo de uma entidade, opcionalmente num intervalo UTC [inicio, fim)."""
+    query = LogAlteracao.query.filter_by(entidade=entidade, campo=campo)
+    if inicio:
+        query = query.filter(LogAlteracao.horario >= inicio)
+    if fim:
+        query = query.filter(LogAlteracao.horario < fim)
+    return query.order_by(LogAlteracao.horario.desc()).limit(limite).all()
@@ -0,0 +1,166 @@
+import math
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func
+
+from config import db
+from models.log_model import Log
+from models.log_resumo_model import LogResumoDiario
+from utils.tempo import FUSO_BR, intervalo_datas_utc
+
+
+# =====================================================
+# SÉRIES TEMPORAIS DE LOGS (hora / dia / semana, fuso do Brasil)
+# =====================================================
+# Dia e semana saem de logs_resumo_diario (já em dias locais): um ano são
+# ~365 linhas por operação, inclusive logs arquivados.
+# Hora sai da tabela logs com range scan em (tipo_operacao, horario) e
+# GROUP BY da hora UTC; como o fuso de São Paulo tem deslocamento de horas
+# inteiras, cada hora UTC corresponde a exatamente uma hora local.
+# Intervalos longos sobem de granularidade (hora → dia → semana) e, se ainda
+# passarem de `max_pontos`, agrupam baldes vizinhos. Baldes vazios valem 0.
+
+GRANULARIDADES = ("hora", "dia", "semana")
+MAX_PONTOS = 400
+MAX_DIAS = 3660   # ~10 anos: acima disso o intervalo é recusado
+
+
+class IntervaloInvalido(ValueError):
+    """Granularidade desconhecida, data final antes da inicial ou intervalo longo demais."""
+
+
+# -------------------------------------------------
+# Baldes
+# -------------------------------------------------
+def _baldes_hora(inicio, fim):
+    """Início (UTC) de cada hora local entre as datas (inclusivas)."""
+    inicio_utc, fim_utc = intervalo_datas_utc(inicio, fim)
+    total = int((fim_utc - inicio_utc) / timedelta(hours=1))
+    return [inicio_utc + timedelta(hours=i) for i in range(total)]
+
+
+def _baldes_dia(inicio, fim):
+    return [inicio + timedelta(days=i) for i in range((fim - inicio).days + 1)]
+
+
+def _baldes_semana(inicio, fim):
+    """Segundas-feiras das semanas que tocam o intervalo."""
+    primeira = inicio - timedelta(days=inicio.weekday())
+    return [primeira + timedelta(weeks=i) for i in range((fim - primeira).days // 7 + 1)]
+
+
+BALDES = {"hora": _baldes_hora, "dia": _baldes_dia, "semana": _baldes_semana}
+
+
+def quantidade_baldes(granularidade, inicio, fim):
+    """Quantos baldes a granularidade gera, sem montar a lista."""
+    if granularidade == "hora":
+        inicio_utc, fim_utc = intervalo_datas_utc(inicio, fim)
+        return int((fim_utc - inicio_utc) / timedelta(hours=1))
+    if granularidade == "dia":
+        return (fim - inicio).days + 1
+    primeira = inicio - timedelta(days=inicio.weekday())
+    return (fim - primeira).days // 7 + 1
+
+
+def _rotulo(granularidade, balde):
+    if granularidade == "hora":
+        return balde.astimezone(FUSO_BR).strftime("%Y-%m-%d %H:00")
+    return balde.isoformat()
+
+
+# -------------------------------------------------
+# Contagens
+# -------------------------------------------------
+def _hora_utc(coluna, dialeto):
+    """Expressão SQL 'AAAA-MM-DD HH' da hora UTC (None = agrupar em Python)."""
+    if dialeto == "sqlite":
+        return func.strftime("%Y-%m-%d %H", coluna)
+    if dialeto == "postgresql":
+        return func.to_char(func.date_trunc("hour", func.timezone("UTC", coluna)), "YYYY-MM-DD HH24")
+    return None
+
+
+def _contar_horas(tipo_operacao, inicio, fim):
+    """{hora UTC (datetime): qtd} direto na tabela logs."""
+    inicio_utc, fim_utc = intervalo_datas_utc(inicio, fim)
+    filtros = (Log.tipo_operacao == tipo_operacao, Log.horario >= inicio_utc, Log.horario < fim_utc)
+
+    hora = _hora_utc(Log.horario, db.session.get_bind().dialect.name)
+    if hora is None:
+        contagem = {}
+        for (horario,) in db.session.query(Log.horario).filter(*filtros).yield_per(5000):
+            if horario.tzinfo is None:
+                horario = horario.replace(tzinfo=timezone.utc)
+            chave = horario.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+            contagem[chave] = contagem.get(chave, 0) + 1
+        return contagem
+
+    return {
+        datetime.strptime(rotulo, "%Y-%m-%d %H").replace(tzinfo=timezone.utc): qtd
+        for rotulo, qtd in db.session.query(hora, func.count()).filter(*filtros).group_by(hora)
+    }
+
+
+def _contar_dias(tipo_operacao, inicio, fim):
+    """{dia local: qtd} em logs_resumo_diario."""
+    r = LogResumoDiario
+    return dict(
+        db.session.query(r.dia, func.sum(r.total))
+        .filter(r.tipo_operacao == tipo_operacao, r.dia >= inicio, r.dia <= fim)
+        .group_by(r.dia)
+    )
+
+
+def _contar_semanas(tipo_operacao, inicio, fim):
+    contagem = {}
+    for dia, qtd in _contar_dias(tipo_operacao, inicio, fim).items():
+        segunda = dia - timedelta(days=dia.weekday())
+        contagem[segunda] = contagem.get(segunda, 0) + qtd
+    return contagem
+
+
+CONTAGENS = {"hora": _contar_horas, "dia": _contar_dias, "semana": _contar_semanas}
+
+
+# -------------------------------------------------
+# Série
+# -------------------------------------------------
+def escolher_granularidade(inicio, fim, granularidade, max_pontos=MAX_PONTOS):
+    """A granularidade pedida ou a primeira mais grossa que cabe em max_pontos."""
+    for candidata in GRANULARIDADES[GRANULARIDADES.index(granularidade):]:
+        if quantidade_baldes(candidata, inicio, fim) <= max_pontos:
+            return candidata
+    return GRANULARIDADES[-1]
+
+
+def serie_temporal(tipo_operacao, inicio, fim, granularidade="dia", max_pontos=MAX_PONTOS):
+    """
+    Série de uma operação entre duas datas locais (inclusivas).
+
+    {"granularidade": usada, "agrupamento": baldes por ponto, "labels": [...], "values": [...]}
+    """
+    if granularidade not in GRANULARIDADES:
+        raise IntervaloInvalido(f"granularidade deve ser uma de: {', '.join(GRANULARIDADES)}")
+    if fim < inicio:
+        raise IntervaloInvalido("fim antes do início")
+    if (fim - inicio).days + 1 > MAX_DIAS:
+        raise IntervaloInvalido(f"intervalo máximo: {MAX_DIAS} dias")
+
+    granularidade = escolher_granularidade(inicio, fim, granularidade, max_pontos)
+    baldes = BALDES[granularidade](inicio, fim)
+    contagem = CONTAGENS[granularidade](tipo_operacao, inicio, fim)
+    valores = [contagem.get(balde, 0) for balde in baldes]
+
+    # Ainda grande demais (ex.: décadas em semanas): soma baldes vizinhos
+    agrupamento = max(math.ceil(len(baldes) / max_pontos), 1)
+    if agrupamento > 1:
+        baldes = baldes[::agrupamento]
+        valores = [sum(valores[i:i + agrupamento]) for i in range(0, len(valores), agrupamento)]
+
+    return {
+        "granularidade": granularidade,
+        "agrupamento": agrupamento,
+        "labels": [_rotulo(granularidade, balde) for balde in baldes],
+        "values": valores,
+    }
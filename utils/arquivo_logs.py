@@ -0,0 +1,321 @@
+import glob
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+import click
+from flask import current_app
+
+from config import db, BASE_DIR
+from models.log_model import Log
+from utils.tempo import hoje_brasil, inicio_do_dia_utc, utc_to_brasil
+
+
+# =====================================================
+# ARQUIVAMENTO DE LOGS EM SEGMENTOS MENSAIS
+# =====================================================
+# Cada mês (horário do Brasil) vira um par de arquivos em LOG_ARQUIVO_DIR:
+#   logs-AAAA-MM.ndjson.gz  → um log por linha (gzip, um membro por lote)
+#   logs-AAAA-MM.json       → índice: faixa de ids, faixa de horário, contagem por operação
+# Os ids não seguem a ordem de horario (o horario é o do enfileiramento, o
+# id só sai no commit do lote), então um segmento pode receber ids menores
+# que o seu id_max. A deduplicação é por id: só ids abaixo de id_max são
+# conferidos contra o conteúdo do segmento (lotes fora de ordem), e só são
+# apagados do banco os ids que estão no segmento.
+#
+# O índice guarda em "bytes" o tamanho do segmento no último lote concluído.
+# Cada lote vira um membro gzip completo num temporário (fsync) antes de ir
+# para o fim do segmento. Se o processo cai entre o segmento e o índice, a
+# cauda além de "bytes" (membro truncado ou linhas sem índice, ainda no
+# banco) é cortada na próxima execução e os leitores nunca passam de "bytes".
+
+CAMPOS = (
+    "id", "horario", "usuario_id", "usuario_nome", "usuario_perfil",
+    "tipo_operacao", "tipo_modelo", "descricao", "modificacoes"
+)
+
+
+class LogArquivado:
+    """Log lido de um segmento; expõe os mesmos atributos de Log."""
+
+    __slots__ = CAMPOS + ("horario_brasil",)
+    arquivado = True
+
+    def __init__(self, dados):
+        for campo in CAMPOS:
+            setattr(self, campo, dados.get(campo))
+        self.horario = datetime.fromisoformat(self.horario)
+        self.horario_brasil = None
+
+
+def init_app(app):
+    app.config.setdefault("LOG_ARQUIVO_DIR", os.path.join(BASE_DIR, "arquivo_logs"))
+    app.config.setdefault("LOG_RETENCAO_DIAS", 180)
+
+    @app.cli.command("arquivar-logs")
+    @click.option("--dias", type=int, default=None, help="Horizonte de retenção (padrão: LOG_RETENCAO_DIAS).")
+    def arquivar_logs_comando(dias):
+        """Move logs mais antigos que o horizonte para segmentos comprimidos."""
+        total = arquivar_logs(dias)
+        click.echo(f"{total} logs arquivados em {pasta_arquivo()}")
+
+
+def pasta_arquivo():
+    return current_app.config["LOG_ARQUIVO_DIR"]
+
+
+def _caminhos(mes):
+    pasta = pasta_arquivo()
+    return (
+        os.path.join(pasta, f"logs-{mes}.ndjson.gz"),
+        os.path.join(pasta, f"logs-{mes}.json"),
+    )
+
+
+# -------------------------------------------------
+# Índices (sidecar) dos segmentos
+# -------------------------------------------------
+def _ler_indice(mes):
+    _, caminho = _caminhos(mes)
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding="utf-8") as arquivo:
+        return json.load(arquivo)
+
+
+def _gravar_indice(indice):
+    _, caminho = _caminhos(indice["mes"])
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(indice, arquivo, ensure_ascii=False, indent=2)
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    os.replace(temporario, caminho)
+
+
+def listar_segmentos():
+    """Índices de todos os segmentos, do mês mais recente para o mais antigo."""
+    indices = []
+    for caminho in glob.glob(os.path.join(pasta_arquivo(), "logs-*.json")):
+        with open(caminho, encoding="utf-8") as arquivo:
+            indices.append(json.load(arquivo))
+    return sorted(indices, key=lambda i: i["id_max"], reverse=True)
+
+
+# -------------------------------------------------
+# Arquivamento
+# -------------------------------------------------
+def arquivar_logs(horizonte_dias=None, tamanho_lote=5000):
+    """Move para os segmentos os logs anteriores a hoje - horizonte_dias. Retorna o total movido."""
+    if horizonte_dias is None:
+        horizonte_dias = current_app.config["LOG_RETENCAO_DIAS"]
+
+    limite = inicio_do_dia_utc(hoje_brasil() - timedelta(days=horizonte_dias))
+    os.makedirs(pasta_arquivo(), exist_ok=True)
+
+    colunas = [getattr(Log, campo) for campo in CAMPOS]
+    total = 0
+
+    while True:
+        linhas = (
+            db.session.query(*colunas)
+            .filter(Log.horario < limite)
+            .order_by(Log.id.asc())
+            .limit(tamanho_lote)
+            .all()
+        )
+        if not linhas:
+            return total
+
+        por_mes = {}
+        for linha in linhas:
+            mes = utc_to_brasil(linha.horario).strftime("%Y-%m")
+            por_mes.setdefault(mes, []).append(linha)
+
+        ids = []
+        for mes, registros in por_mes.items():
+            ids.extend(_anexar_ao_segmento(mes, registros))
+
+        # Só remove do banco o que está no segmento, com o índice em disco
+        Log.query.filter(Log.id.in_(ids)).delete(synchronize_session=False)
+        db.session.commit()
+        total += len(ids)
+
+
+def _anexar_ao_segmento(mes, registros):
+    """Grava os registros que o segmento ainda não tem; devolve os ids que estão nele."""
+    caminho_dados, _ = _caminhos(mes)
+    indice = _ler_indice(mes) or {
+        "mes": mes,
+        "arquivo": os.path.basename(caminho_dados),
+        "id_min": None,
+        "id_max": 0,
+        "horario_min": None,
+        "horario_max": None,
+        "total": 0,
+        "operacoes": {},
+        "bytes": 0,
+    }
+
+    tamanho = os.path.getsize(caminho_dados) if os.path.exists(caminho_dados) else 0
+    if "bytes" not in indice:
+        # Índice anterior ao campo: confia no arquivo e confere tudo contra ele
+        indice["bytes"] = tamanho
+        conferir = True
+    else:
+        conferir = any(r.id <= indice["id_max"] for r in registros)
+        if tamanho > indice["bytes"]:
+            # Queda entre o segmento e o índice: descarta a cauda sem índice
+            with open(caminho_dados, "rb+") as arquivo:
+                arquivo.truncate(indice["bytes"])
+                os.fsync(arquivo.fileno())
+
+    # Acima de id_max é certamente novo; abaixo, confere o que o segmento já tem
+    existentes = {r.id for r in ler_segmento(indice)} if conferir else set()
+    novos = [r for r in registros if r.id not in existentes]
+    if not novos:
+        return [r.id for r in registros]
+
+    _anexar_membro(caminho_dados, novos)
+
+    horarios = [_iso(r.horario) for r in novos]
+    operacoes = Counter(indice["operacoes"])
+    operacoes.update(r.tipo_operacao for r in novos)
+
+    indice.update({
+        "id_min": min(i for i in (indice["id_min"], *(r.id for r in novos)) if i is not None),
+        "id_max": max(indice["id_max"], *(r.id for r in novos)),
+        "horario_min": min([h for h in (indice["horario_min"], *horarios) if h]),
+        "horario_max": max([h for h in (indice["horario_max"], *horarios) if h]),
+        "total": indice["total"] + len(novos),
+        "operacoes": dict(operacoes),
+        "bytes": os.path.getsize(caminho_dados),
+    })
+    _gravar_indice(indice)
+    return [r.id for r in registros]
+
+
+def _anexar_membro(caminho_dados, registros):
+    """Comprime o lote num temporário e só então copia o membro inteiro para o segmento."""
+    with tempfile.TemporaryFile(dir=os.path.dirname(caminho_dados)) as temporario:
+        with gzip.open(temporario, "wt", encoding="utf-8") as membro:
+            for r in registros:
+                dados = {campo: getattr(r, campo) for campo in CAMPOS}
+                dados["horario"] = _iso(r.horario)
+                membro.write(json.dumps(dados, ensure_ascii=False) + "\n")
+        temporario.flush()
+        os.fsync(temporario.fileno())
+
+        temporario.seek(0)
+        with open(caminho_dados, "ab") as arquivo:
+            shutil.copyfileobj(temporario, arquivo)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+
+
+def _iso(dt):
+    """ISO 8601 em UTC com microssegundos (comparável como texto)."""
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc).isoformat(timespec="microseconds")
+
+
+# -------------------------------------------------
+# Leitura transparente
+# -------------------------------------------------
+def ler_segmento(indice):
+    """Todos os registros de um segmento, em ordem crescente de id."""
+    caminho = os.path.join(pasta_arquivo(), indice["arquivo"])
+    with open(caminho, "rb") as bruto:
+        # Só os lotes concluídos (até "bytes"); segmento anterior ao campo: inteiro
+        trecho = _Trecho(bruto, indice.get("bytes"))
+        with gzip.open(io.BufferedReader(trecho), "rt", encoding="utf-8") as arquivo:
+            for linha in arquivo:
+                yield LogArquivado(json.loads(linha))
+
+
+class _Trecho(io.RawIOBase):
+    """Leitura de um arquivo limitada aos primeiros `limite` bytes (None = inteiro)."""
+
+    def __init__(self, arquivo, limite):
+        self._arquivo = arquivo
+        self._restante = limite
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        tamanho = len(buffer) if self._restante is None else min(len(buffer), self._restante)
+        dados = self._arquivo.read(tamanho)
+        buffer[:len(dados)] = dados
+        if self._restante is not None:
+            self._restante -= len(dados)
+        return len(dados)
+
+
+def lotes_arquivados(inicio=None, fim=None, usuario=None, tipo=None,
+                     antes_id=None, depois_id=None, crescente=False):
+    """
+    Logs arquivados que atendem aos filtros, um lote (lista) por segmento.
+
+    Os segmentos são podados pelo índice (faixa de horário e de ids) sem abrir
+    o arquivo. Dentro de cada lote a ordem é por id (decrescente por padrão);
+    a memória fica limitada aos registros filtrados de um mês.
+    """
+    segmentos = listar_segmentos()
+    if crescente:
+        segmentos.reverse()
+
+    inicio_iso = _iso(inicio) if inicio else None
+    fim_iso = _iso(fim) if fim else None
+
+    for indice in segmentos:
+        if inicio_iso and indice["horario_max"] < inicio_iso:
+            continue
+        if fim_iso and indice["horario_min"] >= fim_iso:
+            continue
+        if antes_id is not None and indice["id_min"] >= antes_id:
+            continue
+        if depois_id is not None and indice["id_max"] <= depois_id:
+            continue
+        if tipo and not any(tipo.lower() in op.lower() for op in indice["operacoes"]):
+            continue
+
+        lote = [
+            r for r in ler_segmento(indice)
+            if _atende(r, inicio, fim, usuario, tipo, antes_id, depois_id)
+        ]
+        if lote:
+            lote.sort(key=lambda r: r.id, reverse=not crescente)
+            yield lote
+
+
+def _atende(r, inicio, fim, usuario, tipo, antes_id, depois_id):
+    if inicio and r.horario < inicio:
+        return False
+    if fim and r.horario >= fim:
+        return False
+    if usuario and usuario.lower() not in (r.usuario_nome or "").lower():
+        return False
+    if tipo and tipo.lower() not in (r.tipo_operacao or "").lower():
+        return False
+    if antes_id is not None and r.id >= antes_id:
+        return False
+    if depois_id is not None and r.id <= depois_id:
+        return False
+    return True
+
+
+def buscar_arquivados(limite, **filtros):
+    """Primeiros `limite` registros arquivados na ordem pedida (para paginação)."""
+    resultado = []
+    for lote in lotes_arquivados(**filtros):
+        resultado.extend(lote[:limite - len(resultado)])
+        if len(resultado) >= limite:
+            break
+    return resultado
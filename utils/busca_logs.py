@@ -0,0 +1,135 @@
+import re
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from config import db
+from models.log_model import Log
+
+
+# =====================================================
+# ÍNDICE FULL-TEXT (SQLite FTS5) SOBRE OS LOGS
+# =====================================================
+# Tabela "sombra" com conteúdo externo: o texto continua só em `logs`,
+# o FTS guarda apenas o índice invertido. Os triggers mantêm o índice em
+# sincronia na mesma transação do INSERT/DELETE/UPDATE em `logs`.
+DDL_FTS = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS logs_fts USING fts5(
+        descricao, modificacoes,
+        content='logs', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS logs_fts_ai AFTER INSERT ON logs BEGIN
+        INSERT INTO logs_fts(rowid, descricao, modificacoes)
+        VALUES (new.id, new.descricao, new.modificacoes);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS logs_fts_ad AFTER DELETE ON logs BEGIN
+        INSERT INTO logs_fts(logs_fts, rowid, descricao, modificacoes)
+        VALUES ('delete', old.id, old.descricao, old.modificacoes);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS logs_fts_au AFTER UPDATE ON logs BEGIN
+        INSERT INTO logs_fts(logs_fts, rowid, descricao, modificacoes)
+        VALUES ('delete', old.id, old.descricao, old.modificacoes);
+        INSERT INTO logs_fts(rowid, descricao, modificacoes)
+        VALUES (new.id, new.descricao, new.modificacoes);
+    END
+    """,
+]
+
+SQL_BUSCA = text("""
+    SELECT l.id, l.horario, l.usuario_nome, l.usuario_perfil,
+           l.tipo_operacao, l.tipo_modelo, l.descricao, l.modificacoes,
+           snippet(logs_fts, -1, '[', ']', '…', 12) AS trecho,
+           bm25(logs_fts) AS relevancia
+    FROM logs_fts
+    JOIN logs l ON l.id = logs_fts.rowid
+    WHERE logs_fts MATCH :consulta
+    ORDER BY relevancia
+    LIMIT :limite
+""").columns(horario=db.DateTime(timezone=True))
+
+_fts_disponivel = False
+
+
+def criar_indice_busca():
+    """Cria a tabela FTS5 e os triggers (idempotente). Retorna se o FTS está ativo."""
+    global _fts_disponivel
+
+    if db.engine.dialect.name != "sqlite":
+        _fts_disponivel = False
+        return False
+
+    try:
+        existia = db.session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type='table' AND name='logs_fts'")
+        ).first() is not None
+
+        for ddl in DDL_FTS:
+            db.session.execute(text(ddl))
+
+        # Primeira criação em banco com logs antigos → indexa o que já existe
+        if not existia:
+            db.session.execute(text("INSERT INTO logs_fts(logs_fts) VALUES ('rebuild')"))
+
+        db.session.commit()
+        _fts_disponivel = True
+
+    except OperationalError:
+        # SQLite compilado sem FTS5
+        db.session.rollback()
+        _fts_disponivel = False
+
+    return _fts_disponivel
+
+
+def fts_disponivel():
+    return _fts_disponivel
+
+
+def montar_consulta_fts(termo):
+    """Transforma texto livre em consulta FTS5 segura: todos os termos, com prefixo."""
+    palavras = re.findall(r"\w+", termo or "", flags=re.UNICODE)
+    return " ".join(f'"{p}"*' for p in palavras)
+
+
+def buscar_logs(termo, limite=50):
+    """Busca em descricao e modificacoes, ordenada por relevância (bm25)."""
+    consulta = montar_consulta_fts(termo)
+    if not consulta:
+        return []
+
+    if _fts_disponivel:
+        linhas = db.session.execute(SQL_BUSCA, {"consulta": consulta, "limite": limite}).mappings().all()
+        return [dict(linha) for linha in linhas]
+
+    # Sem FTS5 (outro banco): varredura com LIKE, mais recentes primeiro
+    padrao = f"%{termo.strip()}%"
+    logs = (
+        Log.query
+        .filter(Log.descricao.ilike(padrao) | Log.modificacoes.ilike(padrao))
+        .order_by(Log.id.desc())
+        .limit(limite)
+        .all()
+    )
+    return [
+        {
+            "id": log.id,
+            "horario": log.horario,
+            "usuario_nome": log.usuario_nome,
+            "usuario_perfil": log.usuario_perfil,
+            "tipo_operacao": log.tipo_operacao,
+            "tipo_modelo": log.tipo_modelo,
+            "descricao": log.descricao,
+            "modificacoes": log.modificacoes,
+            "trecho": log.descricao,
+            "relevancia": None,
+        }
+        for log in logs
+    ]
@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# =====================================================
+# CACHE EM MEMÓRIA — TTL POR CHAVE + LRU
+# =====================================================
+class CacheTTL:
+    """
+    Cache de valores calculados (agregados do dashboard).
+
+    Cada entrada tem TTL próprio e etiquetas ("usuarios", "logs", ...);
+    invalidar(etiqueta) remove todas as entradas marcadas com ela.
+    Acima de `maximo` entradas, a menos usada recentemente sai (LRU).
+    """
+
+    def __init__(self, maximo=256, ttl_padrao=30.0):
+        self.maximo = maximo
+        self.ttl_padrao = ttl_padrao
+
+        self._dados = OrderedDict()  # { chave: (expira_em, valor, etiquetas) }
+        self._por_etiqueta = {}      # { etiqueta: {chaves} }
+        self._geracao = {}           # { etiqueta: nº de invalidações }
+        self._lock = threading.Lock()
+
+        # Contadores expostos em estatisticas()
+        self.acertos = 0
+        self.falhas = 0
+        self.expirados = 0
+        self.despejos = 0
+        self.invalidacoes = 0
+
+    def init_app(self, app):
+        app.config.setdefault("DASHBOARD_CACHE_MAX", 256)
+        app.config.setdefault("DASHBOARD_CACHE_TTL", 30)
+
+        self.maximo = int(app.config["DASHBOARD_CACHE_MAX"])
+        self.ttl_padrao = float(app.config["DASHBOARD_CACHE_TTL"])
+        app.extensions["cache_dashboard"] = self
+
+    # -------------------------------------------------
+    # Leitura / escrita
+    # -------------------------------------------------
+    def obter(self, chave, calcular, ttl=None, etiquetas=()):
+        """Valor em cache para a chave; se ausente ou vencido, calcular() e guarda."""
+        agora = time.monotonic()
+
+        with self._lock:
+            entrada = self._dados.get(chave)
+            if entrada is not None:
+                if entrada[0] > agora:
+                    self._dados.move_to_end(chave)
+                    self.acertos += 1
+                    return entrada[1]
+                self._remover(chave)
+                self.expirados += 1
+            self.falhas += 1
+            geracoes = self._geracoes(etiquetas)
+
+        # Calcula fora do lock (consulta ao banco)
+        valor = calcular()
+        self.guardar(chave, valor, ttl, etiquetas, geracoes)
+        return valor
+
+    def guardar(self, chave, valor, ttl=None, etiquetas=(), geracoes=None):
+        expira_em = time.monotonic() + (self.ttl_padrao if ttl is None else ttl)
+
+        with self._lock:
+            # Houve escrita durante o cálculo → o valor pode estar velho
+            if geracoes is not None and geracoes != self._geracoes(etiquetas):
+                return
+
+            self._remover(chave)
+            self._dados[chave] = (expira_em, valor, tuple(etiquetas))
+            for etiqueta in etiquetas:
+                self._por_etiqueta.setdefault(etiqueta, set()).add(chave)
+
+            while len(self._dados) > self.maximo:
+                antiga = next(iter(self._dados))
+                self._remover(antiga)
+                self.despejos += 1
+
+    def _geracoes(self, etiquetas):
+        return tuple(self._geracao.get(etiqueta, 0) for etiqueta in etiquetas)
+
+    def _remover(self, chave):
+        entrada = self._dados.pop(chave, None)
+        if entrada is None:
+            return
+        for etiqueta in entrada[2]:
+            chaves = self._por_etiqueta.get(etiqueta)
+            if chaves is not None:
+                chaves.discard(chave)
+                if not chaves:
+                    del self._por_etiqueta[etiqueta]
+
+    # -------------------------------------------------
+    # Invalidação
+    # -------------------------------------------------
+    def invalidar(self, *etiquetas):
+        """Remove as entradas marcadas com qualquer uma das etiquetas."""
+        with self._lock:
+            for etiqueta in etiquetas:
+                self._geracao[etiqueta] = self._geracao.get(etiqueta, 0) + 1
+                for chave in list(self._por_etiqueta.get(etiqueta, ())):
+                    self._remover(chave)
+                    self.invalidacoes += 1
+
+    def limpar(self):
+        with self._lock:
+            self._dados.clear()
+            self._por_etiqueta.clear()
+
+    # -------------------------------------------------
+    # Métricas
+    # -------------------------------------------------
+    def estatisticas(self):
+        consultas = self.acertos + self.falhas
+        return {
+            "entradas": len(self._dados),
+            "maximo": self.maximo,
+            "ttl_padrao": self.ttl_padrao,
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": round(self.acertos / consultas, 3) if consultas else None,
+            "expirados": self.expirados,
+            "despejos": self.despejos,
+            "invalidacoes": self.invalidacoes,
+        }
+
+
+cache_dashboard = CacheTTL()
@@ -0,0 +1,267 @@
+from collections import Counter
+
+import click
+from flask import current_app
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, object_session
+
+from config import db
+from models.contador_model import ContadorEntidade
+from models.usuario_model import Usuario
+from models.veiculo_model import Veiculo
+from models.equipamento_model import Equipamento
+
+
+# =====================================================
+# CONTADORES MATERIALIZADOS POR ENTIDADE
+# =====================================================
+# contadores_entidades guarda, para cada entidade, o total ("total", "") e a
+# quantidade por valor de cada série dos gráficos. Os eventos de mapper
+# (after_insert / after_update / after_delete) somam os deltas na mesma
+# conexão/transação do INSERT/UPDATE/DELETE do registro.
+# Escritas fora do ORM (SQL direto, INSERT em massa) não passam pelos
+# eventos: `flask verificar-contadores --corrigir` recalcula a tabela.
+# Quem precisa saber o que mudou (ex.: dashboard ao vivo) registra um
+# gancho com apos_commit(): recebe os deltas somados de cada commit.
+
+# entidade → (modelo, {série: coluna})
+ENTIDADES = {
+    "usuarios": (Usuario, {"perfil": Usuario.perfil}),
+    "veiculos": (Veiculo, {"situacao": Veiculo.situacao, "local": Veiculo.local_armazenamento}),
+    "equipamentos": (Equipamento, {"perigo": Equipamento.nivel_perigo, "situacao": Equipamento.situacao}),
+}
+
+SEM_VALOR = "Não informado"
+
+_ganchos_commit = []
+
+
+def init_app(app):
+    for entidade, (modelo, series) in ENTIDADES.items():
+        _registrar_eventos(entidade, modelo, series)
+
+    event.listen(Session, "after_commit", _notificar)
+    event.listen(Session, "after_rollback", _descartar)
+
+    @app.cli.command("verificar-contadores")
+    @click.option("--corrigir", is_flag=True, help="Recalcula a tabela se houver divergências.")
+    def verificar_contadores_comando(corrigir):
+        """Compara contadores_entidades com COUNT/GROUP BY nas tabelas."""
+        divergencias = verificar()
+        for entidade, serie, valor, esperado, gravado in divergencias:
+            click.echo(f"{entidade}/{serie}/{valor}: esperado {esperado}, gravado {gravado}")
+
+        if not divergencias:
+            click.echo("Contadores consistentes.")
+        elif corrigir:
+            reconstruir()
+            click.echo(f"{len(divergencias)} divergências corrigidas.")
+        else:
+            click.echo(f"{len(divergencias)} divergências (use --corrigir).")
+
+
+def rotulo(valor):
+    """Valor gravado no contador: enums viram o .value; vazio vira "Não informado"."""
+    valor = getattr(valor, "value", valor)
+    return str(valor) if valor not in (None, "") else SEM_VALOR
+
+
+# -------------------------------------------------
+# Eventos de mapper
+# -------------------------------------------------
+def _registrar_eventos(entidade, modelo, series):
+
+    def ao_inserir(mapper, conexao, alvo):
+        deltas = Counter({(entidade, "total", ""): 1})
+        for serie, coluna in series.items():
+            deltas[(entidade, serie, rotulo(getattr(alvo, coluna.key)))] += 1
+        aplicar(alvo, conexao, deltas)
+
+    def ao_atualizar(mapper, conexao, alvo):
+        estado = inspect(alvo)
+        deltas = Counter()
+        for serie, coluna in series.items():
+            historico = estado.attrs[coluna.key].history
+            if not historico.deleted and not historico.added:
+                continue
+            for antigo in historico.deleted:
+                deltas[(entidade, serie, rotulo(antigo))] -= 1
+            for novo in historico.added:
+                deltas[(entidade, serie, rotulo(novo))] += 1
+        aplicar(alvo, conexao, deltas)
+
+    def antes_de_deletar(mapper, conexao, alvo):
+        # Séries expiradas (ex.: após um commit) são lidas enquanto a linha existe;
+        # sem isso o histórico fica vazio em ao_deletar e só o total desce
+        estado = inspect(alvo)
+        expiradas = [coluna.key for coluna in series.values() if coluna.key in estado.unloaded]
+        if expiradas:
+            object_session(alvo).refresh(alvo, expiradas)
+
+    def ao_deletar(mapper, conexao, alvo):
+        estado = inspect(alvo)
+        deltas = Counter({(entidade, "total", ""): -1})
+        for serie, coluna in series.items():
+            # valor do banco (antes de qualquer alteração pendente no objeto)
+            historico = estado.attrs[coluna.key].history
+            for valor in (historico.deleted or historico.unchanged):
+                deltas[(entidade, serie, rotulo(valor))] -= 1
+        aplicar(alvo, conexao, deltas)
+
+    # Sem active_history, alterar um atributo expirado ou ainda não carregado
+    # deixa history.deleted vazio e o valor antigo nunca é descontado: o
+    # ouvinte "set" com active_history=True faz o ORM ler o valor antes de trocar
+    for coluna in series.values():
+        event.listen(coluna, "set", _carregar_anterior, active_history=True)
+
+    event.listen(modelo, "after_insert", ao_inserir)
+    event.listen(modelo, "after_update", ao_atualizar)
+    event.listen(modelo, "before_delete", antes_de_deletar)
+    event.listen(modelo, "after_delete", ao_deletar)
+
+
+def _carregar_anterior(alvo, valor, anterior, iniciador):
+    """Não faz nada: só liga active_history no atributo."""
+
+
+def aplicar(alvo, conexao, deltas):
+    """Grava os deltas e, se houver ganchos, guarda-os na sessão até o commit."""
+    somar(conexao, deltas)
+
+    sessao = object_session(alvo)
+    if _ganchos_commit and sessao is not None:
+        sessao.info.setdefault("contadores_deltas", Counter()).update(deltas)
+
+
+def somar(conexao, deltas):
+    """Soma os deltas {(entidade, serie, valor): n} com upsert, na conexão do flush."""
+    tabela = ContadorEntidade.__table__
+    deltas = {chave: n for chave, n in deltas.items() if n}
+    if not deltas:
+        return
+
+    dialeto = conexao.dialect.name
+    if dialeto in ("sqlite", "postgresql"):
+        if dialeto == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+
+        for (entidade, serie, valor), n in deltas.items():
+            comando = insert(tabela).values(entidade=entidade, serie=serie, valor=valor, total=n)
+            comando = comando.on_conflict_do_update(
+                index_elements=["entidade", "serie", "valor"],
+                set_={"total": tabela.c.total + comando.excluded.total}
+            )
+            conexao.execute(comando)
+        return
+
+    # Outros bancos: UPDATE e, se não havia linha, INSERT
+    for (entidade, serie, valor), n in deltas.items():
+        atualizadas = conexao.execute(
+            tabela.update()
+            .where(tabela.c.entidade == entidade, tabela.c.serie == serie, tabela.c.valor == valor)
+            .values(total=tabela.c.total + n)
+        ).rowcount
+        if not atualizadas:
+            conexao.execute(tabela.insert().values(entidade=entidade, serie=serie, valor=valor, total=n))
+
+
+# -------------------------------------------------
+# Ganchos pós-commit
+# -------------------------------------------------
+def apos_commit(gancho):
+    """Registra gancho(deltas) chamado após cada commit que alterou contadores: {(entidade, serie, valor): n}."""
+    _ganchos_commit.append(gancho)
+    return gancho
+
+
+def _notificar(sessao):
+    deltas = {chave: n for chave, n in sessao.info.pop("contadores_deltas", {}).items() if n}
+    if not deltas:
+        return
+
+    for gancho in _ganchos_commit:
+        try:
+            gancho(deltas)
+        except Exception:
+            current_app.logger.exception("Falha no gancho pós-commit %r", gancho)
+
+
+def _descartar(sessao):
+    sessao.info.pop("contadores_deltas", None)
+
+
+# -------------------------------------------------
+# Verificação / reconstrução
+# -------------------------------------------------
+def contagem_real():
+    """{(entidade, serie, valor): n} calculado direto nas tabelas (uma consulta por entidade)."""
+    from utils.agregados_dashboard import resumo_entidade_sql
+
+    reais = {}
+    for entidade in ENTIDADES:
+        dados = resumo_entidade_sql(entidade)
+        reais[(entidade, "total", "")] = dados["total"]
+        for serie, valores in dados["series"].items():
+            for valor, n in zip(valores["labels"], valores["values"]):
+                reais[(entidade, serie, rotulo(valor))] = n
+    return reais
+
+
+def verificar():
+    """[(entidade, serie, valor, esperado, gravado)] onde o contador difere da contagem real."""
+    reais = contagem_real()
+    gravados = {
+        (c.entidade, c.serie, c.valor): c.total
+        for c in ContadorEntidade.query.all()
+    }
+
+    divergencias = []
+    for chave in sorted(set(reais) | set(gravados)):
+        esperado = reais.get(chave, 0)
+        gravado = gravados.get(chave, 0)
+        if esperado != gravado:
+            divergencias.append((*chave, esperado, gravado))
+    return divergencias
+
+
+def reconstruir():
+    """Apaga e recalcula contadores_entidades."""
+    linhas = [
+        {"entidade": entidade, "serie": serie, "valor": valor, "total": n}
+        for (entidade, serie, valor), n in contagem_real().items()
+        if n
+    ]
+    db.session.query(ContadorEntidade).delete()
+    if linhas:
+        db.session.execute(ContadorEntidade.__table__.insert(), linhas)
+    db.session.commit()
+
+
+def garantir_contadores():
+    """Na primeira subida com a tabela nova, calcula os contadores dos dados existentes."""
+    if db.session.query(ContadorEntidade.entidade).first() is None:
+        reconstruir()
+
+
+# -------------------------------------------------
+# Leitura
+# -------------------------------------------------
+def ler(entidade):
+    """(total, {serie: [(valor, n)]}) da entidade — uma consulta, O(nº de categorias)."""
+    total = 0
+    series = {serie: [] for serie in ENTIDADES[entidade][1]}
+
+    linhas = (
+        db.session.query(ContadorEntidade.serie, ContadorEntidade.valor, ContadorEntidade.total)
+        .filter(ContadorEntidade.entidade == entidade, ContadorEntidade.total != 0)
+        .all()
+    )
+    for serie, valor, n in linhas:
+        if serie == "total":
+            total = n
+        elif serie in series:
+            series[serie].append((valor, n))
+
+    return total, series
@@ -0,0 +1,119 @@
+from collections import Counter
+
+from utils import contadores
+from utils.gravador_logs import gravador_logs
+from utils.socket_lote import EmissorEmLote
+from utils.tempo import hoje_brasil, utc_to_brasil
+
+
+# =====================================================
+# DASHBOARD AO VIVO (namespace Socket.IO /dashboard)
+# =====================================================
+# Cada commit vira um delta pequeno:
+#   {"cards": {card: +n}, "series": {grupo: {serie: {rotulo: +n}}}, "logs": [linhas]}
+# Os CRUDs chegam pelos ganchos de utils.contadores e os logs pelo gancho
+# pós-commit do gravador. O emissor soma os deltas de cada intervalo, então
+# uma rajada de escritas vira um único evento "dashboard_delta".
+# "omitidos" > 0 significa que o buffer transbordou: o cliente recarrega o resumo.
+
+NAMESPACE = "/dashboard"
+
+# linhas de "últimos logs" por envio (a tabela do dashboard mostra 20)
+MAX_LOGS = 20
+
+
+def combinar(itens):
+    """Soma os deltas do intervalo num único item."""
+    cards = Counter()
+    series = {}
+    logs = []
+
+    for item in itens:
+        cards.update(item.get("cards", {}))
+        for grupo, por_serie in item.get("series", {}).items():
+            for serie, por_rotulo in por_serie.items():
+                series.setdefault(grupo, {}).setdefault(serie, Counter()).update(por_rotulo)
+        logs.extend(item.get("logs", []))
+
+    delta = {
+        "cards": {card: n for card, n in cards.items() if n},
+        "series": {
+            grupo: {serie: {rotulo: n for rotulo, n in por_rotulo.items() if n} for serie, por_rotulo in por_serie.items()}
+            for grupo, por_serie in series.items()
+        },
+        "logs": logs[-MAX_LOGS:],
+    }
+    if not delta["cards"] and not delta["logs"] and not any(
+        por_rotulo for por_serie in delta["series"].values() for por_rotulo in por_serie.values()
+    ):
+        return []
+    return [delta]
+
+
+# Todos os admins recebem o mesmo delta: envio pela sala, que com
+# SOCKETIO_MESSAGE_QUEUE alcança os dashboards abertos em qualquer worker
+emissor_dashboard = EmissorEmLote(
+    "dashboard_delta", NAMESPACE, intervalo=1.0, maximo=1, combinar=combinar, sala="dashboard"
+)
+
+
+def init_app(app):
+    app.config.setdefault("DASHBOARD_AO_VIVO_INTERVALO", 1.0)  # janela de coalescência (segundos)
+
+    emissor_dashboard.intervalo = float(app.config["DASHBOARD_AO_VIVO_INTERVALO"])
+
+    contadores.apos_commit(publicar_contadores)
+    gravador_logs.apos_commit(publicar_logs)
+
+
+# -------------------------------------------------
+# Ganchos
+# -------------------------------------------------
+def publicar_contadores(deltas):
+    """Gancho pós-commit de utils.contadores: {(entidade, serie, valor): n}."""
+    if not emissor_dashboard.tem_assinantes():
+        return
+
+    delta = {"cards": {}, "series": {}}
+    for (entidade, serie, valor), n in deltas.items():
+        if serie == "total":
+            delta["cards"][entidade] = n
+        else:
+            delta["series"].setdefault(entidade, {}).setdefault(serie, {})[valor] = n
+    emissor_dashboard.adicionar([delta])
+
+
+def publicar_logs(registros):
+    """Gancho pós-commit do gravador: card de negados, logins do dia, operações e linhas novas."""
+    if not emissor_dashboard.tem_assinantes():
+        return
+
+    hoje = hoje_brasil()
+    negados = 0
+    logins = Counter()
+    operacoes = Counter()
+
+    for registro in registros:
+        operacoes[registro["tipo_operacao"]] += 1
+        dia = utc_to_brasil(registro["horario"]).date()
+        if dia == hoje and registro["tipo_operacao"] == "ACESSO_NEGADO":
+            negados += 1
+        elif registro["tipo_operacao"] == "LOGIN_SUCESSO":
+            logins[str(dia)] += 1
+
+    emissor_dashboard.adicionar([{
+        "cards": {"acessos_negados_hoje": negados},
+        "series": {"logs": {"logins": dict(logins), "operacoes": dict(operacoes)}},
+        "logs": [linha_log(r) for r in registros],
+    }])
+
+
+def linha_log(registro):
+    """Mesmas colunas da tabela de últimos logs do dashboard."""
+    return {
+        "ID": str(registro["id"]),
+        "Data": utc_to_brasil(registro["horario"]).strftime("%d/%m/%Y %H:%M"),
+        "Usuário": registro["usuario_nome"],
+        "Operação": registro["tipo_operacao"],
+        "Descrição": (registro["descricao"] or "").replace("\n", " "),
+    }
@@ -1,6 +1,9 @@
 from functools import wraps
-from flask import flash, redirect, url_for, session, request, current_app
-from models.usuario_model import Usuario, PerfilEnum
+from flask import flash, redirect, url_for, session, request, render_template
+from models.usuario_model import PerfilEnum
+from utils import identidade
+from utils.limitador import limite_anonimo, segundos_retry
+from utils.estado_sistema import lockdown_ativo
 import json
 
 
@@ -27,12 +30,25 @@ def login_obrigatorio(f):
         from controllers.logs_controller import registrar_log  # import seguro
 
         if "usuario_id" not in session:
+            ip = request.remote_addr or "desconhecido"
+
+            # Script insistindo sem login → 429, antes de qualquer custo de log
+            espera = limite_anonimo.tentar(ip)
+            if espera:
+                return render_template(
+                    "404.html",
+                    error_code=429,
+                    error_message="Muitas requisições sem login. Aguarde e tente novamente."
+                ), 429, {"Retry-After": str(segundos_retry(espera))}
+
             try:
+                # Repetições da mesma rota + IP viram um log-resumo periódico
                 registrar_log(
                     "ACESSO_NEGADO",
                     "Sistema",
                     f"Tentativa de acesso sem login na rota: {request.path}",
-                    modificacoes=json.dumps({"rota": request.path}, ensure_ascii=False)
+                    modificacoes=json.dumps({"rota": request.path, "ip": ip}, ensure_ascii=False),
+                    agrupar=(request.path, ip)
                 )
             except Exception:
                 pass
@@ -49,6 +65,9 @@ def login_obrigatorio(f):
 # DECORATOR — PERFIL OBRIGATÓRIO
 # =====================================================
 def perfil_obrigatorio(*perfis_permitidos):
+    # Perfis permitidos resolvidos uma vez, na decoração da rota
+    perfis_validos = frozenset(_normalize_perfil_input(p) for p in perfis_permitidos)
+
     def wrapper(f):
         @wraps(f)
         def decorator(*args, **kwargs):
@@ -61,16 +80,19 @@ def perfil_obrigatorio(*perfis_permitidos):
                 flash("Você precisa estar logado!", "danger")
                 return redirect(url_for("auth.login"))
 
-            # Carregar usuário
-            usuario = Usuario.query.get(usuario_id)
+            # Identidade em memória (utils.identidade); banco só no primeiro acesso
+            usuario = identidade.obter(usuario_id)
             if not usuario:
                 session.clear()
                 flash("Sessão expirada ou inválida.", "warning")
                 return redirect(url_for("auth.login"))
 
-            # Normalizar perfis permitidos
-            perfis_validos = [_normalize_perfil_input(p) for p in perfis_permitidos]
-            perfil_usuario = usuario.perfil.value
+            # Perfil/nome alterados por outro admin → sessão acompanha
+            if session.get("usuario_perfil") != usuario.perfil or session.get("usuario_nome") != usuario.name:
+                session["usuario_perfil"] = usuario.perfil
+                session["usuario_nome"] = usuario.name
+
+            perfil_usuario = usuario.perfil
 
             # Verificar permissão
             if perfil_usuario not in perfis_validos:
@@ -82,8 +104,9 @@ def perfil_obrigatorio(*perfis_permitidos):
                         modificacoes=json.dumps({
                             "rota": request.path,
                             "perfil_usuario": perfil_usuario,
-                            "perfis_permitidos": perfis_validos
-                        }, ensure_ascii=False)
+                            "perfis_permitidos": sorted(perfis_validos)
+                        }, ensure_ascii=False),
+                        agrupar=(usuario_id, request.path)
                     )
                 except Exception:
                     pass
@@ -104,10 +127,9 @@ def verificar_lockdown(f):
     @wraps(f)
     def decorator(*args, **kwargs):
 
-        lockdown_ativo = current_app.config.get("LOCKDOWN_ATIVO", False)
-
+        # Estado compartilhado entre workers (cópia local, relida a cada ESTADO_INTERVALO)
         # Lockdown desligado → passa direto
-        if not lockdown_ativo:
+        if not lockdown_ativo():
             return f(*args, **kwargs)
 
         # Admin de Segurança pode ignorar lockdown
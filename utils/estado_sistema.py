@@ -0,0 +1,211 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+from flask import current_app, has_app_context
+from sqlalchemy import update
+
+from config import db, socketio
+from models.estado_sistema_model import EstadoSistema
+
+
+# =====================================================
+# ESTADO COMPARTILHADO ENTRE PROCESSOS (lockdown etc.)
+# =====================================================
+# O valor oficial fica na tabela estado_sistema (uma linha por chave, com
+# versão). Cada processo guarda uma cópia local e relê a tabela (um SELECT
+# de poucas linhas) quando a cópia tem mais de ESTADO_INTERVALO segundos.
+# Uma tarefa de fundo por processo faz a mesma releitura e, quando a versão
+# de uma chave muda, avisa os clientes Socket.IO conectados àquele processo.
+# Atraso máximo para todos os workers e sockets: ~ESTADO_INTERVALO.
+
+EVENTO_SOCKET = "estado_sistema"
+CHAVES_SOCKET = {"lockdown"}   # chaves repassadas aos clientes Socket.IO
+
+
+class EstadoCompartilhado:
+    def __init__(self):
+        self.app = None
+        self.intervalo = 0.5
+        self._valores = {}   # { chave: (valor, versao) }
+        self._lido_em = 0.0
+        self._vencida = False   # commit deste processo mudou versões: reler já
+        self._lock = threading.Lock()
+        self._pid = None
+        self._ganchos = []
+
+        self.leituras = 0
+
+    def init_app(self, app):
+        app.config.setdefault("ESTADO_INTERVALO", 0.5)  # segundos
+        self.app = app
+        self.intervalo = float(app.config["ESTADO_INTERVALO"])
+
+    # -------------------------------------------------
+    # Leitura (cópia local)
+    # -------------------------------------------------
+    def _atualizar(self):
+        self._garantir_tarefa()
+        if self._vencida or time.monotonic() - self._lido_em > self.intervalo:
+            self.recarregar()
+
+    def obter(self, chave, padrao=None):
+        """Valor da chave; relê o banco só se a cópia local passou do intervalo."""
+        self._atualizar()
+        valor = self._valores.get(chave)
+        return padrao if valor is None else valor[0]
+
+    def versao(self, chave):
+        """Versão da chave (0 se nunca gravada), com a mesma regra de releitura de obter."""
+        self._atualizar()
+        valor = self._valores.get(chave)
+        return 0 if valor is None else valor[1]
+
+    def expirar_copia(self):
+        """A próxima leitura deste processo vai ao banco (após um commit local)."""
+        self._vencida = True
+
+    def recarregar(self):
+        """Relê todas as chaves; avisa os ganchos das que mudaram de versão."""
+        linhas = db.session.query(EstadoSistema.chave, EstadoSistema.valor, EstadoSistema.versao).all()
+        self.leituras += 1
+
+        novos = {chave: (json.loads(valor), versao) for chave, valor, versao in linhas}
+        with self._lock:
+            primeira = not self._lido_em
+            anteriores = self._valores
+            self._valores = novos
+            self._lido_em = time.monotonic()
+            self._vencida = False
+
+        # Na primeira leitura do processo não há mudança a anunciar
+        if primeira:
+            return
+        for chave, (valor, versao) in novos.items():
+            if anteriores.get(chave, (None, 0))[1] != versao:
+                self._notificar(chave, valor, versao)
+
+    # -------------------------------------------------
+    # Escrita
+    # -------------------------------------------------
+    def definir(self, chave, valor, por=None):
+        """Grava o valor somando 1 à versão (UPDATE atômico; INSERT na primeira vez)."""
+        tabela = EstadoSistema.__table__
+        dados = {
+            "valor": json.dumps(valor, ensure_ascii=False),
+            "alterado_em": datetime.now(timezone.utc),
+            "alterado_por": por,
+        }
+
+        alteradas = db.session.execute(
+            update(tabela).where(tabela.c.chave == chave).values(versao=tabela.c.versao + 1, **dados)
+        ).rowcount
+        if not alteradas:
+            db.session.execute(tabela.insert().values(chave=chave, versao=1, **dados))
+        db.session.commit()
+
+        # Este processo vê a mudança na hora; os outros, no próximo ciclo
+        self.recarregar()
+
+    def incrementar(self, conexao, *chaves):
+        """Soma 1 à versão das chaves na transação da conexão (sem commit); cria as que faltam."""
+        tabela = EstadoSistema.__table__
+        agora = datetime.now(timezone.utc)
+        dialeto = conexao.dialect.name
+
+        for chave in chaves:
+            if dialeto in ("sqlite", "postgresql"):
+                if dialeto == "sqlite":
+                    from sqlalchemy.dialects.sqlite import insert
+                else:
+                    from sqlalchemy.dialects.postgresql import insert
+
+                comando = insert(tabela).values(chave=chave, valor="null", versao=1, alterado_em=agora)
+                conexao.execute(comando.on_conflict_do_update(
+                    index_elements=["chave"],
+                    set_={"versao": tabela.c.versao + 1, "alterado_em": agora}
+                ))
+                continue
+
+            # Outros bancos: UPDATE e, se não havia linha, INSERT
+            atualizadas = conexao.execute(
+                update(tabela).where(tabela.c.chave == chave)
+                .values(versao=tabela.c.versao + 1, alterado_em=agora)
+            ).rowcount
+            if not atualizadas:
+                conexao.execute(tabela.insert().values(chave=chave, valor="null", versao=1, alterado_em=agora))
+
+    # -------------------------------------------------
+    # Ganchos (mudança de versão detectada neste processo)
+    # -------------------------------------------------
+    def ao_mudar(self, gancho):
+        """Registra gancho(chave, valor, versao)."""
+        self._ganchos.append(gancho)
+        return gancho
+
+    def _notificar(self, chave, valor, versao):
+        for gancho in self._ganchos:
+            try:
+                gancho(chave, valor, versao)
+            except Exception:
+                if has_app_context():
+                    current_app.logger.exception("Falha no gancho de estado %r", gancho)
+
+    # -------------------------------------------------
+    # Tarefa de fundo (uma por processo)
+    # -------------------------------------------------
+    def _garantir_tarefa(self):
+        if self.app is None:
+            return
+        pid = os.getpid()
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+        socketio.start_background_task(self._executar)
+
+    def _executar(self):
+        while True:
+            socketio.sleep(self.intervalo)
+            try:
+                with self.app.app_context():
+                    self.recarregar()
+            except Exception:
+                self.app.logger.exception("Falha ao reler estado_sistema")
+
+    def estatisticas(self):
+        return {
+            "chaves": {chave: {"valor": valor, "versao": versao} for chave, (valor, versao) in self._valores.items()},
+            "intervalo": self.intervalo,
+            "leituras": self.leituras,
+        }
+
+
+estado_sistema = EstadoCompartilhado()
+
+
+# -------------------------------------------------
+# Lockdown
+# -------------------------------------------------
+def lockdown_ativo():
+    return bool(estado_sistema.obter("lockdown", False))
+
+
+def definir_lockdown(ativo, por=None):
+    estado_sistema.definir("lockdown", bool(ativo), por=por)
+
+
+@estado_sistema.ao_mudar
+def avisar_sockets(chave, valor, versao):
+    """Repassa a mudança aos clientes Socket.IO deste processo (página do chat)."""
+    # Versões internas (tabelas, identidades, sessões do chat) não interessam aos navegadores
+    if chave not in CHAVES_SOCKET:
+        return
+    # Cada worker detecta a mudança e avisa só os próprios sockets: passar pela
+    # fila (SOCKETIO_MESSAGE_QUEUE) entregaria o evento uma vez por worker
+    socketio.emit(
+        EVENTO_SOCKET, {"chave": chave, "valor": valor, "versao": versao},
+        namespace="/", ignore_queue=True
+    )
@@ -0,0 +1,276 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+from flask import has_app_context, current_app
+
+from config import db
+from models.log_model import Log
+
+
+# =====================================================
+# GRAVADOR DE LOGS — FILA + COMMIT EM LOTE
+# =====================================================
+class GravadorLogs:
+    """
+    Grava os logs de auditoria fora do caminho da requisição.
+
+    Os registros entram numa fila limitada e uma thread de fundo grava em lote
+    (por tamanho ou janela de tempo), com uma única transação por lote.
+    Fila cheia ou gravador desligado → gravação síncrona, como antes.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.assincrono = False
+        self.lote_max = 200
+        self.intervalo = 0.5
+
+        self._fila = None
+        self._thread = None
+        self._pid = None
+        self._parar = threading.Event()
+        self._lock = threading.Lock()
+        self._ganchos_transacao = []
+        self._ganchos_commit = []
+
+        # Contadores expostos em estatisticas()
+        self.enfileirados = 0
+        self.gravados = 0
+        self.sincronos = 0
+        self.lotes = 0
+        self.falhas = 0
+        self.descartados = 0
+
+    # -------------------------------------------------
+    # Inicialização
+    # -------------------------------------------------
+    def init_app(self, app):
+        app.config.setdefault("LOG_ASSINCRONO", True)
+        app.config.setdefault("LOG_FILA_MAX", 10000)
+        app.config.setdefault("LOG_LOTE_MAX", 200)
+        app.config.setdefault("LOG_LOTE_INTERVALO", 0.5)
+
+        self.app = app
+        self.assincrono = bool(app.config["LOG_ASSINCRONO"])
+        self.lote_max = int(app.config["LOG_LOTE_MAX"])
+        self.intervalo = float(app.config["LOG_LOTE_INTERVALO"])
+        self._fila = queue.Queue(maxsize=int(app.config["LOG_FILA_MAX"]))
+
+        app.extensions["gravador_logs"] = self
+        atexit.register(self.encerrar)
+
+    # -------------------------------------------------
+    # Entrada
+    # -------------------------------------------------
+    def registrar(self, dados):
+        """Enfileira um registro (dict com os campos de Log)."""
+        if not self.assincrono or self._parar.is_set() or not self._garantir_thread():
+            self._gravar_sincrono(dados)
+            return
+
+        try:
+            self._fila.put_nowait(dados)
+            self._contar("enfileirados")
+        except queue.Full:
+            self._contar("sincronos")
+            self._gravar_sincrono(dados)
+
+    def _gravar_sincrono(self, dados):
+        try:
+            if has_app_context() or self.app is None:
+                self._persistir([dados])
+            else:
+                with self.app.app_context():
+                    self._persistir([dados])
+        except Exception:
+            self._contar("descartados")
+            self._logger().exception("Log descartado na gravação síncrona: %s", dados.get("tipo_operacao"))
+
+    # -------------------------------------------------
+    # Thread de fundo
+    # -------------------------------------------------
+    def _garantir_thread(self):
+        """Inicia a thread sob demanda (também após fork de worker)."""
+        if self.app is None:
+            return False
+
+        pid = os.getpid()
+        if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+            return True
+
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == pid:
+                return True
+
+            if self._pid != pid:
+                # Fila herdada do processo pai não é válida no filho
+                self._fila = queue.Queue(maxsize=self._fila.maxsize)
+
+            self._pid = pid
+            self._thread = threading.Thread(
+                target=self._executar, name="gravador-logs", daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def _executar(self):
+        while not (self._parar.is_set() and self._fila.empty()):
+            lote = self._coletar_lote()
+            if not lote:
+                continue
+
+            try:
+                with self.app.app_context():
+                    self._persistir(lote)
+            except Exception:
+                self._contar("descartados", len(lote))
+                self.app.logger.exception("Lote de %d logs descartado", len(lote))
+            finally:
+                for _ in lote:
+                    self._fila.task_done()
+
+    def _coletar_lote(self):
+        try:
+            primeiro = self._fila.get(timeout=self.intervalo)
+        except queue.Empty:
+            return []
+
+        lote = [primeiro]
+        limite = time.monotonic() + self.intervalo
+
+        while len(lote) < self.lote_max:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                lote.append(self._fila.get(timeout=restante))
+            except queue.Empty:
+                break
+
+        return lote
+
+    # -------------------------------------------------
+    # Persistência
+    # -------------------------------------------------
+    def _persistir(self, lote):
+        """Grava o lote numa transação; se falhar, isola os registros com erro."""
+        try:
+            self._gravar([Log(**dados) for dados in lote])
+            self._contar("gravados", len(lote))
+            self._contar("lotes")
+            return
+        except Exception:
+            db.session.rollback()
+
+        if len(lote) == 1:
+            self._registrar_falha(lote[0])
+            return
+
+        for dados in lote:
+            try:
+                self._gravar([Log(**dados)])
+                self._contar("gravados")
+            except Exception:
+                db.session.rollback()
+                self._registrar_falha(dados)
+
+    def _gravar(self, logs):
+        """Insere os logs e roda os ganchos de transação antes do commit."""
+        db.session.add_all(logs)
+        for gancho in self._ganchos_transacao:
+            gancho(logs)
+
+        registros = None
+        if self._ganchos_commit:
+            # Foto dos logs antes do commit (depois dele os objetos expiram)
+            db.session.flush()
+            registros = [
+                {coluna.key: getattr(log, coluna.key) for coluna in Log.__table__.columns}
+                for log in logs
+            ]
+
+        db.session.commit()
+
+        if registros:
+            self._notificar(registros)
+
+    def _notificar(self, registros):
+        """Ganchos pós-commit: falhas aqui não desfazem nem repetem a gravação."""
+        for gancho in self._ganchos_commit:
+            try:
+                gancho(registros)
+            except Exception:
+                current_app.logger.exception("Falha no gancho pós-commit %r", gancho)
+
+    def _registrar_falha(self, dados):
+        self._contar("falhas")
+        try:
+            self._gravar([Log(
+                usuario_id=0,
+                usuario_nome="Sistema",
+                usuario_perfil="N/A",
+                tipo_operacao="ERRO_LOG",
+                tipo_modelo="Log",
+                descricao=f"Falha ao salvar log original: {dados.get('tipo_operacao')}",
+                modificacoes=None,
+                # Os ganchos na_transacao rodam antes do flush (quando o default seria aplicado)
+                horario=datetime.now(timezone.utc)
+            )])
+        except Exception:
+            db.session.rollback()
+            self._contar("descartados")
+
+    # -------------------------------------------------
+    # Ganchos
+    # -------------------------------------------------
+    def na_transacao(self, gancho):
+        """Registra gancho(logs) executado na mesma transação de cada gravação."""
+        self._ganchos_transacao.append(gancho)
+        return gancho
+
+    def apos_commit(self, gancho):
+        """Registra gancho(registros) chamado após o commit, com os logs já gravados (dicts com id)."""
+        self._ganchos_commit.append(gancho)
+        return gancho
+
+    # -------------------------------------------------
+    # Encerramento e métricas
+    # -------------------------------------------------
+    def encerrar(self, timeout=5.0):
+        """Para a thread gravando tudo o que ainda estiver na fila."""
+        self._parar.set()
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+
+        if self._fila is not None and not self._fila.empty():
+            self._contar("descartados", self._fila.qsize())
+
+    def _logger(self):
+        if has_app_context():
+            return current_app.logger
+        return self.app.logger if self.app is not None else logging.getLogger(__name__)
+
+    def _contar(self, nome, n=1):
+        with self._lock:
+            setattr(self, nome, getattr(self, nome) + n)
+
+    def estatisticas(self):
+        return {
+            "assincrono": self.assincrono,
+            "profundidade_fila": self._fila.qsize() if self._fila is not None else 0,
+            "capacidade_fila": self._fila.maxsize if self._fila is not None else 0,
+            "enfileirados": self.enfileirados,
+            "gravados": self.gravados,
+            "lotes": self.lotes,
+            "sincronos": self.sincronos,
+            "falhas": self.falhas,
+            "descartados": self.descartados,
+        }
+
+
+gravador_logs = GravadorLogs()
@@ -0,0 +1,77 @@
+from flask import current_app
+from sqlalchemy import select, union_all
+
+from config import db
+from models.chat_message_model import ChatMessage
+
+
+# =====================================================
+# HISTÓRICO DO CHAT EM PÁGINAS (cursor = id da mensagem)
+# =====================================================
+# Primeira página: as `limite` mensagens mais recentes da conversa.
+# "Carregar antigas": as `limite` anteriores ao menor id já exibido.
+# Cada sentido da conversa (de → para) é um trecho do índice
+# ix_chat_messages_de_para_id percorrido de trás para frente e cortado em
+# limite + 1 linhas; o custo é o da página, não o da conversa inteira.
+
+class CursorInvalido(ValueError):
+    """Parâmetro `antes`/`limite` que não é um inteiro positivo."""
+
+
+def _inteiro_positivo(valor, nome):
+    if valor in (None, ""):
+        return None
+    try:
+        numero = int(valor)
+    except (TypeError, ValueError):
+        raise CursorInvalido(f"{nome} inválido: {valor!r}")
+    if numero <= 0:
+        raise CursorInvalido(f"{nome} deve ser positivo.")
+    return numero
+
+
+def _sentido(de_id, para_id, antes, limite):
+    consulta = (
+        select(ChatMessage.id, ChatMessage.de_id, ChatMessage.texto, ChatMessage.horario)
+        .where(ChatMessage.de_id == de_id, ChatMessage.para_id == para_id)
+    )
+    if antes is not None:
+        consulta = consulta.where(ChatMessage.id < antes)
+    return consulta.order_by(ChatMessage.id.desc()).limit(limite + 1).subquery()
+
+
+def pagina_historico(usuario_id, contato_id, antes=None, limite=None):
+    """
+    Uma página da conversa, da mais antiga para a mais nova:
+    {"mensagens": [...], "mais_antigas": bool, "cursor": menor id da página}.
+    """
+    antes = _inteiro_positivo(antes, "antes")
+    padrao = current_app.config.get("CHAT_HISTORICO_PAGINA", 50)
+    maximo = current_app.config.get("CHAT_HISTORICO_MAX", 200)
+    limite = min(_inteiro_positivo(limite, "limite") or padrao, maximo)
+
+    enviadas = _sentido(usuario_id, contato_id, antes, limite)
+    recebidas = _sentido(contato_id, usuario_id, antes, limite)
+    uniao = union_all(select(enviadas), select(recebidas)).subquery()
+
+    linhas = db.session.execute(
+        select(uniao).order_by(uniao.c.id.desc()).limit(limite + 1)
+    ).all()
+
+    mais_antigas = len(linhas) > limite
+    linhas = linhas[:limite]
+    linhas.reverse()
+
+    return {
+        "mensagens": [
+            {
+                "id": linha.id,
+                "de": linha.de_id,
+                "texto": linha.texto,
+                "horario": linha.horario.isoformat()
+            }
+            for linha in linhas
+        ],
+        "mais_antigas": mais_antigas,
+        "cursor": linhas[0].id if linhas else None,
+    }
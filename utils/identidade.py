@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import namedtuple
+
+from flask import g, has_app_context
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from config import db
+from models.usuario_model import Usuario
+from utils.estado_sistema import estado_sistema
+
+
+# =====================================================
+# CACHE DE IDENTIDADE DOS USUÁRIOS (autorização em memória)
+# =====================================================
+# perfil_obrigatorio precisa só de (nome, perfil) do usuário logado. Em vez
+# de um SELECT por requisição, a identidade fica em memória por IDENTIDADE_TTL
+# segundos e, dentro da mesma requisição, em flask.g.
+# Invalidação entre workers: toda alteração de nome/perfil e toda exclusão
+# de Usuario (ORM ou UPDATE/DELETE em massa) soma 1 à chave "identidades" de
+# estado_sistema, na mesma transação. Cada identidade guarda a versão com
+# que foi lida e só vale enquanto a versão compartilhada for a mesma; a
+# checagem é por requisição, na cópia local de estado_sistema (atraso máximo
+# ESTADO_INTERVALO). invalidar() ainda limpa o processo atual na hora.
+
+Identidade = namedtuple("Identidade", "id name perfil versao")
+
+CHAVE = "identidades"
+CAMPOS = ("name", "perfil")   # o que a identidade guarda
+
+_identidades = {}  # { usuario_id: (Identidade, expira_em) }
+_lock = threading.Lock()
+
+ttl = 300.0
+
+
+def init_app(app):
+    global ttl
+    app.config.setdefault("IDENTIDADE_TTL", 300)
+    ttl = float(app.config["IDENTIDADE_TTL"])
+
+    event.listen(Usuario, "after_update", _marcar)
+    event.listen(Usuario, "after_delete", _marcar_exclusao)
+    event.listen(Session, "do_orm_execute", _marcar_em_massa)
+
+
+# -------------------------------------------------
+# Leitura
+# -------------------------------------------------
+def versao():
+    """Versão compartilhada das identidades (muda a cada edição/exclusão em qualquer worker)."""
+    return estado_sistema.versao(CHAVE)
+
+
+def obter(usuario_id):
+    """Identidade do usuário (g → memória → banco); None se ele não existe."""
+    por_requisicao = g.setdefault("identidades", {})
+    if usuario_id in por_requisicao:
+        return por_requisicao[usuario_id]
+
+    agora = time.monotonic()
+    atual = versao()
+    with _lock:
+        entrada = _identidades.get(usuario_id)
+    if entrada is not None and entrada[1] > agora and entrada[0].versao == atual:
+        identidade = entrada[0]
+    else:
+        identidade = _carregar(usuario_id, agora, atual)
+
+    por_requisicao[usuario_id] = identidade
+    return identidade
+
+
+def _carregar(usuario_id, agora, versao_antes):
+    # versão lida antes do SELECT: se uma edição confirmar no meio, a
+    # identidade fica com a versão antiga e é relida na próxima requisição
+    linha = (
+        db.session.query(Usuario.name, Usuario.perfil)
+        .filter(Usuario.id == usuario_id)
+        .first()
+    )
+    if linha is None:
+        invalidar(usuario_id)
+        return None
+
+    identidade = Identidade(usuario_id, linha.name, linha.perfil.value, versao_antes)
+    with _lock:
+        _identidades[usuario_id] = (identidade, agora + ttl)
+    return identidade
+
+
+# -------------------------------------------------
+# Invalidação
+# -------------------------------------------------
+def invalidar(*usuario_ids):
+    """Descarta a identidade em cache neste processo (os outros veem a versão nova)."""
+    with _lock:
+        for usuario_id in usuario_ids:
+            _identidades.pop(usuario_id, None)
+
+    if has_app_context():
+        por_requisicao = g.get("identidades", {})
+        for usuario_id in usuario_ids:
+            por_requisicao.pop(usuario_id, None)
+
+
+def _marcar(mapper, conexao, alvo):
+    # Troca só de senha_hash (rehash no login) não invalida ninguém
+    estado = inspect(alvo)
+    if any(estado.attrs[campo].history.has_changes() for campo in CAMPOS):
+        estado_sistema.incrementar(conexao, CHAVE)
+
+
+def _marcar_exclusao(mapper, conexao, alvo):
+    estado_sistema.incrementar(conexao, CHAVE)
+
+
+def _marcar_em_massa(estado):
+    if (estado.is_update or estado.is_delete) and estado.bind_mapper is not None \
+            and estado.bind_mapper.class_ is Usuario:
+        estado_sistema.incrementar(estado.session.connection(), CHAVE)
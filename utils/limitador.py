@@ -0,0 +1,204 @@
+import atexit
+import json
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+
+from utils.gravador_logs import gravador_logs
+
+
+# =====================================================
+# LIMITE DE TENTATIVAS (janela deslizante, em memória)
+# =====================================================
+# Cada chave (IP, e-mail...) guarda os instantes das últimas `limite`
+# tentativas; uma nova só passa se a mais antiga já saiu da janela.
+# A checagem é feita antes de qualquer consulta ao banco ou hash de senha.
+# Vale por processo: com N workers, o limite efetivo é até N vezes maior.
+
+class LimitadorJanela:
+    def __init__(self, limite, janela, max_chaves=100_000):
+        self.limite = limite
+        self.janela = janela
+        self.max_chaves = max_chaves
+        self._tentativas = OrderedDict()  # { chave: deque([instantes]) } em ordem de uso
+        self._lock = threading.Lock()
+        self.recusadas = 0
+
+    def configurar(self, limite, janela):
+        with self._lock:
+            self.limite = int(limite)
+            self.janela = float(janela)
+            self._tentativas.clear()
+
+    def _espera(self, instantes, agora):
+        while instantes and instantes[0] <= agora - self.janela:
+            instantes.popleft()
+        if len(instantes) < self.limite:
+            return 0.0
+        return instantes[0] + self.janela - agora
+
+    def espera(self, chave):
+        """Segundos até a chave poder tentar de novo (0 = pode agora). Não conta tentativa."""
+        agora = time.monotonic()
+        with self._lock:
+            instantes = self._tentativas.get(chave)
+            espera = self._espera(instantes, agora) if instantes else 0.0
+            if espera:
+                self.recusadas += 1
+            return espera
+
+    def _registrar(self, chave, instantes, agora):
+        if instantes is None:
+            instantes = self._tentativas[chave] = deque(maxlen=self.limite)
+            if len(self._tentativas) > self.max_chaves:
+                self._tentativas.popitem(last=False)
+        else:
+            self._tentativas.move_to_end(chave)
+        instantes.append(agora)
+
+    def registrar(self, chave):
+        """Conta uma tentativa da chave."""
+        agora = time.monotonic()
+        with self._lock:
+            self._registrar(chave, self._tentativas.get(chave), agora)
+
+    def tentar(self, chave):
+        """Conta a tentativa se houver vaga; devolve 0 ou os segundos de espera."""
+        agora = time.monotonic()
+        with self._lock:
+            instantes = self._tentativas.get(chave)
+            espera = self._espera(instantes, agora) if instantes else 0.0
+            if espera:
+                self.recusadas += 1
+                return espera
+            self._registrar(chave, instantes, agora)
+            return 0.0
+
+    def limpar(self, chave):
+        with self._lock:
+            self._tentativas.pop(chave, None)
+
+    def estatisticas(self):
+        return {"limite": self.limite, "janela": self.janela, "chaves": len(self._tentativas), "recusadas": self.recusadas}
+
+
+def segundos_retry(espera):
+    """Valor do cabeçalho Retry-After (inteiro, mínimo 1)."""
+    return max(math.ceil(espera), 1)
+
+
+# =====================================================
+# AGREGAÇÃO DE NEGAÇÕES REPETIDAS
+# =====================================================
+# A primeira ocorrência de uma chave (ex.: ACESSO_NEGADO + rota + IP) é
+# gravada normalmente; as repetições dentro de `intervalo` segundos só
+# somam um contador. Ao fim da janela sai um único log-resumo com a
+# contagem, e a chave recomeça.
+
+class AgregadorNegacoes:
+    def __init__(self, intervalo=60.0, max_chaves=10_000):
+        self.intervalo = intervalo
+        self.max_chaves = max_chaves
+        self._janela = {}  # { chave: {"dados": dict, "repeticoes": n, "ultimo": datetime} }
+        self._lock = threading.Lock()
+        self._timer = None
+
+        self.agregados = 0
+        self.resumos = 0
+
+    def registrar(self, chave, dados):
+        """Grava a primeira ocorrência da chave na janela; as seguintes só contam."""
+        with self._lock:
+            entrada = self._janela.get(chave)
+            if entrada is None and len(self._janela) < self.max_chaves:
+                self._janela[chave] = {"dados": dados, "repeticoes": 0, "ultimo": dados["horario"]}
+                self._agendar()
+                gravar = True
+            elif entrada is None:
+                # Muitas chaves distintas: grava sem agregar (não perde o evento)
+                gravar = True
+            else:
+                entrada["repeticoes"] += 1
+                entrada["ultimo"] = dados["horario"]
+                self.agregados += 1
+                gravar = False
+
+        if gravar:
+            gravador_logs.registrar(dados)
+
+    def _agendar(self):
+        if self._timer is None:
+            self._timer = threading.Timer(self.intervalo, self.descarregar)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def descarregar(self):
+        """Grava um log-resumo por chave com repetições e abre uma nova janela."""
+        with self._lock:
+            janela = self._janela
+            self._janela = {}
+            self._timer = None
+
+        for entrada in janela.values():
+            if not entrada["repeticoes"]:
+                continue
+
+            dados = entrada["dados"]
+            gravador_logs.registrar({
+                **dados,
+                "horario": datetime.now(timezone.utc),
+                "descricao": f"{dados['descricao']} — repetido mais {entrada['repeticoes']}x em {self.intervalo:g}s",
+                "modificacoes": json.dumps({
+                    "repeticoes": entrada["repeticoes"],
+                    "primeira": dados["horario"].isoformat(),
+                    "ultima": entrada["ultimo"].isoformat(),
+                }, ensure_ascii=False, sort_keys=True),
+            })
+            self.resumos += 1
+
+    def encerrar(self):
+        """Cancela o timer e grava já os resumos pendentes (saída do processo)."""
+        with self._lock:
+            timer = self._timer
+        if timer is not None:
+            timer.cancel()
+        self.descarregar()
+
+    def estatisticas(self):
+        return {"chaves": len(self._janela), "agregados": self.agregados, "resumos": self.resumos}
+
+
+# =====================================================
+# INSTÂNCIAS DA APLICAÇÃO
+# =====================================================
+limite_login_ip = LimitadorJanela(20, 60)        # POST /login por IP
+limite_login_email = LimitadorJanela(5, 300)     # senhas erradas por e-mail
+limite_anonimo = LimitadorJanela(60, 60)         # rotas protegidas sem login, por IP
+agregador_negacoes = AgregadorNegacoes(60)
+
+
+def init_app(app):
+    app.config.setdefault("LIMITE_LOGIN_IP", (20, 60))        # (tentativas, segundos)
+    app.config.setdefault("LIMITE_LOGIN_EMAIL", (5, 300))
+    app.config.setdefault("LIMITE_ANONIMO", (60, 60))
+    app.config.setdefault("NEGACOES_INTERVALO", 60)           # janela de agregação (segundos)
+
+    limite_login_ip.configurar(*app.config["LIMITE_LOGIN_IP"])
+    limite_login_email.configurar(*app.config["LIMITE_LOGIN_EMAIL"])
+    limite_anonimo.configurar(*app.config["LIMITE_ANONIMO"])
+    agregador_negacoes.intervalo = float(app.config["NEGACOES_INTERVALO"])
+
+    # atexit roda em ordem inversa: registrado depois do gravador_logs.init_app,
+    # os resumos entram na fila antes de gravador_logs.encerrar esvaziá-la
+    atexit.register(agregador_negacoes.encerrar)
+
+
+def estatisticas():
+    return {
+        "login_ip": limite_login_ip.estatisticas(),
+        "login_email": limite_login_email.estatisticas(),
+        "anonimo": limite_anonimo.estatisticas(),
+        "negacoes": agregador_negacoes.estatisticas(),
+    }
@@ -0,0 +1,248 @@
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, select, update
+
+from config import db, socketio
+from models.chat_presenca_model import ChatPresenca
+
+
+# =====================================================
+# PRESENÇA NO CHAT (vários sockets por usuário, vários workers)
+# =====================================================
+# Cada aba aberta é um socket (sid); o usuário está online enquanto tiver
+# pelo menos um sid vivo. O registro é plugável (PRESENCA_BACKEND):
+#   * "memoria": dicionário do processo — um worker só, testes e scripts
+#   * "banco":   tabela chat_presenca — visível para todos os workers
+# Cada worker renova (batimento) os sids que segura a cada PRESENCA_BATIMENTO
+# segundos. Se um worker morre sem disparar disconnect, os sids dele param de
+# ser renovados e, passados PRESENCA_EXPIRA segundos, deixam de contar como
+# online; a varredura seguinte remove as linhas e avisa `user_offline`.
+#
+# A entrega entre workers (emit para a sala de outro usuário) é feita pela
+# fila de mensagens do Socket.IO (SOCKETIO_MESSAGE_QUEUE em app.py).
+
+class PresencaMemoria:
+    """Registro no próprio processo: {usuario_id: {sid: visto_em}}."""
+
+    def __init__(self):
+        self._sockets = {}
+        self._lock = threading.Lock()
+
+    def conectar(self, uid, sid, limite):
+        with self._lock:
+            sids = self._sockets.setdefault(uid, {})
+            primeiro = not any(visto >= limite for visto in sids.values())
+            sids[sid] = time.time()
+            return primeiro
+
+    def desconectar(self, uid, sid, limite):
+        with self._lock:
+            sids = self._sockets.get(uid, {})
+            sids.pop(sid, None)
+            if any(visto >= limite for visto in sids.values()):
+                return False
+            self._sockets.pop(uid, None)
+            return True
+
+    def batimento(self, locais):
+        agora = time.time()
+        with self._lock:
+            for sid, uid in locais.items():
+                self._sockets.setdefault(uid, {})[sid] = agora
+
+    def expirar(self, limite):
+        offline = set()
+        with self._lock:
+            for uid, sids in list(self._sockets.items()):
+                for sid, visto in list(sids.items()):
+                    if visto < limite:
+                        del sids[sid]
+                if not sids:
+                    del self._sockets[uid]
+                    offline.add(uid)
+        return offline
+
+    def online(self, ids, limite):
+        with self._lock:
+            return {
+                uid for uid, sids in self._sockets.items()
+                if (ids is None or uid in ids) and any(visto >= limite for visto in sids.values())
+            }
+
+
+class PresencaBanco:
+    """Registro na tabela chat_presenca (uma linha por sid)."""
+
+    @property
+    def processo(self):
+        # Calculado no uso: com preload + fork, o pid do init_app é o do mestre
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    @staticmethod
+    def _data(limite):
+        return datetime.fromtimestamp(limite, timezone.utc)
+
+    def _tem_sid_vivo(self, uid, limite):
+        return db.session.execute(
+            select(ChatPresenca.sid)
+            .where(ChatPresenca.usuario_id == uid, ChatPresenca.visto_em >= self._data(limite))
+            .limit(1)
+        ).first() is not None
+
+    # Corridas entre workers só geram avisos repetidos (inofensivos), nunca
+    # um aviso perdido: conectar olha antes de inserir, desconectar depois de apagar.
+    def conectar(self, uid, sid, limite):
+        primeiro = not self._tem_sid_vivo(uid, limite)
+        db.session.merge(ChatPresenca(
+            sid=sid, usuario_id=uid, processo=self.processo, visto_em=datetime.now(timezone.utc)
+        ))
+        db.session.commit()
+        return primeiro
+
+    def desconectar(self, uid, sid, limite):
+        db.session.execute(delete(ChatPresenca).where(ChatPresenca.sid == sid))
+        db.session.commit()
+        return not self._tem_sid_vivo(uid, limite)
+
+    def batimento(self, locais):
+        if not locais:
+            return
+        agora = datetime.now(timezone.utc)
+        db.session.execute(
+            update(ChatPresenca).where(ChatPresenca.sid.in_(list(locais))).values(visto_em=agora)
+        )
+        # Linha apagada por engano (pausa longa deste worker): volta a existir
+        existentes = set(db.session.scalars(
+            select(ChatPresenca.sid).where(ChatPresenca.sid.in_(list(locais)))
+        ))
+        for sid, uid in locais.items():
+            if sid not in existentes:
+                db.session.add(ChatPresenca(sid=sid, usuario_id=uid, processo=self.processo, visto_em=agora))
+        db.session.commit()
+
+    def expirar(self, limite):
+        data = self._data(limite)
+        candidatos = set(db.session.scalars(
+            select(ChatPresenca.usuario_id).where(ChatPresenca.visto_em < data)
+        ))
+        if not candidatos:
+            return set()
+
+        db.session.execute(delete(ChatPresenca).where(ChatPresenca.visto_em < data))
+        db.session.commit()
+        return candidatos - self.online(candidatos, limite)
+
+    def online(self, ids, limite):
+        consulta = select(ChatPresenca.usuario_id).where(ChatPresenca.visto_em >= self._data(limite))
+        if ids is not None:
+            if not ids:
+                return set()
+            consulta = consulta.where(ChatPresenca.usuario_id.in_(list(ids)))
+        return set(db.session.scalars(consulta.distinct()))
+
+
+BACKENDS = {"memoria": PresencaMemoria, "banco": PresencaBanco}
+
+
+class Presenca:
+    def __init__(self):
+        self.app = None
+        self.registro = PresencaMemoria()
+        self.batimento = 15.0
+        self.expira = 45.0
+        self._locais = {}   # { sid: usuario_id } dos sockets deste processo
+        self._lock = threading.Lock()
+        self._pid = None
+
+        self.expirados = 0
+
+    def init_app(self, app):
+        app.config.setdefault("PRESENCA_BACKEND", "memoria")
+        app.config.setdefault("PRESENCA_BATIMENTO", 15.0)   # segundos
+        app.config.setdefault("PRESENCA_EXPIRA", 45.0)      # sem batimento há mais que isso = offline
+
+        backend = app.config["PRESENCA_BACKEND"]
+        if backend not in BACKENDS:
+            raise ValueError(f"PRESENCA_BACKEND inválido: {backend!r} (use {', '.join(BACKENDS)})")
+
+        self.app = app
+        self.batimento = float(app.config["PRESENCA_BATIMENTO"])
+        self.expira = float(app.config["PRESENCA_EXPIRA"])
+        self.registro = BACKENDS[backend]()
+
+    def _limite(self):
+        return time.time() - self.expira
+
+    # -------------------------------------------------
+    # API usada pelos handlers do chat
+    # -------------------------------------------------
+    def conectar(self, uid, sid):
+        """Registra o socket; True se é o primeiro socket vivo do usuário (ficou online)."""
+        self._garantir_tarefa()
+        with self._lock:
+            self._locais[sid] = uid
+        return self.registro.conectar(uid, sid, self._limite())
+
+    def desconectar(self, uid, sid):
+        """Remove o socket; True se o usuário não tem mais nenhum (ficou offline)."""
+        with self._lock:
+            self._locais.pop(sid, None)
+        return self.registro.desconectar(uid, sid, self._limite())
+
+    def online(self, ids=None):
+        """Conjunto dos ids (entre `ids`, se informado) com algum socket vivo em qualquer worker."""
+        return self.registro.online(None if ids is None else set(ids), self._limite())
+
+    def esta_online(self, uid):
+        return bool(self.online([uid]))
+
+    # -------------------------------------------------
+    # Batimento + varredura (uma tarefa por processo)
+    # -------------------------------------------------
+    def _garantir_tarefa(self):
+        if self.app is None:
+            return
+        pid = os.getpid()
+        with self._lock:
+            if self._pid == pid:
+                return
+            if self._pid is not None:
+                # Filho de fork: os sockets do pai não são deste processo
+                self._locais.clear()
+            self._pid = pid
+        socketio.start_background_task(self._executar)
+
+    def ciclo(self):
+        """Renova os sids deste processo e remove os expirados de todos; avisa quem saiu."""
+        with self._lock:
+            locais = dict(self._locais)
+        self.registro.batimento(locais)
+
+        for uid in self.registro.expirar(self._limite()):
+            self.expirados += 1
+            socketio.emit("user_offline", {"id": uid}, namespace="/")
+
+    def _executar(self):
+        while True:
+            socketio.sleep(self.batimento)
+            try:
+                with self.app.app_context():
+                    self.ciclo()
+            except Exception:
+                self.app.logger.exception("Falha no batimento de presença")
+
+    def estatisticas(self):
+        return {
+            "backend": type(self.registro).__name__,
+            "sockets_locais": len(self._locais),
+            "batimento": self.batimento,
+            "expira": self.expira,
+            "expirados": self.expirados,
+        }
+
+
+presenca = Presenca()
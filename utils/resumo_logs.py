@@ -0,0 +1,110 @@
+from collections import Counter
+from datetime import datetime, timezone
+
+import click
+from config import db
+from models.log_model import Log
+from models.log_resumo_model import LogResumoDiario
+from utils.gravador_logs import gravador_logs
+from utils.tempo import utc_to_brasil
+
+
+# =====================================================
+# RESUMO DIÁRIO DE LOGS (rollup)
+# =====================================================
+# Mantido de forma incremental pelo gravador de logs, na mesma transação de
+# cada lote. `flask reconstruir-resumo-logs` recalcula tudo a partir da
+# tabela de logs e dos segmentos arquivados.
+
+def init_app(app):
+    gravador_logs.na_transacao(acumular)
+
+    @app.cli.command("reconstruir-resumo-logs")
+    def reconstruir_resumo_comando():
+        """Recalcula logs_resumo_diario a partir dos logs (inclusive arquivados)."""
+        total = reconstruir()
+        click.echo(f"Resumo reconstruído: {total} logs contabilizados.")
+
+
+def _chave(horario, tipo_operacao, tipo_modelo):
+    # Log ainda sem horario (default só é aplicado no flush): conta como agora
+    if horario is None:
+        horario = datetime.now(timezone.utc)
+    return (utc_to_brasil(horario).date(), tipo_operacao, tipo_modelo)
+
+
+def acumular(logs):
+    """Soma os logs recém-inseridos ao resumo (sem commit)."""
+    contagem = Counter(_chave(log.horario, log.tipo_operacao, log.tipo_modelo) for log in logs)
+    _somar(contagem)
+
+
+def _somar(contagem):
+    tabela = LogResumoDiario.__table__
+    dialeto = db.session.get_bind().dialect.name
+
+    if dialeto in ("sqlite", "postgresql"):
+        if dialeto == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            from sqlalchemy.dialects.postgresql import insert
+
+        for (dia, operacao, modelo), qtd in contagem.items():
+            comando = insert(tabela).values(dia=dia, tipo_operacao=operacao, tipo_modelo=modelo, total=qtd)
+            comando = comando.on_conflict_do_update(
+                index_elements=["dia", "tipo_operacao", "tipo_modelo"],
+                set_={"total": tabela.c.total + comando.excluded.total}
+            )
+            db.session.execute(comando)
+        return
+
+    # Outros bancos: UPDATE e, se não havia linha, INSERT
+    for (dia, operacao, modelo), qtd in contagem.items():
+        atualizadas = db.session.execute(
+            tabela.update()
+            .where(tabela.c.dia == dia, tabela.c.tipo_operacao == operacao, tabela.c.tipo_modelo == modelo)
+            .values(total=tabela.c.total + qtd)
+        ).rowcount
+        if not atualizadas:
+            db.session.execute(tabela.insert().values(dia=dia, tipo_operacao=operacao, tipo_modelo=modelo, total=qtd))
+
+
+def reconstruir(tamanho_lote=5000):
+    """Apaga e recalcula o resumo. Retorna quantos logs foram contabilizados."""
+    from utils.arquivo_logs import listar_segmentos, ler_segmento
+
+    contagem = Counter()
+    ultimo_id = 0
+
+    while True:
+        linhas = (
+            db.session.query(Log.id, Log.horario, Log.tipo_operacao, Log.tipo_modelo)
+            .filter(Log.id > ultimo_id)
+            .order_by(Log.id.asc())
+            .limit(tamanho_lote)
+            .all()
+        )
+        if not linhas:
+            break
+        contagem.update(_chave(l.horario, l.tipo_operacao, l.tipo_modelo) for l in linhas)
+        ultimo_id = linhas[-1].id
+
+    for indice in listar_segmentos():
+        contagem.update(_chave(r.horario, r.tipo_operacao, r.tipo_modelo) for r in ler_segmento(indice))
+
+    db.session.query(LogResumoDiario).delete()
+    if contagem:
+        db.session.execute(LogResumoDiario.__table__.insert(), [
+            {"dia": dia, "tipo_operacao": operacao, "tipo_modelo": modelo, "total": qtd}
+            for (dia, operacao, modelo), qtd in contagem.items()
+        ])
+    db.session.commit()
+
+    return sum(contagem.values())
+
+
+def garantir_resumo():
+    """Na primeira subida com a tabela nova, calcula o resumo dos logs existentes."""
+    if db.session.query(LogResumoDiario.dia).first() is None and db.session.query(Log.id).first() is not None:
+        reconstruir()
+
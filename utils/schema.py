@@ -0,0 +1,16 @@
+from config import db
+
+
+# =====================================================
+# ÍNDICES EM BANCOS JÁ EXISTENTES
+# =====================================================
+def garantir_indices(*modelos):
+    """
+    Cria os índices declarados nos modelos que ainda não existem no banco.
+
+    db.create_all() só cria índices junto com tabelas novas; em um
+    database.db antigo os índices adicionados depois precisam deste passo.
+    """
+    for modelo in modelos:
+        for indice in modelo.__table__.indexes:
+            indice.create(bind=db.engine, checkfirst=True)
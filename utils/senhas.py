@@ -0,0 +1,126 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FuturoTimeout
+
+from werkzeug.security import generate_password_hash, check_password_hash
+
+
+# =====================================================
+# HASH DE SENHAS FORA DA THREAD DA REQUISIÇÃO
+# =====================================================
+# scrypt/pbkdf2 ocupam a CPU por dezenas de milissegundos. Num pico de
+# logins (troca de turno) isso prende todos os workers; aqui o hash roda num
+# pool de processos limitado (SENHA_PROCESSOS) e a requisição só espera.
+# No máximo SENHA_FILA_MAX hashes ficam em andamento ou na fila: acima disso,
+# ou se o resultado não vier em SENHA_TIMEOUT segundos, levanta
+# SenhasOcupado e a rota responde 503 em vez de acumular requisições.
+# SENHA_METODO é o método do werkzeug ("scrypt", "pbkdf2:sha256:600000"...);
+# hashes gravados com outros parâmetros são refeitos no próximo login.
+
+class SenhasOcupado(RuntimeError):
+    """Pool de hash cheio ou sem resposta dentro do timeout."""
+
+
+class ServicoSenhas:
+    def __init__(self):
+        self.metodo = "scrypt"
+        self.processos = 0   # 0 = hash na própria thread (scripts, mocks, testes)
+        self.timeout = 5.0
+        self._pool = None
+        self._vagas = None
+        self._prefixo = None
+        self._lock = threading.Lock()
+        self._pid = None
+
+        self.hashes = 0
+        self.recusados = 0
+        self.expirados = 0
+
+    def init_app(self, app):
+        app.config.setdefault("SENHA_METODO", "scrypt")
+        app.config.setdefault("SENHA_PROCESSOS", os.cpu_count() or 1)
+        app.config.setdefault("SENHA_TIMEOUT", 5.0)
+        app.config.setdefault("SENHA_FILA_MAX", 4 * int(app.config["SENHA_PROCESSOS"]))
+
+        self.metodo = app.config["SENHA_METODO"]
+        self.processos = int(app.config["SENHA_PROCESSOS"])
+
+        # Com "spawn" (Windows) o worker reimporta o app.py: lá dentro, hash direto
+        if multiprocessing.parent_process() is not None:
+            self.processos = 0
+
+        self.timeout = float(app.config["SENHA_TIMEOUT"])
+        self._vagas = threading.BoundedSemaphore(max(int(app.config["SENHA_FILA_MAX"]), 1))
+        self._prefixo = None
+
+    # -------------------------------------------------
+    # Pool (criado no primeiro uso, um por processo)
+    # -------------------------------------------------
+    def _obter_pool(self):
+        pid = os.getpid()
+        with self._lock:
+            if self._pool is None or self._pid != pid:
+                self._pool = ProcessPoolExecutor(max_workers=self.processos)
+                self._pid = pid
+            return self._pool
+
+    def _contar(self, nome):
+        # Chamado por várias threads de requisição ao mesmo tempo
+        with self._lock:
+            setattr(self, nome, getattr(self, nome) + 1)
+
+    def _executar(self, funcao, *args):
+        self._contar("hashes")
+        if not self.processos:
+            return funcao(*args)
+
+        if not self._vagas.acquire(timeout=self.timeout):
+            self._contar("recusados")
+            raise SenhasOcupado("Muitas senhas sendo verificadas ao mesmo tempo.")
+
+        try:
+            futuro = self._obter_pool().submit(funcao, *args)
+        except Exception:
+            self._vagas.release()
+            raise
+
+        # A vaga só volta quando o futuro termina: hash concluído, com erro ou
+        # cancelado ainda na fila. Um hash já em execução segura a vaga até o
+        # fim, mesmo depois do timeout da requisição.
+        futuro.add_done_callback(lambda _: self._vagas.release())
+        try:
+            return futuro.result(timeout=self.timeout)
+        except FuturoTimeout:
+            # Só tem efeito se o hash ainda não começou (libera a vaga pelo callback)
+            futuro.cancel()
+            self._contar("expirados")
+            raise SenhasOcupado("Verificação de senha demorou demais.")
+
+    # -------------------------------------------------
+    # API
+    # -------------------------------------------------
+    def gerar_hash(self, senha):
+        return self._executar(generate_password_hash, senha, self.metodo)
+
+    def verificar(self, senha_hash, senha):
+        return self._executar(check_password_hash, senha_hash, senha)
+
+    def precisa_rehash(self, senha_hash):
+        """True se o hash foi gerado com método/parâmetros diferentes dos configurados."""
+        if self._prefixo is None:
+            # "scrypt" → "scrypt:32768:8:1": os padrões vêm da versão instalada do werkzeug
+            self._prefixo = self._executar(generate_password_hash, "", self.metodo).split("$", 1)[0]
+        return senha_hash.split("$", 1)[0] != self._prefixo
+
+    def estatisticas(self):
+        return {
+            "metodo": self.metodo,
+            "processos": self.processos,
+            "hashes": self.hashes,
+            "recusados": self.recusados,
+            "expirados": self.expirados,
+        }
+
+
+servico_senhas = ServicoSenhas()
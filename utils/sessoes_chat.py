@@ -0,0 +1,179 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import Integer, cast, event, func
+from sqlalchemy.orm import Session
+
+from config import db
+from models.chat_sessao_model import ChatSessao
+from utils.estado_sistema import estado_sistema
+
+CHAVE = "chat_sessoes"
+
+
+# =====================================================
+# SESSÕES DO CHAT (par canônico + cache de pares ativos)
+# =====================================================
+# Cada conversa é uma linha de chat_sessoes com o par em ordem
+# (usuario1_id = menor id, usuario2_id = maior) e índice único no par:
+# a busca é por igualdade, sem OR de ordens.
+# Enviar mensagem ativa a sessão na MESMA transação do INSERT da mensagem
+# (um commit por mensagem). Pares que este processo sabe ativos ficam em
+# cache por CHAT_SESSOES_TTL segundos e nem chegam a ir ao banco.
+# Fechar soma 1 à chave "chat_sessoes" de estado_sistema na mesma transação.
+# Cada par em cache guarda a versão lida antes da ativação e só vale
+# enquanto ela for a atual: em até ESTADO_INTERVALO, nenhum worker confia
+# num par ativado antes do fechamento, e a próxima mensagem reabre a sessão.
+
+def par(usuario_a, usuario_b):
+    """(menor id, maior id): chave canônica da conversa."""
+    return (usuario_a, usuario_b) if usuario_a <= usuario_b else (usuario_b, usuario_a)
+
+
+class SessoesAtivas:
+    def __init__(self):
+        self.ttl = 60.0
+        self.max_pares = 50_000
+        self._pares = OrderedDict()   # { par: (expira_em, versao) }
+        self._lock = threading.Lock()
+
+        self.acertos = 0
+        self.gravacoes = 0
+
+    def init_app(self, app):
+        app.config.setdefault("CHAT_SESSOES_TTL", 60.0)      # segundos
+        app.config.setdefault("CHAT_SESSOES_MAX", 50_000)    # pares em cache
+        self.ttl = float(app.config["CHAT_SESSOES_TTL"])
+        self.max_pares = int(app.config["CHAT_SESSOES_MAX"])
+
+        # O par só entra no cache depois que a transação confirma
+        event.listen(Session, "after_commit", self._confirmar)
+        event.listen(Session, "after_rollback", self._descartar)
+
+    # -------------------------------------------------
+    # Cache
+    # -------------------------------------------------
+    def _em_cache(self, chave, versao):
+        agora = time.monotonic()
+        with self._lock:
+            entrada = self._pares.get(chave)
+            if entrada is None:
+                return False
+            if entrada[0] < agora or entrada[1] != versao:
+                del self._pares[chave]
+                return False
+            return True
+
+    def _guardar(self, chave, versao):
+        with self._lock:
+            self._pares[chave] = (time.monotonic() + self.ttl, versao)
+            self._pares.move_to_end(chave)
+            while len(self._pares) > self.max_pares:
+                self._pares.popitem(last=False)
+
+    def _confirmar(self, sessao):
+        for chave, versao in sessao.info.pop("chat_sessoes_ativadas", {}).items():
+            self._guardar(chave, versao)
+
+    def _descartar(self, sessao):
+        sessao.info.pop("chat_sessoes_ativadas", None)
+
+    # -------------------------------------------------
+    # API
+    # -------------------------------------------------
+    def ativar(self, usuario_a, usuario_b):
+        """Cria ou reativa a sessão na transação atual (sem commit)."""
+        chave = par(usuario_a, usuario_b)
+        # Lida antes do upsert: um fechamento confirmado no meio invalida o par
+        versao = estado_sistema.versao(CHAVE)
+        if self._em_cache(chave, versao):
+            self.acertos += 1
+            return
+
+        tabela = ChatSessao.__table__
+        dialeto = db.session.get_bind().dialect.name
+        if dialeto in ("sqlite", "postgresql"):
+            if dialeto == "sqlite":
+                from sqlalchemy.dialects.sqlite import insert
+            else:
+                from sqlalchemy.dialects.postgresql import insert
+
+            comando = insert(tabela).values(usuario1_id=chave[0], usuario2_id=chave[1], ativa=True)
+            db.session.execute(comando.on_conflict_do_update(
+                index_elements=["usuario1_id", "usuario2_id"],
+                set_={"ativa": True}
+            ))
+        else:
+            # Outros bancos: UPDATE e, se não havia linha, INSERT
+            atualizadas = db.session.execute(
+                tabela.update()
+                .where(tabela.c.usuario1_id == chave[0], tabela.c.usuario2_id == chave[1])
+                .values(ativa=True)
+            ).rowcount
+            if not atualizadas:
+                db.session.execute(tabela.insert().values(usuario1_id=chave[0], usuario2_id=chave[1], ativa=True))
+
+        self.gravacoes += 1
+        db.session.info.setdefault("chat_sessoes_ativadas", {})[chave] = versao
+
+    def fechar(self, usuario_a, usuario_b):
+        """Marca a sessão como inativa (sem commit) e invalida o par em todos os workers."""
+        chave = par(usuario_a, usuario_b)
+        with self._lock:
+            self._pares.pop(chave, None)
+        db.session.info.get("chat_sessoes_ativadas", {}).pop(chave, None)
+
+        tabela = ChatSessao.__table__
+        db.session.execute(
+            tabela.update()
+            .where(tabela.c.usuario1_id == chave[0], tabela.c.usuario2_id == chave[1])
+            .values(ativa=False)
+        )
+        estado_sistema.incrementar(db.session.connection(), CHAVE)
+
+    def limpar(self):
+        with self._lock:
+            self._pares.clear()
+
+    def estatisticas(self):
+        return {
+            "pares_em_cache": len(self._pares),
+            "ttl": self.ttl,
+            "acertos": self.acertos,
+            "gravacoes": self.gravacoes,
+        }
+
+
+sessoes_chat = SessoesAtivas()
+
+
+# -------------------------------------------------
+# Bancos antigos: pares fora de ordem e duplicados
+# -------------------------------------------------
+def garantir_sessoes_canonicas():
+    """Põe os pares em ordem e junta duplicatas antes do índice único (idempotente)."""
+    tabela = ChatSessao.__table__
+
+    # (5, 2) → (2, 5); o SET usa os valores antigos das duas colunas
+    db.session.execute(
+        tabela.update()
+        .where(tabela.c.usuario1_id > tabela.c.usuario2_id)
+        .values(usuario1_id=tabela.c.usuario2_id, usuario2_id=tabela.c.usuario1_id)
+    )
+
+    duplicados = db.session.execute(
+        db.select(tabela.c.usuario1_id, tabela.c.usuario2_id, func.min(tabela.c.id), func.max(cast(tabela.c.ativa, Integer)))
+        .group_by(tabela.c.usuario1_id, tabela.c.usuario2_id)
+        .having(func.count() > 1)
+    ).all()
+
+    for usuario1, usuario2, manter, ativa in duplicados:
+        db.session.execute(
+            tabela.delete().where(
+                tabela.c.usuario1_id == usuario1, tabela.c.usuario2_id == usuario2, tabela.c.id != manter
+            )
+        )
+        db.session.execute(tabela.update().where(tabela.c.id == manter).values(ativa=bool(ativa)))
+
+    db.session.commit()
@@ -0,0 +1,167 @@
+import logging
+import os
+import threading
+from collections import deque
+
+from flask import current_app, has_app_context
+
+from config import socketio
+
+
+# =====================================================
+# EMISSOR SOCKET.IO EM LOTE (coalescência de rajadas)
+# =====================================================
+class EmissorEmLote:
+    """
+    Junta itens num buffer e entrega a cada `intervalo` segundos um único
+    evento por assinante, só com os itens que passam no filtro dele.
+
+    Numa rajada, cada assinante recebe no máximo `maximo` itens por envio
+    (os mais recentes) e a contagem dos que ficaram de fora em "omitidos".
+
+    `combinar(itens) → itens`, se informado, reduz o buffer antes do envio
+    (ex.: somar os deltas do intervalo num único item).
+
+    Os assinantes ficam no processo que atendeu o connect. Com `sala` (só
+    para emissores sem filtro), eles entram numa sala do Socket.IO e cada
+    processo que publica envia um evento à sala: com SOCKETIO_MESSAGE_QUEUE,
+    a fila entrega aos assinantes de todos os workers. Sem `sala`, cada
+    assinante só recebe o que foi publicado no próprio worker.
+    """
+
+    def __init__(self, evento, namespace, atende=None, intervalo=0.5, maximo=100, buffer_max=5000,
+                 combinar=None, sala=None):
+        if sala and atende:
+            raise ValueError("Emissor com sala não filtra por assinante.")
+        self.evento = evento
+        self.namespace = namespace
+        self.sala = sala
+        self.atende = atende or (lambda filtro, item: True)
+        self.combinar = combinar
+        self.intervalo = intervalo
+        self.maximo = maximo
+
+        self._pendentes = deque(maxlen=buffer_max)
+        self._perdidos = 0
+        self._assinantes = {}  # { sid: filtro (dict) }
+        self._lock = threading.Lock()
+        self._pid = None
+        self._logger = logging.getLogger(__name__)
+
+        self.enviados = 0
+        self.envios = 0
+
+    # -------------------------------------------------
+    # Assinaturas
+    # -------------------------------------------------
+    def inscrever(self, sid, filtro=None):
+        with self._lock:
+            self._assinantes[sid] = dict(filtro or {})
+        if self.sala:
+            socketio.server.enter_room(sid, self.sala, namespace=self.namespace)
+        self._garantir_tarefa()
+
+    def cancelar(self, sid):
+        # A sala é desfeita pelo próprio Socket.IO no disconnect
+        with self._lock:
+            self._assinantes.pop(sid, None)
+
+    def tem_assinantes(self):
+        """False só quando é certo que ninguém ouve (assinantes de outros workers não são visíveis)."""
+        if self.sala and socketio.server_options.get("message_queue"):
+            return True
+        return bool(self._assinantes)
+
+    # -------------------------------------------------
+    # Entrada
+    # -------------------------------------------------
+    def adicionar(self, itens):
+        """Coloca itens no buffer (descartados se ninguém estiver ouvindo)."""
+        if not self.tem_assinantes():
+            return
+        self._garantir_tarefa()
+        with self._lock:
+            excedente = len(self._pendentes) + len(itens) - self._pendentes.maxlen
+            if excedente > 0:
+                self._perdidos += excedente
+            self._pendentes.extend(itens)
+
+    # -------------------------------------------------
+    # Tarefa de envio
+    # -------------------------------------------------
+    def _garantir_tarefa(self):
+        pid = os.getpid()
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._pid = pid
+        # A tarefa roda fora de qualquer contexto: guarda o logger do app agora
+        if has_app_context():
+            self._logger = current_app.logger
+        socketio.start_background_task(self._executar)
+
+    def _executar(self):
+        while True:
+            socketio.sleep(self.intervalo)
+            try:
+                self.descarregar()
+            except Exception:
+                self._logger.exception("Falha ao enviar %s em lote", self.evento)
+
+    def descarregar(self):
+        """Envia o que está no buffer (chamado pela tarefa de fundo)."""
+        with self._lock:
+            if not self._pendentes:
+                return
+            itens = list(self._pendentes)
+            perdidos = self._perdidos
+            self._pendentes.clear()
+            self._perdidos = 0
+            assinantes = dict(self._assinantes)
+
+        if self.combinar:
+            itens = self.combinar(itens)
+
+        if self.sala:
+            if itens:
+                self._enviar_sala(itens, perdidos)
+            return
+
+        # Assinantes com o mesmo filtro compartilham o mesmo payload
+        por_filtro = {}
+        for sid, filtro in assinantes.items():
+            chave = tuple(sorted(filtro.items()))
+            por_filtro.setdefault(chave, (filtro, []))[1].append(sid)
+
+        for filtro, sids in por_filtro.values():
+            selecionados = [item for item in itens if self.atende(filtro, item)]
+            if not selecionados:
+                continue
+
+            payload = {
+                "itens": selecionados[-self.maximo:],
+                "omitidos": max(len(selecionados) - self.maximo, 0) + perdidos,
+            }
+            for sid in sids:
+                socketio.emit(self.evento, payload, to=sid, namespace=self.namespace)
+
+            self.envios += len(sids)
+            self.enviados += len(payload["itens"]) * len(sids)
+
+    def _enviar_sala(self, itens, perdidos):
+        """Um evento para a sala; a fila de mensagens leva aos outros workers."""
+        payload = {
+            "itens": itens[-self.maximo:],
+            "omitidos": max(len(itens) - self.maximo, 0) + perdidos,
+        }
+        socketio.emit(self.evento, payload, to=self.sala, namespace=self.namespace)
+        self.envios += 1
+        self.enviados += len(payload["itens"])
+
+    def estatisticas(self):
+        return {
+            "assinantes": len(self._assinantes),
+            "pendentes": len(self._pendentes),
+            "envios": self.envios,
+            "itens_enviados": self.enviados,
+        }
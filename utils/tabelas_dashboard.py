@@ -0,0 +1,180 @@
+import base64
+import json
+
+from sqlalchemy import and_, or_, func
+
+from config import db
+from models.usuario_model import Usuario, PerfilEnum
+from models.veiculo_model import Veiculo
+from models.equipamento_model import Equipamento
+
+
+# =====================================================
+# TABELAS DO DASHBOARD — PÁGINAS POR CURSOR
+# =====================================================
+# Só as colunas exibidas são selecionadas (sem objetos ORM). A ordenação é
+# (coluna, id) e o cursor guarda os valores da última linha da página, então
+# cada página é um range scan no índice (coluna, id) — sem OFFSET.
+# Em "colunas", "ID" vem sempre primeiro (o cursor usa linha[0]).
+
+POR_PAGINA_PADRAO = 50
+POR_PAGINA_MAX = 200
+
+TABELAS = {
+    "usuarios": {
+        "modelo": Usuario,
+        "colunas": {"ID": Usuario.id, "Nome": Usuario.name, "Email": Usuario.email, "Perfil": Usuario.perfil},
+        "ordenaveis": {"id": Usuario.id, "nome": Usuario.name, "perfil": Usuario.perfil},
+        "filtros": {"perfil": Usuario.perfil},
+    },
+    "veiculos": {
+        "modelo": Veiculo,
+        "colunas": {
+            "ID": Veiculo.id, "Marca": Veiculo.marca, "Modelo": Veiculo.modelo, "Ano": Veiculo.ano_fabricacao,
+            "Situação": Veiculo.situacao, "Localização": Veiculo.local_armazenamento,
+        },
+        "ordenaveis": {
+            "id": Veiculo.id, "marca": Veiculo.marca, "ano": Veiculo.ano_fabricacao,
+            "situacao": Veiculo.situacao, "local": Veiculo.local_armazenamento,
+        },
+        "filtros": {"situacao": Veiculo.situacao, "local": Veiculo.local_armazenamento},
+    },
+    "equipamentos": {
+        "modelo": Equipamento,
+        "colunas": {
+            "ID": Equipamento.id, "Nome": Equipamento.nome, "Qtd": Equipamento.quantidade,
+            "Situação": Equipamento.situacao, "Perigo": Equipamento.nivel_perigo,
+        },
+        "ordenaveis": {
+            "id": Equipamento.id, "nome": Equipamento.nome, "quantidade": Equipamento.quantidade,
+            "situacao": Equipamento.situacao, "perigo": Equipamento.nivel_perigo,
+        },
+        "filtros": {"situacao": Equipamento.situacao, "perigo": Equipamento.nivel_perigo},
+    },
+}
+
+
+class ParametroInvalido(ValueError):
+    """Ordenação, filtro ou cursor inválido na query string."""
+
+
+# -------------------------------------------------
+# Cursor opaco: base64(JSON [valor_da_coluna, id])
+# -------------------------------------------------
+def codificar_cursor(valor, id_):
+    if isinstance(valor, PerfilEnum):
+        valor = valor.name
+    bruto = json.dumps([valor, id_], default=str).encode()
+    return base64.urlsafe_b64encode(bruto).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor, coluna):
+    try:
+        bruto = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        valor, id_ = json.loads(bruto)
+        id_ = int(id_)
+    except (ValueError, TypeError):
+        raise ParametroInvalido("cursor inválido")
+
+    if coluna is Usuario.perfil:
+        if valor not in PerfilEnum.__members__:
+            raise ParametroInvalido("cursor inválido")
+        valor = PerfilEnum[valor]
+    return valor, id_
+
+
+def _valor_filtro(coluna, valor):
+    """Filtro de perfil aceita o nome (ADMIN_SEGURANCA) ou o rótulo (Administrador de Segurança)."""
+    if coluna is not Usuario.perfil:
+        return valor
+    for perfil in PerfilEnum:
+        if valor in (perfil.name, perfil.value):
+            return perfil
+    raise ParametroInvalido("perfil inválido")
+
+
+# -------------------------------------------------
+# Consulta
+# -------------------------------------------------
+def _filtrar(query, tabela, args):
+    for param, coluna in tabela["filtros"].items():
+        valor = args.get(param)
+        if valor:
+            query = query.filter(coluna == _valor_filtro(coluna, valor))
+    return query
+
+
+def contar(entidade, args):
+    """Total de linhas com os filtros (para exibir "x de N")."""
+    tabela = TABELAS[entidade]
+    query = _filtrar(db.session.query(func.count(tabela["modelo"].id)), tabela, args)
+    return query.scalar()
+
+
+def pagina_tabela(entidade, args):
+    """
+    Uma página da tabela da entidade.
+
+    Parâmetros: ordem (chave de "ordenaveis"), direcao (asc|desc), limite,
+    depois (cursor da página anterior) e os filtros de igualdade da entidade.
+    """
+    tabela = TABELAS[entidade]
+    modelo = tabela["modelo"]
+
+    ordem = args.get("ordem", "id")
+    if ordem not in tabela["ordenaveis"]:
+        raise ParametroInvalido(f"ordem deve ser uma de: {', '.join(tabela['ordenaveis'])}")
+    coluna = tabela["ordenaveis"][ordem]
+
+    direcao = args.get("direcao", "desc")
+    if direcao not in ("asc", "desc"):
+        raise ParametroInvalido("direcao deve ser asc ou desc")
+    crescente = direcao == "asc"
+
+    try:
+        limite = min(max(int(args.get("limite", POR_PAGINA_PADRAO)), 1), POR_PAGINA_MAX)
+    except ValueError:
+        raise ParametroInvalido("limite inválido")
+
+    rotulos = list(tabela["colunas"])
+    query = db.session.query(*tabela["colunas"].values(), coluna.label("_ordem"))
+    query = _filtrar(query, tabela, args)
+
+    cursor = args.get("depois")
+    if cursor:
+        valor, id_ = decodificar_cursor(cursor, coluna)
+        if coluna is modelo.id:
+            query = query.filter(modelo.id > id_ if crescente else modelo.id < id_)
+        elif crescente:
+            query = query.filter(or_(coluna > valor, and_(coluna == valor, modelo.id > id_)))
+        else:
+            query = query.filter(or_(coluna < valor, and_(coluna == valor, modelo.id < id_)))
+
+    if crescente:
+        query = query.order_by(coluna.asc(), modelo.id.asc())
+    else:
+        query = query.order_by(coluna.desc(), modelo.id.desc())
+
+    # Uma linha a mais só para saber se existe próxima página
+    linhas = query.limit(limite + 1).all()
+    tem_proxima = len(linhas) > limite
+    linhas = linhas[:limite]
+
+    def exibir(valor):
+        return valor.value if isinstance(valor, PerfilEnum) else valor
+
+    return {
+        "entity": entidade,
+        "columns": rotulos,
+        "rows": [{rotulo: exibir(linha[i]) for i, rotulo in enumerate(rotulos)} for linha in linhas],
+        "ordem": ordem,
+        "direcao": direcao,
+        # rótulo da coluna → valor de "ordem" (só colunas ordenáveis)
+        "ordenacao": {
+            rotulo: chave
+            for rotulo, col in tabela["colunas"].items()
+            for chave, ordenavel in tabela["ordenaveis"].items()
+            if col is ordenavel
+        },
+        "proximo": codificar_cursor(linhas[-1]._ordem, linhas[-1][0]) if tem_proxima else None,
+    }
@@ -0,0 +1,63 @@
+from utils.gravador_logs import gravador_logs
+from utils.socket_lote import EmissorEmLote
+from utils.tempo import utc_to_brasil
+
+
+# =====================================================
+# LOGS AO VIVO (namespace Socket.IO /logs)
+# =====================================================
+# O gravador avisa após cada commit; os logs que passam no filtro de cada
+# admin conectado são enviados em lote no evento "logs_novos".
+#
+# Limitação com vários workers: o filtro de cada admin fica no worker que
+# atendeu o connect, e o gravador publica no worker que gravou o log. O
+# admin vê ao vivo só os logs gravados pelo próprio worker, mesmo com
+# SOCKETIO_MESSAGE_QUEUE (a fila leva emits, não assinaturas). A listagem
+# /logs continua completa; o dashboard ao vivo, sem filtro, usa sala e
+# não tem essa limitação.
+
+NAMESPACE = "/logs"
+
+
+def atende(filtro, log):
+    """Mesma regra dos filtros da listagem: trecho, sem diferenciar maiúsculas."""
+    usuario = filtro.get("usuario")
+    tipo = filtro.get("tipo")
+    if usuario and usuario.lower() not in (log["usuario_nome"] or "").lower():
+        return False
+    if tipo and tipo.lower() not in (log["tipo_operacao"] or "").lower():
+        return False
+    return True
+
+
+emissor_logs = EmissorEmLote("logs_novos", NAMESPACE, atende=atende)
+
+
+def init_app(app):
+    app.config.setdefault("LOG_TAIL_INTERVALO", 0.5)  # segundos entre envios
+    app.config.setdefault("LOG_TAIL_MAX", 100)        # logs por envio, por admin
+
+    emissor_logs.intervalo = float(app.config["LOG_TAIL_INTERVALO"])
+    emissor_logs.maximo = int(app.config["LOG_TAIL_MAX"])
+
+    gravador_logs.apos_commit(publicar)
+
+
+def publicar(registros):
+    """Gancho pós-commit do gravador."""
+    if not emissor_logs.tem_assinantes():
+        return
+    emissor_logs.adicionar([serializar(r) for r in registros])
+
+
+def serializar(registro):
+    return {
+        "id": registro["id"],
+        "horario": utc_to_brasil(registro["horario"]).strftime("%d/%m/%Y %H:%M:%S"),
+        "usuario_nome": registro["usuario_nome"],
+        "usuario_perfil": registro["usuario_perfil"],
+        "tipo_operacao": registro["tipo_operacao"],
+        "tipo_modelo": registro["tipo_modelo"],
+        "descricao": registro["descricao"],
+        "modificacoes": registro["modificacoes"],
+    }
@@ -0,0 +1,55 @@
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+
+# =====================================================
+# FUSO HORÁRIO DO BRASIL (OFICIAL)
+# =====================================================
+FUSO_BR = ZoneInfo("America/Sao_Paulo")
+
+
+def utc_to_brasil(dt_utc):
+    """Converte datetime UTC para horário do Brasil."""
+    if not dt_utc:
+        return None
+    # garante que dt_utc é timezone-aware em UTC
+    if dt_utc.tzinfo is None:
+        dt_utc = dt_utc.replace(tzinfo=timezone.utc)
+    return dt_utc.astimezone(FUSO_BR)
+
+
+def hoje_brasil():
+    """Data de hoje no fuso do Brasil."""
+    return datetime.now(FUSO_BR).date()
+
+
+# =====================================================
+# INTERVALOS UTC (predicados que usam índice em horario)
+# =====================================================
+def inicio_do_dia_utc(dia):
+    """Meia-noite do dia (horário do Brasil) expressa em UTC."""
+    return datetime.combine(dia, time.min, tzinfo=FUSO_BR).astimezone(timezone.utc)
+
+
+def intervalo_dia_utc(dia):
+    """Intervalo semiaberto [início, fim) em UTC de um dia local do Brasil."""
+    return inicio_do_dia_utc(dia), inicio_do_dia_utc(dia + timedelta(days=1))
+
+
+def intervalo_datas_utc(data_inicio=None, data_fim=None):
+    """
+    Converte um filtro de datas locais (ambas inclusivas) em [início, fim) UTC.
+
+    Qualquer das pontas pode ser None (intervalo aberto daquele lado).
+    Usar como: horario >= inicio AND horario < fim — sem func.date(), o
+    banco consegue fazer range scan no índice.
+    """
+    inicio = inicio_do_dia_utc(data_inicio) if data_inicio else None
+    fim = inicio_do_dia_utc(data_fim + timedelta(days=1)) if data_fim else None
+    return inicio, fim
+
+
+def ultimos_dias_utc(dias, hoje=None):
+    """Intervalo [início, fim) UTC dos últimos `dias` dias locais, incluindo hoje."""
+    hoje = hoje or hoje_brasil()
+    return intervalo_datas_utc(hoje - timedelta(days=dias - 1), hoje)
@@ -0,0 +1,112 @@
+from functools import wraps
+
+from flask import request, make_response
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from utils.cache import cache_dashboard
+from utils.estado_sistema import estado_sistema
+from utils.tempo import hoje_brasil
+
+
+# =====================================================
+# VERSÕES POR TABELA (ETag / GET condicional)
+# =====================================================
+# Cada flush que altera uma tabela versionada (ORM ou UPDATE/DELETE em massa)
+# soma 1 à versão dela, na mesma transação, como a chave "versao:<tabela>"
+# de estado_sistema. Todos os workers leem as versões pela cópia local de
+# utils.estado_sistema (relida a cada ESTADO_INTERVALO; logo após um commit
+# no próprio processo). O ETag de uma resposta é montado só com essas
+# versões, então um If-None-Match igual vira 304 sem consultar os dados.
+# Quando um worker percebe a versão nova de outro, limpa as entradas do
+# cache do dashboard com a etiqueta da tabela.
+
+TABELAS_VERSIONADAS = frozenset({"usuarios", "veiculos", "equipamentos", "logs"})
+PREFIXO = "versao:"
+
+
+def versao(tabela):
+    return estado_sistema.versao(PREFIXO + tabela)
+
+
+def etag_para(*tabelas):
+    """ETag (sem aspas) das tabelas; inclui o dia local, pois as séries "últimos 7 dias" mudam à meia-noite."""
+    partes = [f"{tabela}.{versao(tabela)}" for tabela in tabelas]
+    return f"{hoje_brasil():%Y%m%d}-" + "-".join(partes)
+
+
+# -------------------------------------------------
+# Eventos da sessão: quais tabelas a transação alterou
+# -------------------------------------------------
+def _incrementar(session, tabelas):
+    tabelas = set(tabelas) & TABELAS_VERSIONADAS
+    pendentes = session.info.setdefault("tabelas_alteradas", set())
+    if not tabelas:
+        return
+    estado_sistema.incrementar(session.connection(), *(PREFIXO + tabela for tabela in sorted(tabelas)))
+    pendentes.update(tabelas)
+
+
+@event.listens_for(Session, "after_flush")
+def _registrar_flush(session, contexto):
+    _incrementar(session, {
+        getattr(objeto, "__tablename__", None)
+        for objeto in (*session.new, *session.dirty, *session.deleted)
+    })
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _registrar_em_massa(estado):
+    if (estado.is_update or estado.is_delete) and estado.bind_mapper is not None:
+        _incrementar(estado.session, {estado.bind_mapper.local_table.name})
+
+
+@event.listens_for(Session, "after_commit")
+def _publicar(session):
+    if session.info.pop("tabelas_alteradas", None):
+        estado_sistema.expirar_copia()
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar(session):
+    session.info.pop("tabelas_alteradas", None)
+
+
+@estado_sistema.ao_mudar
+def _invalidar_cache(chave, valor, versao):
+    """Versão nova (de qualquer worker) → entradas do cache com aquela etiqueta saem."""
+    if chave.startswith(PREFIXO):
+        cache_dashboard.invalidar(chave[len(PREFIXO):])
+
+
+# -------------------------------------------------
+# Decorator para views JSON
+# -------------------------------------------------
+def condicional(dependencias):
+    """
+    Responde 304 quando o If-None-Match bate com o ETag das tabelas de que a view depende.
+
+    `dependencias(**kwargs_da_rota)` devolve as tabelas; None → sem ETag (ex.: rota inválida).
+    Use abaixo dos decorators de login/perfil.
+    """
+    def wrapper(f):
+        @wraps(f)
+        def decorator(*args, **kwargs):
+            tabelas = dependencias(**kwargs)
+            if not tabelas:
+                return f(*args, **kwargs)
+
+            etag = etag_para(*tabelas)
+            if request.if_none_match.contains_weak(etag):
+                resposta = make_response("", 304)
+            else:
+                resposta = make_response(f(*args, **kwargs))
+                if resposta.status_code != 200:
+                    return resposta
+
+            resposta.set_etag(etag, weak=True)
+            resposta.headers["Cache-Control"] = "private, no-cache"
+            return resposta
+
+        return decorator
+    return wrapper